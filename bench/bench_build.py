@@ -0,0 +1,141 @@
+"""Throughput of each parsing stage and of a full build on a synthetic corpus.
+
+A corpus from corpus.py is generated once into a temporary directory, then
+every variant is timed in a fresh subprocess (best of --repeat runs):
+
+- text_to_textnodes over the text of every paragraph block;
+- markdown_to_blocks over every page;
+- markdown_to_html_node over every page;
+- to_html over the resulting trees;
+- generate_pages_recursive for the whole site into an empty directory.
+
+Results are reported as seconds, pages/s and MB/s of markdown input. The
+build stage includes writing every page, so it is sensitive to filesystem
+load; compare variants in the same invocation.
+
+
+    python3 bench/bench_build.py                      # working tree only
+    python3 bench/bench_build.py --rev baseline-ref   # compare with a git revision
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_memory import PROJECT_ROOT, export_revision
+from corpus import generate_corpus
+
+STAGES = ("text_to_textnodes", "markdown_to_blocks", "markdown_to_html_node", "to_html", "build")
+
+
+def best_of(repeat, func, cleanup=None):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if cleanup is not None:
+            cleanup()
+    return best
+
+
+def run_child(src_dir, corpus_dir, repeat):
+    sys.path.insert(0, src_dir)
+    from converters import markdown_to_html_node
+    from inline_markdown import BlockType, block_to_block_type, markdown_to_blocks, text_to_textnodes
+    from main import generate_pages_recursive
+
+    content_dir = os.path.join(corpus_dir, "content")
+    template_path = os.path.join(corpus_dir, "template.html")
+    sources = []
+    for root, _, files in os.walk(content_dir):
+        for name in sorted(files):
+            with open(os.path.join(root, name), "r", encoding="utf-8") as file:
+                sources.append(file.read())
+    source_bytes = sum(len(source.encode("utf-8")) for source in sources)
+
+    paragraphs = []
+    for source in sources:
+        for block in markdown_to_blocks(source):
+            if block_to_block_type(block) == BlockType.PARAGRAPH:
+                paragraphs.append(" ".join(block.split("\n")))
+    paragraph_bytes = sum(len(text.encode("utf-8")) for text in paragraphs)
+
+    trees = [markdown_to_html_node(source) for source in sources]
+
+    def build():
+        # A fresh directory per run; the previous output is deleted outside the timed region
+        output_dir = tempfile.mkdtemp(dir=corpus_dir)
+        output_dirs.append(output_dir)
+        # Older revisions print a line per page
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content_dir, template_path, output_dir)
+
+    output_dirs = []
+    timings = {
+        "text_to_textnodes": best_of(repeat, lambda: [text_to_textnodes(text) for text in paragraphs]),
+        "markdown_to_blocks": best_of(repeat, lambda: [markdown_to_blocks(source) for source in sources]),
+        "markdown_to_html_node": best_of(repeat, lambda: [markdown_to_html_node(source) for source in sources]),
+        "to_html": best_of(repeat, lambda: [tree.to_html() for tree in trees]),
+        "build": best_of(repeat, build, cleanup=lambda: shutil.rmtree(output_dirs.pop(), ignore_errors=True)),
+    }
+    sizes = {stage: source_bytes for stage in STAGES}
+    sizes["text_to_textnodes"] = paragraph_bytes
+    print(json.dumps({"pages": len(sources), "seconds": timings, "bytes": sizes}))
+
+
+def measure(src_dir, corpus_dir, repeat):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", src_dir, "--corpus", corpus_dir, "--repeat", str(repeat)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--small", type=int, default=2000, help="number of small pages (default 2000)")
+    parser.add_argument("--huge", type=int, default=5, help="number of huge pages (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed (default 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, best is reported (default 3)")
+    parser.add_argument("--rev", action="append", default=[], help="git revision to compare against")
+    parser.add_argument("--child", metavar="SRC_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.corpus, args.repeat)
+        return
+
+    variants = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_dir = os.path.join(temp_dir, "corpus")
+        corpus = generate_corpus(corpus_dir, args.small, args.huge, args.seed)
+        print(f"Corpus: {corpus['pages']} pages, {corpus['bytes'] / 1e6:.1f} MB of markdown")
+        for index, rev in enumerate(args.rev):
+            src_dir = export_revision(rev, os.path.join(temp_dir, str(index)))
+            variants.append((rev, measure(src_dir, corpus_dir, args.repeat)))
+        variants.append(("working tree", measure(os.path.join(PROJECT_ROOT, "src"), corpus_dir, args.repeat)))
+
+    print(f"{'variant':<16} {'stage':<22} {'time':>9} {'pages/s':>10} {'MB/s':>8}")
+    for name, result in variants:
+        for stage in STAGES:
+            seconds = result["seconds"][stage]
+            print(
+                f"{name:<16} {stage:<22} {seconds:>8.3f}s {result['pages'] / seconds:>10.0f} "
+                f"{result['bytes'][stage] / 1e6 / seconds:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Micro-benchmarks for HTML serialization and escaping.
+
+Trees for every page of a corpus.py corpus are built once, then timed
+(best of --repeat runs):
+
+- legacy_to_html: the previous serializer (no escaping, props rendered with
+  a generator expression on every call), reimplemented here as reference;
+- to_html: the current serializer, which escapes text and attribute values;
+- escape_text over every text value, and over the same values with a "<"
+  appended (the slow path);
+- props_to_html over every node with attributes, with the props cache warm
+  and with it cleared before each call (only props with several attributes
+  are cached; a single attribute is always rendered directly).
+
+    python3 bench/bench_html.py
+    python3 bench/bench_html.py --small 500 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from bench_build import best_of
+from corpus import generate_corpus
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import htmlnode  # noqa: E402
+from converters import markdown_to_html_node  # noqa: E402
+from htmlnode import LeafNode, escape_text  # noqa: E402
+
+
+def legacy_props_to_html(props):
+    if not props:
+        return ""
+    return "".join(f' {k}="{v}"' for k, v in props.items())
+
+
+def legacy_write_html(node, write):
+    if isinstance(node, LeafNode):
+        if node.tag is None:
+            write(node.value)
+            return
+        write(f"<{node.tag}{legacy_props_to_html(node.props)}>")
+        write(node.value)
+        write(f"</{node.tag}>")
+        return
+    write(f"<{node.tag}{legacy_props_to_html(node.props)}>")
+    for child in node.children:
+        legacy_write_html(child, write)
+    write(f"</{node.tag}>")
+
+
+def legacy_to_html(node):
+    parts = []
+    legacy_write_html(node, parts.append)
+    return "".join(parts)
+
+
+def walk(node):
+    yield node
+    for child in node.children or ():
+        yield from walk(child)
+
+
+def uncached_props(nodes):
+    for node in nodes:
+        htmlnode._props_cache.clear()
+        node.props_to_html()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--small", type=int, default=2000, help="number of small pages (default 2000)")
+    parser.add_argument("--huge", type=int, default=5, help="number of huge pages (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed (default 0)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per variant, best is reported (default 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus = generate_corpus(os.path.join(temp_dir, "corpus"), args.small, args.huge, args.seed)
+        sources = []
+        for root, _, files in os.walk(corpus["content_dir"]):
+            for name in sorted(files):
+                with open(os.path.join(root, name), "r", encoding="utf-8") as file:
+                    sources.append(file.read())
+
+    trees = [markdown_to_html_node(source) for source in sources]
+    nodes = [node for tree in trees for node in walk(tree)]
+    texts = [node.value for node in nodes if node.value]
+    dirty_texts = [f"{text}<" for text in texts]
+    with_props = [node for node in nodes if node.props]
+    print(f"{len(trees)} pages, {len(nodes)} nodes, {len(texts)} text values, {len(with_props)} nodes with props")
+
+    timings = {
+        "legacy_to_html": best_of(args.repeat, lambda: [legacy_to_html(tree) for tree in trees]),
+        "to_html": best_of(args.repeat, lambda: [tree.to_html() for tree in trees]),
+        "escape_text (clean)": best_of(args.repeat, lambda: [escape_text(text) for text in texts]),
+        "escape_text (escaped)": best_of(args.repeat, lambda: [escape_text(text) for text in dirty_texts]),
+        "props_to_html (cached)": best_of(args.repeat, lambda: [node.props_to_html() for node in with_props]),
+        "props_to_html (uncached)": best_of(args.repeat, lambda: uncached_props(with_props)),
+    }
+    print(f"{'variant':<26} {'time':>9}")
+    for name, seconds in timings.items():
+        print(f"{name:<26} {seconds:>8.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Peak RSS of parsing the sample content/ tree scaled up, before and after a change.
+
+Every markdown file under content/ is parsed --scale times and all resulting
+HTML trees are kept alive, so the peak resident set size is dominated by
+TextNode/HTMLNode allocations. Each variant runs in a fresh subprocess:
+
+    python3 bench/bench_memory.py                     # working tree only
+    python3 bench/bench_memory.py --rev baseline-ref  # compare with a git revision
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux but bytes on macOS
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak / 1024
+
+
+def load_sources(content_dir):
+    sources = []
+    for root, _, files in os.walk(content_dir):
+        for name in sorted(files):
+            if name.endswith(".md"):
+                with open(os.path.join(root, name), "r", encoding="utf-8") as file:
+                    sources.append(file.read())
+    return sources
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children or ())
+
+
+def run_child(src_dir, scale):
+    sys.path.insert(0, src_dir)
+    from converters import markdown_to_html_node
+
+    sources = load_sources(os.path.join(PROJECT_ROOT, "content"))
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    trees = [markdown_to_html_node(source) for _ in range(scale) for source in sources]
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "pages": len(trees),
+                "nodes": sum(count_nodes(tree) for tree in trees),
+                "baseline_rss_mb": round(baseline, 1),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "seconds": round(elapsed, 3),
+            }
+        )
+    )
+
+
+def measure(src_dir, scale):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", src_dir, "--scale", str(scale)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def export_revision(rev, dest_dir):
+    os.makedirs(dest_dir)
+    archive = subprocess.run(
+        ["git", "-C", PROJECT_ROOT, "archive", rev, "src"], check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", dest_dir], input=archive, check=True)
+    return os.path.join(dest_dir, "src")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000, help="copies of each content page (default 1000)")
+    parser.add_argument("--rev", action="append", default=[], help="git revision to compare against")
+    parser.add_argument("--child", metavar="SRC_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.scale)
+        return
+
+    variants = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index, rev in enumerate(args.rev):
+            src_dir = export_revision(rev, os.path.join(temp_dir, str(index)))
+            variants.append((rev, measure(src_dir, args.scale)))
+        variants.append(("working tree", measure(os.path.join(PROJECT_ROOT, "src"), args.scale)))
+
+    print(f"{'variant':<16} {'pages':>7} {'nodes':>10} {'peak RSS':>10} {'trees':>10} {'time':>8}")
+    for name, result in variants:
+        trees_mb = result["peak_rss_mb"] - result["baseline_rss_mb"]
+        print(
+            f"{name:<16} {result['pages']:>7} {result['nodes']:>10} {result['peak_rss_mb']:>8.1f}MB "
+            f"{trees_mb:>8.1f}MB {result['seconds']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Deterministic synthetic site corpus for the build benchmarks.
+
+The corpus mixes the shapes that stress different parts of the parser:
+
+- many small pages (a title, a couple of paragraphs, a short list);
+- a few huge pages built from every block type;
+- link-heavy paragraphs (inline links, images and emphasis);
+- deep lists (long unordered and ordered lists);
+- big fenced code blocks.
+
+Run directly to write a corpus to disk:
+
+    python3 bench/corpus.py /tmp/corpus --small 5000 --huge 10
+"""
+
+import argparse
+import os
+import random
+
+WORDS = (
+    "middle earth ring hobbit wizard elf dwarf shire river mountain road "
+    "forest king steward tower council fellowship journey shadow light song "
+    "history language map tale age war peace friend home"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+<head>
+<title>{{ Title }}</title>
+<link href="/index.css" rel="stylesheet" />
+</head>
+<body>
+<article>{{ Content }}</article>
+</body>
+</html>
+"""
+
+
+class CorpusWriter:
+    """Builds markdown documents from a seeded random generator."""
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def words(self, count):
+        return " ".join(self.random.choice(WORDS) for _ in range(count))
+
+    def sentence(self):
+        return self.words(self.random.randint(6, 14)).capitalize() + "."
+
+    def inline_text(self, words):
+        """Plain text with occasional bold, italic and code spans."""
+        parts = []
+        for _ in range(words // 4):
+            style = self.random.random()
+            chunk = self.words(4)
+            if style < 0.1:
+                chunk = f"**{chunk}**"
+            elif style < 0.2:
+                chunk = f"_{chunk}_"
+            elif style < 0.25:
+                chunk = f"`{chunk}`"
+            parts.append(chunk)
+        return " ".join(parts)
+
+    def paragraph(self):
+        return " ".join(self.sentence() for _ in range(self.random.randint(2, 6)))
+
+    def link_heavy_paragraph(self, links=20):
+        parts = []
+        for i in range(links):
+            parts.append(self.inline_text(8))
+            if i % 5 == 4:
+                parts.append(f"![{self.words(2)}](/images/{self.random.choice(WORDS)}{i}.png)")
+            else:
+                parts.append(f"[{self.words(3)}](/{self.random.choice(WORDS)}/{i})")
+        return " ".join(parts)
+
+    def heading(self, level):
+        return f"{'#' * level} {self.words(4).capitalize()}"
+
+    def unordered_list(self, items):
+        return "\n".join(f"- {self.inline_text(8)}" for _ in range(items))
+
+    def ordered_list(self, items):
+        return "\n".join(f"{i}. {self.inline_text(8)}" for i in range(1, items + 1))
+
+    def quote(self, lines):
+        return "\n".join(f"> {self.sentence()}" for _ in range(lines))
+
+    def code_block(self, lines):
+        body = "\n".join(
+            f"    {self.random.choice(WORDS)} = {self.random.randint(0, 999)}  # {self.words(5)}" for _ in range(lines)
+        )
+        return f"```\n{body}\n```"
+
+    def small_page(self, title):
+        blocks = [f"# {title}", self.paragraph(), self.paragraph(), self.unordered_list(3)]
+        if self.random.random() < 0.3:
+            blocks.append(self.link_heavy_paragraph(5))
+        return "\n\n".join(blocks) + "\n"
+
+    def huge_page(self, title, sections=200):
+        blocks = [f"# {title}"]
+        for _ in range(sections):
+            blocks.append(self.heading(self.random.randint(2, 6)))
+            kind = self.random.randrange(6)
+            if kind == 0:
+                blocks.append(self.link_heavy_paragraph(40))
+            elif kind == 1:
+                blocks.append(self.unordered_list(60))
+            elif kind == 2:
+                blocks.append(self.ordered_list(120))
+            elif kind == 3:
+                blocks.append(self.code_block(150))
+            elif kind == 4:
+                blocks.append(self.quote(8))
+            else:
+                blocks.extend(self.paragraph() for _ in range(4))
+        return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(dest_dir, small_pages=2000, huge_pages=5, seed=0):
+    """Write template.html and content/ with a synthetic site under dest_dir.
+
+    Small pages are spread over nested section directories, each page in its
+    own directory as index.md like the real content/ tree.
+
+    Returns:
+        A dict with the "content_dir", "template_path", "pages" count and
+        total markdown "bytes".
+    """
+    writer = CorpusWriter(seed)
+    content_dir = os.path.join(dest_dir, "content")
+    template_path = os.path.join(dest_dir, "template.html")
+    os.makedirs(content_dir, exist_ok=True)
+    with open(template_path, "w", encoding="utf-8") as template_file:
+        template_file.write(TEMPLATE)
+
+    pages = [("index", writer.small_page("Synthetic Site"))]
+    for i in range(small_pages):
+        pages.append((os.path.join(f"section{i % 20}", f"topic{i % 7}", f"page{i}"), writer.small_page(f"Page {i}")))
+    for i in range(huge_pages):
+        pages.append((os.path.join("huge", f"page{i}"), writer.huge_page(f"Huge page {i}")))
+
+    total_bytes = 0
+    for rel_dir, markdown in pages:
+        page_dir = content_dir if rel_dir == "index" else os.path.join(content_dir, rel_dir)
+        os.makedirs(page_dir, exist_ok=True)
+        data = markdown.encode("utf-8")
+        with open(os.path.join(page_dir, "index.md"), "wb") as page_file:
+            page_file.write(data)
+        total_bytes += len(data)
+
+    return {"content_dir": content_dir, "template_path": template_path, "pages": len(pages), "bytes": total_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dest_dir", help="directory to write template.html and content/ into")
+    parser.add_argument("--small", type=int, default=2000, help="number of small pages (default 2000)")
+    parser.add_argument("--huge", type=int, default=5, help="number of huge pages (default 5)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    args = parser.parse_args()
+    corpus = generate_corpus(args.dest_dir, args.small, args.huge, args.seed)
+    print(f"Wrote {corpus['pages']} pages ({corpus['bytes'] / 1e6:.1f} MB) to {corpus['content_dir']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 #!/bin/sh
 
 cd "$(dirname "$0")"
-python3 src/main.py
-cd public && python3 -m http.server 8888
+# Build first so docs/ exists before serving, then keep rebuilding changed
+# pages in the background (the watcher's own start-up build is incremental)
+python3 src/main.py --incremental || exit 1
+python3 src/main.py --watch &
+trap 'kill $! 2>/dev/null' EXIT INT TERM
+cd docs && python3 -m http.server 8888
@@ -0,0 +1,97 @@
+import hashlib
+from collections import OrderedDict
+
+from state_file import read_state, write_state
+
+# Bump whenever block rendering changes, so persisted entries from an older
+# renderer are discarded instead of served.
+CACHE_VERSION = 3
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def block_key(text):
+    """Return the content address of a markdown block."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BlockRenderCache:
+    """LRU cache of rendered markdown blocks, keyed by block_key.
+
+    markdown_to_html_node stores (html, links) entries: the block's markup
+    and the (kind, url) pairs of its links and images, so a hit also feeds
+    the site's link index.
+
+    Worker processes get a copy of the cache; after track_changes() they
+    record hits, misses and new entries so the parent can fold them back in
+    with merge_changes().
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._added = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self._added is not None:
+            self._added.append((key, entry))
+
+    def track_changes(self):
+        """Start recording changes from zero (used in worker processes)."""
+        self.hits = 0
+        self.misses = 0
+        self._added = []
+
+    def take_changes(self):
+        """Return (hits, misses, added_entries) since the last call and reset them."""
+        changes = (self.hits, self.misses, self._added)
+        self.hits = 0
+        self.misses = 0
+        self._added = []
+        return changes
+
+    def merge_changes(self, changes):
+        hits, misses, added = changes
+        self.hits += hits
+        self.misses += misses
+        for key, entry in added:
+            self.put(key, entry)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @classmethod
+    def load(cls, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """Load a persisted cache; a missing, corrupt or outdated file yields an empty cache."""
+        cache = cls(max_entries)
+        data = read_state(path, CACHE_VERSION)
+        if data is None:
+            return cache
+        for key, entry in data.get("entries") or []:
+            cache.put(key, entry)
+        return cache
+
+    def save(self, path):
+        """Persist entries in LRU order, written atomically."""
+        write_state(path, CACHE_VERSION, {"entries": list(self._entries.items())})
@@ -0,0 +1,109 @@
+import sys
+import time
+
+QUIET = 0
+NORMAL = 1
+VERBOSE = 2
+
+# Flush buffered detail lines once they reach this many characters
+BUFFER_LIMIT = 64 * 1024
+
+# Minimum seconds between two redraws of the progress counter
+PROGRESS_INTERVAL = 0.1
+
+
+class BuildLog:
+    """Leveled, buffered build output.
+
+    - QUIET: errors and warnings only.
+    - NORMAL (the default): summary lines, plus a progress counter redrawn in
+      place at most every PROGRESS_INTERVAL seconds when stdout is a terminal.
+    - VERBOSE: also one line per generated page or copied file.
+
+    Detail lines are collected in memory and written in large chunks, so a
+    verbose build does not pay for one write per line. Errors and warnings
+    go to stderr immediately, after flushing whatever is buffered.
+    """
+
+    def __init__(self, level=NORMAL, stream=None, error_stream=None, progress_interval=PROGRESS_INTERVAL):
+        self.configure(level, stream, error_stream, progress_interval)
+
+    def configure(self, level=NORMAL, stream=None, error_stream=None, progress_interval=PROGRESS_INTERVAL):
+        self.level = level
+        self._stream = stream
+        self._error_stream = error_stream
+        self.progress_interval = progress_interval
+        self._buffer = []
+        self._buffered = 0
+        self._progress_shown = False
+        self._last_progress = 0.0
+
+    @property
+    def stream(self):
+        # Resolved lazily so redirecting sys.stdout (as tests do) is honoured
+        return self._stream or sys.stdout
+
+    @property
+    def error_stream(self):
+        return self._error_stream or sys.stderr
+
+    def detail(self, message):
+        """Record a per-file line, shown only at VERBOSE."""
+        if self.level < VERBOSE:
+            return
+        self._buffer.append(message)
+        self._buffer.append("\n")
+        self._buffered += len(message) + 1
+        if self._buffered >= BUFFER_LIMIT:
+            self.flush()
+
+    def info(self, message):
+        """Write a summary line, shown at NORMAL and above."""
+        if self.level < NORMAL:
+            return
+        self._buffer.append(message)
+        self._buffer.append("\n")
+        self.flush()
+
+    def warning(self, message):
+        self._write_error(f"Warning: {message}")
+
+    def error(self, message):
+        self._write_error(message)
+
+    def _write_error(self, message):
+        self.flush()
+        print(message, file=self.error_stream, flush=True)
+
+    def progress(self, done, total, label="pages"):
+        """Redraw "label: done/total" in place, rate-limited, on a terminal at NORMAL."""
+        if self.level != NORMAL or not _is_terminal(self.stream):
+            return
+        now = time.monotonic()
+        if done < total and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        self.stream.write(f"\r{label}: {done}/{total}")
+        self.stream.flush()
+        self._progress_shown = True
+
+    def flush(self):
+        """Clear the progress counter and write out buffered lines."""
+        if self._progress_shown:
+            self.stream.write("\r\x1b[K")
+            self._progress_shown = False
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._buffer = []
+            self._buffered = 0
+            self.stream.write(text)
+        self.stream.flush()
+
+
+def _is_terminal(stream):
+    isatty = getattr(stream, "isatty", None)
+    return isatty is not None and isatty()
+
+
+# The process-wide build log, configured once by main()
+log = BuildLog()
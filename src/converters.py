@@ -1,11 +1,20 @@
 import re
+from collections import deque
 
-from htmlnode import ParentNode
-from inline_markdown import BlockType, block_to_block_type, markdown_to_blocks, text_to_textnodes
+from block_cache import block_key
+from htmlnode import ParentNode, RawHTMLNode
+from inline_markdown import BlockType, ordered_list_prefix, scan_blocks, text_to_textnodes
 from textnode import TextNode, TextType
 from htmlnode import LeafNode
 
 
+# An h1 title line (after stripping): "#", whitespace, then the title
+TITLE_PATTERN = re.compile(r"#\s+(.+)$")
+
+# Shared tag strings, so heading nodes do not each carry a freshly formatted tag
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
 def text_node_to_html_node(text_node):
     match text_node.text_type:
         case TextType.TEXT:
@@ -24,58 +33,181 @@ def text_node_to_html_node(text_node):
             raise ValueError(f"Unknown TextType: {text_node.text_type}")
 
 
-def text_to_children(text):
+def text_to_children(text, links=None):
+    """Convert inline markdown to HTML nodes.
+
+    If links is a list, a (kind, url) pair is appended to it for every link
+    ("link") and image ("image") the tokenizer finds.
+    """
     text_nodes = text_to_textnodes(text)
+    if links is not None:
+        for node in text_nodes:
+            if node.text_type is TextType.LINK or node.text_type is TextType.IMAGE:
+                links.append((node.text_type.value, node.url))
     return [text_node_to_html_node(node) for node in text_nodes]
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+class MarkdownDocument:
+    """A rendered markdown document: its HTML tree and metadata found while parsing.
+
+    title is the text of the first h1 line (see title_from_lines), or None
+    if the document has none.
+    """
+
+    __slots__ = ("root", "title")
+
+    def __init__(self, root, title=None):
+        self.root = root
+        self.title = title
+
+
+def markdown_to_html_node(markdown, block_cache=None, links=None):
+    """Render a markdown document to a ParentNode("div", ...).
+
+    With a BlockRenderCache, each block is looked up by the hash of its text
+    before it is classified or parsed; hits become RawHTMLNodes that
+    serialize to exactly the cached markup. If links is a list, the links
+    and images of the document are appended to it as (kind, url) pairs,
+    including those of cached blocks.
+    """
+    return markdown_to_document(markdown, block_cache, links).root
+
+
+def markdown_to_document(markdown, block_cache=None, links=None):
+    """Render a markdown document into a MarkdownDocument in a single pass."""
+    return blocks_to_document(scan_blocks(markdown), block_cache, links)
+
+
+def blocks_to_document(blocks, block_cache=None, links=None):
+    """Render already scanned MarkdownBlocks to a MarkdownDocument.
+
+    The title is picked up from the block lines as they stream past, so it
+    needs no second scan of the text and works for cached blocks too; once
+    the first h1 is found no further blocks are checked.
+    """
     children = []
+    title = None
 
     for block in blocks:
-        block_type = block_to_block_type(block)
+        if title is None:
+            title = title_from_lines(block.lines)
+        children.append(render_block(block, block_cache, links))
 
-        if block_type == BlockType.PARAGRAPH:
-            paragraph_text = " ".join(block.split("\n"))
-            children.append(ParentNode("p", text_to_children(paragraph_text)))
-            continue
+    return MarkdownDocument(ParentNode("div", children), title)
 
-        if block_type == BlockType.HEADING:
-            heading_level = len(block) - len(block.lstrip("#"))
-            heading_text = block[heading_level + 1 :]
-            children.append(ParentNode(f"h{heading_level}", text_to_children(heading_text)))
-            continue
 
-        if block_type == BlockType.CODE:
-            code_text = block[4:-3]
-            code_node = text_node_to_html_node(TextNode(code_text, TextType.CODE))
-            children.append(ParentNode("pre", [code_node]))
-            continue
+class StreamedDocument:
+    """A markdown document rendered one block at a time while it is written.
 
-        if block_type == BlockType.QUOTE:
-            quote_lines = []
-            for line in block.split("\n"):
-                line_content = line[1:]
-                if line_content.startswith(" "):
-                    line_content = line_content[1:]
-                quote_lines.append(line_content)
-            children.append(ParentNode("blockquote", text_to_children(" ".join(quote_lines))))
-            continue
+    Blocks are rendered up front only until the first h1, so title is known
+    before any output is written (a page template usually needs it first);
+    the rest are pulled from blocks, rendered and written one by one by
+    write_html, so only one block is held in memory at a time. A document
+    without an h1 ends up fully buffered, and title stays None.
+    """
+
+    def __init__(self, blocks, block_cache=None, links=None):
+        self.title = None
+        self._blocks = iter(blocks)
+        self._block_cache = block_cache
+        self._links = links
+        self._rendered = deque()
+        for block in self._blocks:
+            self._rendered.append(render_block(block, block_cache, links))
+            self.title = title_from_lines(block.lines)
+            if self.title is not None:
+                break
+
+    def write_html(self, write):
+        """Stream the document as a <div> to write, like ParentNode.write_html."""
+        if not self._rendered:
+            raise ValueError("ParentNode must have children")
+        write("<div>")
+        while self._rendered:
+            self._rendered.popleft().write_html(write)
+        for block in self._blocks:
+            render_block(block, self._block_cache, self._links).write_html(write)
+        write("</div>")
+
+
+def render_block(block, block_cache=None, links=None):
+    """Render one MarkdownBlock to an HTML node, through block_cache if given."""
+    if block_cache is None:
+        return block_to_html_node(block, links)
+
+    key = block_key(block.text)
+    entry = block_cache.get(key)
+    if entry is not None:
+        html, block_links = entry
+        if links is not None:
+            links.extend(block_links)
+        return RawHTMLNode(html)
+
+    # Links are always collected on a miss so the cache entry can replay them,
+    # and the block is serialized only once: the page reuses the cached markup.
+    block_links = []
+    html = block_to_html_node(block, block_links).to_html()
+    block_cache.put(key, (html, block_links))
+    if links is not None:
+        links.extend(block_links)
+    return RawHTMLNode(html)
 
-        if block_type == BlockType.UNORDERED_LIST:
-            list_items = []
-            for line in block.split("\n"):
-                list_items.append(ParentNode("li", text_to_children(line[2:])))
-            children.append(ParentNode("ul", list_items))
-            continue
 
-        if block_type == BlockType.ORDERED_LIST:
-            list_items = []
-            for line in block.split("\n"):
-                line_text = re.sub(r"^\d+\. ", "", line)
-                list_items.append(ParentNode("li", text_to_children(line_text)))
-            children.append(ParentNode("ol", list_items))
+def title_from_lines(lines):
+    """Return the title on the first h1 line of lines, or None.
+
+    Any line counts, whatever block it belongs to (even a code block), so
+    scanning a document's block lines gives the same title as scanning its
+    raw lines.
+    """
+    for line in lines:
+        if "#" not in line:
             continue
+        line = line.strip()
+        if line.startswith("#"):
+            match = TITLE_PATTERN.match(line)
+            if match:
+                return match.group(1).strip()
+    return None
+
+
+def block_to_html_node(block, links=None):
+    block_type = block.block_type
+    lines = block.lines
+
+    if block_type == BlockType.PARAGRAPH:
+        paragraph_text = " ".join(lines)
+        return ParentNode("p", text_to_children(paragraph_text, links))
+
+    if block_type == BlockType.HEADING:
+        heading = lines[0]
+        heading_level = len(heading) - len(heading.lstrip("#"))
+        heading_text = heading[heading_level + 1 :]
+        return ParentNode(HEADING_TAGS[heading_level - 1], text_to_children(heading_text, links))
+
+    if block_type == BlockType.CODE:
+        code_text = block.text[4:-3]
+        code_node = text_node_to_html_node(TextNode(code_text, TextType.CODE))
+        return ParentNode("pre", [code_node])
+
+    if block_type == BlockType.QUOTE:
+        quote_lines = []
+        for line in lines:
+            line_content = line[1:]
+            if line_content.startswith(" "):
+                line_content = line_content[1:]
+            quote_lines.append(line_content)
+        return ParentNode("blockquote", text_to_children(" ".join(quote_lines), links))
+
+    if block_type == BlockType.UNORDERED_LIST:
+        list_items = []
+        for line in lines:
+            list_items.append(ParentNode("li", text_to_children(line[2:], links)))
+        return ParentNode("ul", list_items)
 
-    return ParentNode("div", children)
+    list_items = []
+    for i, line in enumerate(lines, start=1):
+        # The classifier guarantees line i starts with "i. "
+        line_text = line[len(ordered_list_prefix(i)) :]
+        list_items.append(ParentNode("li", text_to_children(line_text, links)))
+    return ParentNode("ol", list_items)
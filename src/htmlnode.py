@@ -1,4 +1,29 @@
+# Rendered attribute strings of multi-attribute props, keyed by the props'
+# items (a snapshot, so later changes to a props dict cannot serve stale
+# markup); cleared when full
+PROPS_CACHE_SIZE = 4096
+_props_cache = {}
+
+
+def escape_text(text):
+    """Escape &, < and > in text content; text without them is returned as is."""
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def escape_attribute(value):
+    """Escape an attribute value for use inside double quotes."""
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return value
+
+
 class HTMLNode:
+    # Builds allocate millions of nodes, so no per-instance __dict__. Nodes
+    # without attributes share props=None rather than each holding a dict.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -6,43 +31,93 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+
+    def write_html(self, write):
+        """Stream the node's HTML as fragments to write (e.g. file.write or list.append)."""
         raise NotImplementedError
 
     def props_to_html(self):
-        if not self.props:
+        props = self.props
+        if not props:
             return ""
-        return "".join(f' {k}="{v}"' for k, v in self.props.items())
+        if len(props) == 1:
+            # A lone attribute (a link's href) renders about as fast as a cache
+            # hit, and its value is rarely repeated, so it skips the cache
+            for name, value in props.items():
+                return f' {name}="{escape_attribute(str(value))}"'
+        key = tuple(props.items())
+        html = _props_cache.get(key)
+        if html is None:
+            html = "".join([f' {k}="{escape_attribute(str(v))}"' for k, v in key])
+            if len(_props_cache) >= PROPS_CACHE_SIZE:
+                _props_cache.clear()
+            _props_cache[key] = html
+        return html
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
-        if self.value is None:
+    def write_html(self, write):
+        value = self.value
+        if value is None:
             raise ValueError("LeafNode must have a value")
-        if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        # escape_text inlined: this runs for every text fragment of the site
+        if "&" in value or "<" in value or ">" in value:
+            value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        tag = self.tag
+        if tag is None:
+            write(value)
+            return
+        write(f"<{tag}{self.props_to_html()}>" if self.props else f"<{tag}>")
+        write(value)
+        write(f"</{tag}>")
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
+class RawHTMLNode(LeafNode):
+    """Markup that is already HTML (such as a cached block), written as is."""
+
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def write_html(self, write):
+        write(self.value)
+
+    def __repr__(self):
+        return f"RawHTMLNode({self.value})"
+
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
-        if self.tag is None:
+    def write_html(self, write):
+        tag = self.tag
+        if tag is None:
             raise ValueError("ParentNode must have a tag")
-        if not self.children:
+        children = self.children
+        if not children:
             raise ValueError("ParentNode must have children")
-        inner = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{inner}</{self.tag}>"
+        write(f"<{tag}{self.props_to_html()}>" if self.props else f"<{tag}>")
+        for child in children:
+            child.write_html(write)
+        write(f"</{tag}>")
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
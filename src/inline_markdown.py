@@ -42,12 +42,21 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+# Compiled once at import instead of going through re's pattern cache on every call
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    if "![" not in text:
+        return []
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    if "](" not in text:
+        return []
+    return LINK_PATTERN.findall(text)
 
 
 def split_nodes_image(old_nodes):
@@ -112,7 +121,68 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
+# Images and links in one alternation: at any position an image is tried
+# first, which matches the image-then-link order of the chained splitters.
+INLINE_LINK_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Delimiters in the order the chained splitters apply them.
+INLINE_DELIMITERS = (("`", TextType.CODE), ("**", TextType.BOLD), ("_", TextType.ITALIC))
+
+
 def text_to_textnodes(text):
+    """Tokenize inline markdown in one left-to-right walk.
+
+    Produces the same nodes as text_to_textnodes_chained, and raises
+    ValueError for the same inputs, without building an intermediate node
+    list per splitter or re-searching reconstructed link and image strings.
+    When several delimiters are unbalanced, the first one in the text is
+    reported rather than the first one in splitter order.
+    """
+    nodes = []
+    position = 0
+    for match in INLINE_LINK_PATTERN.finditer(text):
+        if match.start() > position:
+            _split_delimited_text(text[position : match.start()], 0, nodes)
+        if match.group(2) is not None:
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        else:
+            nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+        position = match.end()
+
+    if position == 0:
+        _split_delimited_text(text, 0, nodes)
+    elif position < len(text):
+        _split_delimited_text(text[position:], 0, nodes)
+    return nodes
+
+
+def _split_delimited_text(text, level, nodes):
+    if level == len(INLINE_DELIMITERS):
+        nodes.append(TextNode(text, TextType.TEXT))
+        return
+
+    delimiter, text_type = INLINE_DELIMITERS[level]
+    split_text = text.split(delimiter)
+    if len(split_text) == 1:
+        _split_delimited_text(text, level + 1, nodes)
+        return
+
+    if len(split_text) % 2 == 0:
+        raise ValueError(
+            f"Invalid markdown syntax: missing closing delimiter '{delimiter}' in '{text}'"
+        )
+
+    for i, text_part in enumerate(split_text):
+        if text_part == "":
+            continue
+        if i % 2 == 0:
+            _split_delimited_text(text_part, level + 1, nodes)
+        else:
+            nodes.append(TextNode(text_part, text_type))
+
+
+def text_to_textnodes_chained(text):
+    """Reference implementation of text_to_textnodes built from the splitters."""
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
@@ -122,7 +192,177 @@ def text_to_textnodes(text):
     return nodes
 
 
+class MarkdownBlock:
+    """A block of markdown with its type, stripped lines and source line span.
+
+    start_line and end_line are 1-based and inclusive, and point at the first
+    and last non-blank source lines of the block. The type is classified
+    lazily on first access, so callers that can answer from a cache never
+    pay for it.
+    """
+
+    def __init__(self, block_type, lines, start_line, end_line):
+        self._block_type = block_type
+        self.lines = lines
+        self.start_line = start_line
+        self.end_line = end_line
+        self._text = None
+
+    @property
+    def block_type(self):
+        if self._block_type is None:
+            self._block_type = classify_block_lines(self.lines)
+        return self._block_type
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def __eq__(self, other):
+        return (
+            self.block_type == other.block_type
+            and self.lines == other.lines
+            and self.start_line == other.start_line
+            and self.end_line == other.end_line
+        )
+
+    def __repr__(self):
+        return f"MarkdownBlock({self.block_type.value}, {self.lines}, {self.start_line}, {self.end_line})"
+
+
+HEADING_PATTERN = re.compile(r"#{1,6} .+")
+
+
+def scan_blocks(markdown):
+    """Split and classify a markdown document in one pass over its lines."""
+    return scan_block_lines(markdown.split("\n"))
+
+
+def scan_block_lines(lines):
+    """Group lines into typed blocks, yielding MarkdownBlock objects.
+
+    Blocks are separated by empty lines, and each block is stripped of
+    surrounding whitespace, exactly like markdown_to_blocks; the type is the
+    one block_to_block_type would return.
+
+    Args:
+        lines: Iterable of lines without their trailing newline.
+    """
+    group = []
+    group_start = 1
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        if line == "":
+            if group:
+                block = _finish_block(group, group_start)
+                if block is not None:
+                    yield block
+                group = []
+            continue
+        if not group:
+            group_start = line_number
+        group.append(line)
+
+    if group:
+        block = _finish_block(group, group_start)
+        if block is not None:
+            yield block
+
+
+def _finish_block(group, group_start):
+    first = 0
+    last = len(group) - 1
+    while first <= last and group[first].strip() == "":
+        first += 1
+    while last >= first and group[last].strip() == "":
+        last -= 1
+    if first > last:
+        return None
+
+    lines = group[first : last + 1]
+    if first == last:
+        lines[0] = lines[0].strip()
+    else:
+        lines[0] = lines[0].lstrip()
+        lines[-1] = lines[-1].rstrip()
+    return MarkdownBlock(None, lines, group_start + first, group_start + last)
+
+
+# "1. ", "2. ", ... built once; longer lists extend it on demand
+_ORDERED_LIST_PREFIXES = [f"{i}. " for i in range(100)]
+
+
+def ordered_list_prefix(number):
+    """Return the "N. " marker that starts line N of an ordered list."""
+    while number >= len(_ORDERED_LIST_PREFIXES):
+        _ORDERED_LIST_PREFIXES.append(f"{len(_ORDERED_LIST_PREFIXES)}. ")
+    return _ORDERED_LIST_PREFIXES[number]
+
+
+def _classify_heading(lines):
+    if len(lines) == 1 and HEADING_PATTERN.fullmatch(lines[0]):
+        return BlockType.HEADING
+    return BlockType.PARAGRAPH
+
+
+def _classify_code(lines):
+    if len(lines) > 1 and lines[0] == "```" and lines[-1].endswith("```"):
+        return BlockType.CODE
+    return BlockType.PARAGRAPH
+
+
+def _classify_quote(lines):
+    for line in lines:
+        if not line.startswith(">"):
+            return BlockType.PARAGRAPH
+    return BlockType.QUOTE
+
+
+def _classify_unordered_list(lines):
+    for line in lines:
+        if not line.startswith("- "):
+            return BlockType.PARAGRAPH
+    return BlockType.UNORDERED_LIST
+
+
+def _classify_ordered_list(lines):
+    for i, line in enumerate(lines, start=1):
+        if not line.startswith(ordered_list_prefix(i)):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+
+# Every non-paragraph block type is decided by the first character of the
+# block, so that character selects the only check that can succeed.
+_BLOCK_CLASSIFIERS = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    "1": _classify_ordered_list,
+}
+
+
+def classify_block_lines(lines):
+    """Return the BlockType of a stripped block given as a list of lines.
+
+    Dispatches on the block's first character: a block starting with
+    anything other than #, `, >, - or 1 is a paragraph without further checks.
+    """
+    classifier = _BLOCK_CLASSIFIERS.get(lines[0][:1])
+    if classifier is None:
+        return BlockType.PARAGRAPH
+    return classifier(lines)
+
+
 def markdown_to_blocks(markdown):
+    return [block.text for block in scan_blocks(markdown)]
+
+
+def markdown_to_blocks_split(markdown):
+    """Reference implementation of markdown_to_blocks using str.split."""
     raw_blocks = markdown.split("\n\n")
     blocks = []
 
@@ -135,6 +375,11 @@ def markdown_to_blocks(markdown):
 
 
 def block_to_block_type(block):
+    return classify_block_lines(block.split("\n"))
+
+
+def block_to_block_type_regex(block):
+    """Reference implementation of block_to_block_type."""
     if re.fullmatch(r"#{1,6} .+", block):
         return BlockType.HEADING
 
@@ -0,0 +1,150 @@
+import os
+import posixpath
+from urllib.parse import urlsplit
+
+from state_file import read_state, write_state
+
+INDEX_VERSION = 1
+
+
+class LinkIndex:
+    """Links and images of every page, collected while the pages render.
+
+    pages maps each source path (relative to the content directory) to a
+    dict with its "output" path (relative to the output directory, with /
+    separators) and the "links" and "images" URLs found in it, in document
+    order without duplicates. Generated listing pages are recorded too,
+    keyed by their output path and marked with "listing": True. The index
+    is saved between builds so check_links can validate the whole site
+    without re-rendering anything.
+    """
+
+    def __init__(self, pages=None):
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index; a missing, corrupt or outdated file yields an empty index."""
+        data = read_state(path, INDEX_VERSION)
+        if data is None:
+            return cls()
+        return cls(data.get("pages") or {})
+
+    def save(self, path):
+        """Write the index atomically (temp file + rename)."""
+        write_state(path, INDEX_VERSION, {"pages": self.pages}, indent=1, sort_keys=True)
+
+    def record_page(self, source, output, links):
+        """Replace the entry for source with the (kind, url) pairs in links."""
+        urls = {"link": {}, "image": {}}
+        for kind, url in links:
+            urls[kind][url] = None
+        self.pages[source] = {
+            "output": output.replace(os.sep, "/"),
+            "links": list(urls["link"]),
+            "images": list(urls["image"]),
+        }
+
+    def record_listing(self, output, links):
+        """Replace the entry for the listing page written to output."""
+        self.record_page(output, output, links)
+        self.pages[output]["listing"] = True
+
+    def remove_page(self, source):
+        self.pages.pop(source, None)
+
+    def remove_listings(self):
+        """Drop every listing page entry (they are recorded again by each build)."""
+        for source in [source for source, entry in self.pages.items() if entry.get("listing")]:
+            del self.pages[source]
+
+    def check_links(self, static_files=()):
+        """Validate internal links and images against the indexed pages and static files.
+
+        External URLs (with a scheme or host) and pure #fragment links are
+        not checked. A root-relative or relative URL resolves if it names a
+        page output or static file exactly, with .html appended, or as a
+        directory containing index.html.
+
+        Args:
+            static_files: Paths of static files relative to the output
+                directory, with / separators.
+
+        Returns:
+            A dict with the number of URLs "checked", lists of (source, url)
+            pairs for "broken_links" and "missing_images", and the sorted
+            sources of "orphan_pages" that no other page links to (the site
+            root and listing pages are never orphans).
+        """
+        outputs = {entry["output"]: source for source, entry in self.pages.items()}
+        targets = set(outputs) | set(static_files)
+        report = {"checked": 0, "broken_links": [], "missing_images": [], "orphan_pages": []}
+        linked = set()
+
+        for source in sorted(self.pages):
+            entry = self.pages[source]
+            base_url = page_url(entry["output"])
+            for kind, urls, failures in (
+                ("link", entry["links"], report["broken_links"]),
+                ("image", entry["images"], report["missing_images"]),
+            ):
+                for url in urls:
+                    path = resolve_url(url, base_url)
+                    if path is None:
+                        continue
+                    report["checked"] += 1
+                    target = find_target(path, targets)
+                    if target is None:
+                        failures.append((source, url))
+                    elif kind == "link" and outputs.get(target) not in (None, source):
+                        linked.add(target)
+
+        report["orphan_pages"] = sorted(
+            source
+            for output, source in outputs.items()
+            if output != "index.html" and output not in linked and not self.pages[source].get("listing")
+        )
+        return report
+
+
+def page_url(output):
+    """Return the URL path a page output is served at ("blog/index.html" -> "/blog/")."""
+    if output == "index.html":
+        return "/"
+    if output.endswith("/index.html"):
+        return "/" + output[: -len("index.html")]
+    return "/" + output
+
+
+def resolve_url(url, base_url):
+    """Return the site path (no leading slash) an internal URL points at, or None if external."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    if parts.path.startswith("/"):
+        path = parts.path
+    else:
+        path = posixpath.join(posixpath.dirname(base_url), parts.path)
+    path = posixpath.normpath(path).lstrip("/")
+    return "" if path == "." else path
+
+
+def find_target(path, targets):
+    """Return the entry of targets that path is served from, or None."""
+    if path == "":
+        candidates = ("index.html",)
+    else:
+        candidates = (path, f"{path}.html", f"{path}/index.html")
+    for candidate in candidates:
+        if candidate in targets:
+            return candidate
+    return None
+
+
+def list_static_files(static_dir):
+    """Return every file under static_dir relative to it, with / separators."""
+    files = []
+    for root, _, names in os.walk(static_dir):
+        for name in names:
+            files.append(os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/"))
+    return files
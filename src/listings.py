@@ -0,0 +1,131 @@
+import os
+import posixpath
+
+from htmlnode import LeafNode, ParentNode
+from link_index import page_url
+from manifest import BASEPATH_INPUT, TEMPLATE_INPUT
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def title_input(source):
+    """Return the input key of a page's title (relative source path)."""
+    return f"title:{source}"
+
+
+def listing_input(section):
+    """Return the input key that ties a listing page to its section."""
+    return f"listing:{section}"
+
+
+def listing_section(source):
+    """Return the directory whose listing would show source (None for the root index.md)."""
+    directory, name = posixpath.split(source)
+    if name == "index.md":
+        if not directory:
+            return None
+        directory = posixpath.dirname(directory)
+    return directory
+
+
+def find_sections(sources):
+    """Group pages into sections that get a generated listing.
+
+    A section is a directory under the content directory whose direct
+    children are pages (name.md, or sub/index.md) and that has no index.md
+    of its own, which would otherwise collide with the listing.
+
+    Args:
+        sources: Source paths relative to the content directory, with /
+            separators.
+
+    Returns:
+        A dict mapping each section directory ("" for the content root) to
+        the sorted sources listed in it.
+    """
+    sources = set(sources)
+    sections = {}
+    for source in sources:
+        directory = listing_section(source)
+        if directory is not None:
+            sections.setdefault(directory, []).append(source)
+    return {
+        section: sorted(entries)
+        for section, entries in sections.items()
+        if posixpath.join(section, "index.md") not in sources
+    }
+
+
+def listing_output(section, number):
+    """Return the output path of page number (1-based) of a section listing."""
+    if number == 1:
+        return posixpath.join(section, "index.html")
+    return posixpath.join(section, "page", str(number), "index.html")
+
+
+def section_name(section):
+    name = posixpath.basename(section).replace("-", " ").replace("_", " ")
+    return name.title() if name else "Home"
+
+
+def paginate(entries, page_size):
+    """Split entries into pages of at most page_size (one empty page if there are none)."""
+    return [entries[start : start + page_size] for start in range(0, len(entries), page_size)] or [[]]
+
+
+def listing_inputs(section, number, total, entries, titles, template_hash, basepath):
+    """Return the {input key: fingerprint} dependencies of one listing page.
+
+    Besides the template and basepath, a listing page depends on the title
+    of every page it lists, its number and whether it is the last page
+    (which decide its navigation links). Appending a page to a section thus
+    only changes the last listing page (and the one before it when a new
+    page is started).
+    """
+    position = f"{number}/{'last' if number == total else 'more'}"
+    inputs = {TEMPLATE_INPUT: template_hash, BASEPATH_INPUT: basepath, listing_input(section): position}
+    for source in entries:
+        inputs[title_input(source)] = titles[source]
+    return inputs
+
+
+def listing_title(section, number):
+    if number == 1:
+        return section_name(section)
+    return f"{section_name(section)} (page {number})"
+
+
+def listing_node(section, number, total, entries, titles):
+    """Build the HTML tree of one listing page: heading, links to the pages and navigation."""
+    items = [
+        ParentNode("li", [LeafNode("a", titles[source], {"href": page_url(_page_output(source))})])
+        for source in entries
+    ]
+    children = [LeafNode("h1", listing_title(section, number))]
+    if items:
+        children.append(ParentNode("ul", items))
+    navigation = [LeafNode("a", label, {"href": url}) for label, url in _navigation(section, number, total)]
+    if navigation:
+        children.append(ParentNode("nav", navigation))
+    return ParentNode("div", children)
+
+
+def listing_links(section, number, total, entries):
+    """Return the ("link", url) pairs of one listing page, as listing_node links them."""
+    urls = [page_url(_page_output(source)) for source in entries]
+    urls.extend(url for _, url in _navigation(section, number, total))
+    return [("link", url) for url in urls]
+
+
+def _navigation(section, number, total):
+    # (label, url) of the links to the neighbouring listing pages
+    navigation = []
+    if number > 1:
+        navigation.append(("Previous", page_url(listing_output(section, number - 1))))
+    if number < total:
+        navigation.append(("Next", page_url(listing_output(section, number + 1))))
+    return navigation
+
+
+def _page_output(source):
+    return f"{os.path.splitext(source)[0]}.html"
@@ -1,19 +1,56 @@
+import argparse
+import filecmp
 import os
-import re
 import shutil
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-from converters import markdown_to_html_node
+from block_cache import DEFAULT_MAX_ENTRIES, BlockRenderCache
+from build_log import NORMAL, QUIET, VERBOSE, log
+from converters import StreamedDocument, blocks_to_document, markdown_to_document, title_from_lines
+from inline_markdown import scan_block_lines, scan_blocks
+from link_index import LinkIndex, list_static_files
+from listings import (
+    DEFAULT_PAGE_SIZE,
+    find_sections,
+    listing_input,
+    listing_inputs,
+    listing_links,
+    listing_node,
+    listing_output,
+    listing_section,
+    listing_title,
+    paginate,
+)
+from manifest import BASEPATH_INPUT, TEMPLATE_INPUT, BuildManifest, source_input
+from output_writer import DEFAULT_MAX_PENDING, OutputWriter, write_output
+from precompress import available_encodings, precompress_dir, precompress_paths
+from profiling import BuildProfile, StageProfile, profile_stage
+from source_reader import SourceFile, SourceReader, read_source
+from static_sync import COMPARE_MODES, load_state, remove_output_file, sync_dir
+from template import CompiledTemplate
+from watch import DEFAULT_INTERVAL, watch
 
+# Sources at least this large are streamed to their output block by block
+# instead of being read and rendered in memory
+STREAM_THRESHOLD = 8 * 1024 * 1024
 
-def copy_dir_recursive(src, dst):
+
+def copy_dir_recursive(src, dst, clean=True):
     """Recursively copy all contents from src to dst.
 
-    If dst exists it will be removed first to ensure a clean copy.
+    If dst exists it will be removed first to ensure a clean copy, unless
+    clean is False, in which case files are copied over the existing tree.
     
     Args:
         src: Source directory path.
         dst: Destination directory path.
+        clean: Remove dst before copying (default True).
+
+    Returns:
+        The number of files copied.
         
     Raises:
         FileNotFoundError: If source directory does not exist.
@@ -22,22 +59,11 @@ def copy_dir_recursive(src, dst):
         raise FileNotFoundError(f"Source directory does not exist: {src}")
 
     # Remove destination if it exists to ensure a clean copy
-    if os.path.exists(dst):
-        try:
-            if os.path.isfile(dst):
-                os.remove(dst)
-            else:
-                shutil.rmtree(dst)
-        except Exception as e:
-            print(f"Warning: Could not remove {dst}: {e}")
-            import time
-            time.sleep(0.1)
-            try:
-                shutil.rmtree(dst, ignore_errors=True)
-            except:
-                pass
+    if clean:
+        remove_path(dst)
 
     os.makedirs(dst, exist_ok=True)
+    copied = 0
 
     for entry in os.listdir(src):
         path_src = os.path.join(src, entry)
@@ -45,13 +71,34 @@ def copy_dir_recursive(src, dst):
 
         if os.path.isdir(path_src):
             os.makedirs(path_dst, exist_ok=True)
-            copy_dir_recursive(path_src, path_dst)
+            copied += copy_dir_recursive(path_src, path_dst, clean)
         elif os.path.isfile(path_src):
             try:
-                shutil.copy(path_src, path_dst)
-                print(f"Copied file: {path_dst}")
+                # copy2 keeps the mtime, which sync_dir compares
+                shutil.copy2(path_src, path_dst)
+                log.detail(f"Copied file: {path_dst}")
+                copied += 1
             except Exception as e:
-                print(f"Error copying {path_src}: {e}")
+                log.error(f"Error copying {path_src}: {e}")
+    return copied
+
+
+def remove_path(path):
+    """Remove a file or directory tree if it exists, retrying once on failure."""
+    if not os.path.exists(path):
+        return
+    try:
+        if os.path.isfile(path):
+            os.remove(path)
+        else:
+            shutil.rmtree(path)
+    except Exception as e:
+        log.warning(f"Could not remove {path}: {e}")
+        time.sleep(0.1)
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        except:
+            pass
 
 
 def extract_title(markdown):
@@ -66,11 +113,10 @@ def extract_title(markdown):
     Raises:
         ValueError: If no h1 header is found.
     """
-    for line in markdown.split("\n"):
-        match = re.match(r"^#\s+(.+)$", line.strip())
-        if match:
-            return match.group(1).strip()
-    raise ValueError("No h1 header found in markdown")
+    title = title_from_lines(markdown.split("\n"))
+    if title is None:
+        raise ValueError("No h1 header found in markdown")
+    return title
 
 
 def generate_page(from_path, template_path, dest_path, basepath="/"):
@@ -82,79 +128,1257 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         dest_path: Path where the generated HTML should be written.
         basepath: Base path for the site (default "/").
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    log.detail(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    generate_page_from_template(from_path, CompiledTemplate.load(template_path, basepath), dest_path)
 
-    with open(from_path, "r", encoding="utf-8") as markdown_file:
-        markdown_content = markdown_file.read()
 
-    with open(template_path, "r", encoding="utf-8") as template_file:
-        template_content = template_file.read()
+def generate_page_from_template(from_path, template, dest_path, block_cache=None, skip_unchanged=False, links=None):
+    """Generate an HTML page using an already compiled template.
 
-    html_content = markdown_to_html_node(markdown_content).to_html()
-    title = extract_title(markdown_content)
-    page_content = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
-    
-    # Replace root-relative paths with basepath
-    page_content = page_content.replace('href="/', f'href="{basepath}')
-    page_content = page_content.replace("src=\"/", f"src=\"{basepath}")
+    Args:
+        from_path: Path to the source markdown file.
+        template: CompiledTemplate to fill.
+        dest_path: Path where the generated HTML should be written.
+        block_cache: Optional BlockRenderCache for rendered blocks.
+        skip_unchanged: Leave dest_path untouched if it already holds the page.
+        links: Optional list that receives the page's (kind, url) links.
+
+    Sources of at least STREAM_THRESHOLD bytes are streamed with stream_page.
+
+    Returns:
+        A (written, title, source_hash) tuple; written is False if the write
+        was skipped because the output was unchanged, and source_hash is the
+        SHA-256 of the source that was rendered.
+    """
+    source = read_source(from_path)
+    source_hash = source.digest
+    if source.size >= STREAM_THRESHOLD:
+        source.close()
+        return (*stream_page(from_path, template, dest_path, block_cache, skip_unchanged, links), source_hash)
+    markdown_content = source.text
+    source.close()
+
+    title, parts = render_page_parts(markdown_content, template, block_cache, links=links)
+    return write_page_parts(dest_path, parts, skip_unchanged), title, source_hash
+
+
+def render_page_parts(markdown_content, template, block_cache=None, profile=None, links=None):
+    """Render markdown into the template as a list of HTML fragments.
+
+    The HTML tree is streamed into a list buffer instead of being built up
+    as nested strings, and the fragments are spliced into the template
+    without joining them first. The title comes from the same parse pass.
+    With a StageProfile, each stage is run separately and timed. If links
+    is a list, the page's links and images are appended to it as (kind, url)
+    pairs.
+
+    Returns:
+        A (title, parts) tuple.
+    """
+    if profile is not None:
+        return _render_page_parts_profiled(markdown_content, template, block_cache, profile, links)
+
+    content_parts = []
+    document = markdown_to_document(markdown_content, block_cache, links)
+    document.root.write_html(content_parts.append)
+    title = page_title(document)
+    return title, template.render_parts(title, content_parts)
+
+
+def page_title(document):
+    """Return the page title found while parsing.
+
+    It is the title extract_title would return, since both apply
+    converters.title_from_lines to the same lines.
+
+    Raises:
+        ValueError: If the markdown has no h1.
+    """
+    if document.title is None:
+        raise ValueError("No h1 header found in markdown")
+    return document.title
+
+
+def _render_page_parts_profiled(markdown_content, template, block_cache, profile, links):
+    # Blocks are classified lazily, so touch every block type in a stage of its
+    # own before parsing; cache hits would otherwise skip classification.
+    with profile.stage("block_split"):
+        blocks = list(scan_blocks(markdown_content))
+    with profile.stage("block_classify"):
+        for block in blocks:
+            block.block_type
+    with profile.stage("inline_parse"):
+        document = blocks_to_document(blocks, block_cache, links)
+    with profile.stage("html_serialize"):
+        content_parts = []
+        document.root.write_html(content_parts.append)
+    with profile.stage("template_fill"):
+        title = page_title(document)
+        return title, template.render_parts(title, content_parts)
+
+
+def stream_page(from_path, template, dest_path, block_cache=None, skip_unchanged=False, links=None):
+    """Render a markdown file to dest_path without holding either in memory.
+
+    Lines are read lazily from the source, grouped into blocks, rendered and
+    written one block at a time, so peak memory is bounded by the largest
+    block rather than by the document (see StreamedDocument). The page is
+    written to a temporary file and renamed into place; with skip_unchanged
+    an identical existing output is kept instead.
 
+    Returns:
+        A (written, title) tuple; written is False if the write was skipped
+        because the output was unchanged.
+    """
     dest_dir = os.path.dirname(dest_path)
     if dest_dir:
         os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(from_path, "r", encoding="utf-8") as markdown_file:
+            document = StreamedDocument(scan_block_lines(_source_lines(markdown_file)), block_cache, links)
+            title = page_title(document)
+            with open(tmp_path, "w", encoding="utf-8") as output_file:
+                template.write_parts(output_file.write, title, document)
+        if skip_unchanged and os.path.exists(dest_path) and filecmp.cmp(tmp_path, dest_path, shallow=False):
+            os.remove(tmp_path)
+            return False, title
+        os.replace(tmp_path, dest_path)
+        return True, title
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _source_lines(markdown_file):
+    # Text mode already turns \r\n into \n, so this matches read().split("\n")
+    return (line.rstrip("\n") for line in markdown_file)
+
 
-    with open(dest_path, "w", encoding="utf-8") as output_file:
-        output_file.write(page_content)
+def write_page_parts(dest_path, parts, skip_unchanged=False):
+    """Write a page given as a list of fragments, creating directories as needed.
+
+    Returns False if skip_unchanged is set and the file already held the page.
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    return write_output(dest_path, parts, skip_unchanged)
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath="/",
+    jobs=1,
+    block_cache=None,
+    build_profile=None,
+    skip_unchanged=False,
+    link_index=None,
+    manifest=None,
+    listing_page_size=None,
+    minify=False,
+):
     """Recursively generate HTML pages from all markdown files in content directory.
     
     Crawls the content directory structure and generates corresponding HTML files
     in the destination directory, maintaining the same directory structure.
+    All sources are discovered first and the template is compiled once for
+    the whole build; with jobs other than 1 pages are rendered across a
+    process pool. Pages are written in sorted source order either way.
     
     Args:
         dir_path_content: Root path to the content directory (containing markdown files).
         template_path: Path to the HTML template file.
         dest_dir_path: Root path where generated HTML files should be written.
         basepath: Base path for the site (default "/").
+        jobs: Number of worker processes; 0 means one per CPU (default 1).
+        block_cache: Optional BlockRenderCache for rendered blocks.
+        build_profile: Optional BuildProfile that receives per-page stage timings.
+        skip_unchanged: Do not rewrite outputs that already hold the rendered page.
+        link_index: Optional LinkIndex that records the links and images of
+            every generated page.
+        manifest: Optional BuildManifest that records the inputs of every
+            generated page (see page_inputs).
+        listing_page_size: Also generate paginated section listings with
+            this many entries per page (see generate_listings).
+        minify: Minify pages while assembling them (see CompiledTemplate).
+
+    Returns:
+        A dict with the count of "generated" pages (listings included), of
+        output files "written" and left "unchanged", and the bytes
+        "minified" saved.
+
+    Raises:
+        RuntimeError: If any page failed to render (each failure is reported first).
     """
-    for entry in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, entry)
-        dest_path = os.path.join(dest_dir_path, entry)
+    template = CompiledTemplate.load(template_path, basepath, minify)
+    pages = discover_pages(dir_path_content, dest_dir_path)
+    results = render_pages(
+        [from_path for from_path, _ in pages],
+        template,
+        jobs,
+        block_cache,
+        profile=build_profile is not None,
+        collect_links=link_index is not None,
+    )
+    written = write_rendered_pages(
+        pages, results, build_profile, skip_unchanged, template, block_cache, collect_links=link_index is not None
+    )
+    if link_index is not None:
+        record_links(link_index, pages, written["links"], dir_path_content, dest_dir_path)
+    if manifest is not None:
+        template_hash = template.digest
+        for from_path, dest_path in pages:
+            if from_path in written["hashes"]:
+                source = os.path.relpath(from_path, dir_path_content)
+                manifest.record_output(
+                    os.path.relpath(dest_path, dest_dir_path),
+                    source,
+                    page_inputs(source, written["hashes"][from_path], template_hash, basepath),
+                    written["titles"][from_path],
+                )
+    failed = len(written["failed"])
+    stats = {
+        "generated": len(pages),
+        "written": written["written"],
+        "unchanged": written["unchanged"],
+        "minified": written["minified"],
+    }
+    if listing_page_size is not None:
+        titles = {
+            os.path.relpath(from_path, dir_path_content).replace(os.sep, "/"): title
+            for from_path, title in written["titles"].items()
+        }
+        sources = [os.path.relpath(from_path, dir_path_content).replace(os.sep, "/") for from_path, _ in pages]
+        listed = generate_listings(
+            sources,
+            titles,
+            template,
+            dest_dir_path,
+            listing_page_size,
+            manifest if manifest is not None else BuildManifest(),
+            skip_unchanged=skip_unchanged,
+            link_index=link_index,
+        )
+        stats["generated"] += listed["generated"]
+        stats["written"] += listed["written"]
+        stats["unchanged"] += listed["unchanged"]
+        stats["minified"] += listed["minified"]
+        failed += len(listed["failed"])
+    if failed:
+        raise RuntimeError(f"Failed to generate {failed} page(s)")
+    return stats
+
+
+def generate_listings(
+    sources,
+    titles,
+    template,
+    dest_dir_path,
+    page_size,
+    manifest,
+    previous=None,
+    skip_unchanged=False,
+    link_index=None,
+    sections=None,
+):
+    """Write paginated listing pages for every section of the site.
+
+    Sections are found with listings.find_sections; page 1 of a section's
+    listing is its index.html and page N is at page/N/index.html. Titles
+    come from the render pass (or from the previous manifest for pages that
+    were not re-rendered), so listing pages never read the pages they list.
+    Listing pages are written through an OutputWriter like other pages; one
+    that fails to write is dropped from the manifest so the next build
+    retries it.
+
+    Args:
+        sources: Source paths of every page relative to the content
+            directory, with / separators.
+        titles: Dict mapping sources to their titles; pages without a title
+            (they failed to render) are left out of the listings.
+        template: CompiledTemplate for the listing pages.
+        dest_dir_path: Root path of the generated site.
+        page_size: Maximum number of entries per listing page.
+        manifest: BuildManifest that records the inputs of every listing page.
+        previous: Optional BuildManifest of the last build; listing pages
+            built from exactly the same inputs whose output still exists
+            are not rewritten.
+        skip_unchanged: Do not rewrite outputs that already hold the rendered page.
+        link_index: Optional LinkIndex in which the links of every listing
+            page, written or skipped, are recorded.
+        sections: Only generate the listings of these sections (default:
+            every section).
+
+    Returns:
+        A dict with the counts of listing pages "generated" and "skipped",
+        of output files "written" and left "unchanged", the outputs that
+        "failed" to be written and the bytes "minified" saved.
+    """
+    template_hash = template.digest
+    saved_before = template.saved_bytes
+    stats = {"generated": 0, "skipped": 0, "failed": []}
+    outputs = {}
+    with OutputWriter(skip_unchanged=skip_unchanged) as writer:
+        for section, entries in sorted(find_sections(sources).items()):
+            if sections is not None and section not in sections:
+                continue
+            pages = paginate([source for source in entries if source in titles], page_size)
+            for number, page_entries in enumerate(pages, start=1):
+                output = listing_output(section, number)
+                dest_path = os.path.join(dest_dir_path, *output.split("/"))
+                inputs = listing_inputs(
+                    section, number, len(pages), page_entries, titles, template_hash, template.basepath
+                )
+                manifest.record_output(output, None, inputs)
+                if link_index is not None:
+                    link_index.record_listing(output, listing_links(section, number, len(pages), page_entries))
+                if previous is not None and previous.inputs_match(output, inputs) and os.path.exists(dest_path):
+                    stats["skipped"] += 1
+                    continue
+                log.detail(f"Generating listing {dest_path}")
+                content_parts = []
+                listing_node(section, number, len(pages), page_entries, titles).write_html(content_parts.append)
+                outputs[dest_path] = output
+                writer.write(dest_path, template.render_parts(listing_title(section, number), content_parts))
+                stats["generated"] += 1
+
+    for dest_path, error in writer.close():
+        log.error(f"Error writing listing {dest_path}: {error}")
+        manifest.remove_output(outputs[dest_path])
+        stats["failed"].append(outputs[dest_path])
+    stats["generated"] -= len(stats["failed"])
+    stats["written"] = writer.written
+    stats["unchanged"] = writer.unchanged
+    stats["minified"] = template.saved_bytes - saved_before
+    return stats
+
+
+def page_inputs(source, source_hash, template_hash, basepath):
+    """Return the {input key: fingerprint} dependencies of a generated page."""
+    return {source_input(source): source_hash, TEMPLATE_INPUT: template_hash, BASEPATH_INPUT: basepath}
+
+
+def record_links(link_index, pages, links, dir_path_content, dest_dir_path):
+    """Record the collected links of each rendered page in link_index.
+
+    Args:
+        link_index: LinkIndex to update.
+        pages: List of (from_path, dest_path) tuples.
+        links: Dict mapping from_path to its (kind, url) pairs, for the
+            pages that were generated.
+        dir_path_content: Root path to the content directory.
+        dest_dir_path: Root path of the generated site.
+    """
+    for from_path, dest_path in pages:
+        if from_path in links:
+            link_index.record_page(
+                os.path.relpath(from_path, dir_path_content),
+                os.path.relpath(dest_path, dest_dir_path),
+                links[from_path],
+            )
+
+
+def discover_pages(dir_path_content, dest_dir_path):
+    """Find every markdown source under the content directory.
+
+    Args:
+        dir_path_content: Root path to the content directory.
+        dest_dir_path: Root path where generated HTML files should be written.
+
+    Returns:
+        A list of (from_path, dest_path) tuples sorted by source path.
+    """
+    pages = []
+    for root, dirs, files in os.walk(dir_path_content):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".md"):
+                continue
+            from_path = os.path.join(root, name)
+            pages.append((from_path, output_path_for(from_path, dir_path_content, dest_dir_path)))
+    return pages
+
+
+def output_path_for(from_path, dir_path_content, dest_dir_path):
+    """Return the .html output path for a markdown source under dir_path_content."""
+    rel_path = os.path.relpath(from_path, dir_path_content)
+    return os.path.normpath(os.path.join(dest_dir_path, f"{os.path.splitext(rel_path)[0]}.html"))
+
+
+class RenderResult:
+    """Outcome of rendering one page.
+
+    parts holds the page as HTML fragments (a single joined string when it
+    crossed a process boundary); error is a message string when rendering
+    failed. streamed is set, with nothing rendered, for sources of at least
+    STREAM_THRESHOLD bytes, which write_rendered_pages streams instead.
+    cache_changes carries a worker's block cache activity back to the parent
+    process, profile the page's StageProfile when profiling, and links its
+    (kind, url) pairs when links are collected. source_hash is the SHA-256
+    of the source that was rendered and title the page title, both for the
+    build manifest. minified is the number of bytes minification saved.
+    """
+
+    def __init__(self, parts=None, error=None):
+        self.parts = parts
+        self.error = error
+        self.streamed = False
+        self.source_hash = None
+        self.title = None
+        self.cache_changes = None
+        self.profile = None
+        self.links = None
+        self.minified = 0
+
+
+# Per-process render state, installed once per worker by _init_render_worker
+_render_settings = {}
+
+
+def _init_render_worker(template, block_cache=None, in_worker=False, profile=False, collect_links=False):
+    _render_settings["template"] = template
+    _render_settings["block_cache"] = block_cache
+    _render_settings["in_worker"] = in_worker
+    _render_settings["profile"] = profile
+    _render_settings["collect_links"] = collect_links
+    if in_worker and block_cache is not None:
+        block_cache.track_changes()
+
+
+def _render_source(from_path, source=None):
+    """Render one markdown file into a RenderResult instead of raising.
+
+    source is the SourceFile for from_path if it was already read (for
+    hashing); otherwise the file is read here. Errors come back as strings
+    so one bad page neither kills the pool nor hides failures in the other
+    pages.
+    """
+    block_cache = _render_settings["block_cache"]
+    profile = StageProfile() if _render_settings["profile"] else None
+    links = [] if _render_settings["collect_links"] else None
+    try:
+        with profile_stage(profile, "file_read"):
+            if source is None:
+                source = read_source(from_path)
+            source_hash = source.digest
+            if source.size >= STREAM_THRESHOLD:
+                source.close()
+                result = RenderResult()
+                result.streamed = True
+                result.source_hash = source_hash
+                return result
+            markdown_content = source.text
+            source.close()
+        template = _render_settings["template"]
+        saved_before = template.saved_bytes
+        title, parts = render_page_parts(markdown_content, template, block_cache, profile, links)
+        if _render_settings["in_worker"]:
+            # One string pickles far cheaper than thousands of fragments
+            parts = ["".join(parts)]
+        result = RenderResult(parts)
+        result.links = links
+        result.source_hash = source_hash
+        result.title = title
+        result.minified = template.saved_bytes - saved_before
+    except Exception as e:
+        result = RenderResult(error=f"{type(e).__name__}: {e}")
+    result.profile = profile
+
+    if _render_settings["in_worker"] and block_cache is not None:
+        result.cache_changes = block_cache.take_changes()
+    return result
+
+
+def resolve_jobs(jobs):
+    """Translate a --jobs value into a worker count (0 or None means one per CPU)."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def render_pages(
+    from_paths,
+    template,
+    jobs=1,
+    block_cache=None,
+    profile=False,
+    collect_links=False,
+    reader=None,
+    max_pending=DEFAULT_MAX_PENDING,
+):
+    """Render markdown files, in parallel when jobs is greater than 1.
 
-        if os.path.isfile(from_path) and from_path.endswith(".md"):
-            dest_file_path = f"{os.path.splitext(dest_path)[0]}.html"
-            generate_page(from_path, template_path, dest_file_path, basepath)
+    Parsing is pure Python and CPU-bound, so the work is spread over
+    processes rather than threads. Pages are submitted to the pool in small
+    batches, with at most max_pending pages submitted but not yet yielded;
+    a new batch is only submitted when the consumer takes results. A
+    consumer that blocks (an OutputWriter waiting on a slow output volume)
+    therefore stops the workers too, and neither rendered pages nor the
+    sources sent with them pile up in memory.
+    Each worker gets its own copy of block_cache; the hits, misses and new
+    entries it reports are merged back into block_cache as results arrive.
+    Sources already read through reader are rendered from memory (and sent
+    to the workers) instead of being read again.
+
+    Args:
+        from_paths: Markdown source paths to render.
+        template: CompiledTemplate shared by every page.
+        jobs: Number of worker processes; 0 means one per CPU (default 1).
+        block_cache: Optional BlockRenderCache for rendered blocks.
+        profile: Attach a StageProfile to every RenderResult.
+        collect_links: Attach each page's links and images to its RenderResult.
+        reader: Optional SourceReader holding sources read earlier in the build.
+        max_pending: Maximum number of pages in flight in the pool.
+
+    Yields:
+        A RenderResult per source, in the same order as from_paths.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs == 1 or len(from_paths) < 2:
+        _init_render_worker(template, block_cache, profile=profile, collect_links=collect_links)
+        for from_path in from_paths:
+            yield _render_source(from_path, reader.pop(from_path) if reader is not None else None)
+        return
+
+    workers = min(jobs, len(from_paths))
+    # Batches amortize the per-task overhead; two per worker fit in the window
+    batch_size = max(1, min(len(from_paths) // (workers * 4), max_pending // (workers * 2)))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_render_worker,
+        initargs=(template, block_cache, True, profile, collect_links),
+    ) as executor:
+        pending = deque()
+        in_flight = 0
+        for start in range(0, len(from_paths), batch_size):
+            batch = from_paths[start : start + batch_size]
+            while pending and in_flight + len(batch) > max_pending:
+                in_flight -= pending[0][0]
+                yield from _batch_results(pending.popleft()[1], block_cache)
+            sources = [_portable_source(reader, from_path) for from_path in batch]
+            pending.append((len(batch), executor.submit(_render_batch, batch, sources)))
+            in_flight += len(batch)
+        while pending:
+            yield from _batch_results(pending.popleft()[1], block_cache)
+
+
+def _render_batch(from_paths, sources):
+    return [_render_source(from_path, source) for from_path, source in zip(from_paths, sources)]
+
+
+def _batch_results(future, block_cache):
+    for result in future.result():
+        if result.cache_changes is not None:
+            block_cache.merge_changes(result.cache_changes)
+        yield result
+
+
+def _portable_source(reader, from_path):
+    # mmaps cannot be pickled, and sources that will be streamed are not sent at all
+    source = reader.pop(from_path) if reader is not None else None
+    if source is None:
+        return None
+    if source.size >= STREAM_THRESHOLD:
+        source.close()
+        return None
+    portable = SourceFile(from_path, source.raw_bytes())
+    source.close()
+    return portable
+
+
+def write_rendered_pages(
+    pages, results, build_profile=None, skip_unchanged=False, template=None, block_cache=None, collect_links=False
+):
+    """Write rendered pages in order and report failures per file.
+
+    Pages are handed to a background OutputWriter, so writing one page
+    overlaps with rendering the next; write errors are collected and
+    reported once every page has been flushed. Sources too large to render
+    in memory (RenderResult.streamed) are streamed to their output here with
+    stream_page, in the build process.
+
+    Args:
+        pages: List of (from_path, dest_path) tuples.
+        results: Matching iterable of RenderResult objects from render_pages.
+        build_profile: Optional BuildProfile; each page's write is timed and
+            its StageProfile recorded under from_path.
+        skip_unchanged: Do not rewrite outputs that already hold the rendered page.
+        template: CompiledTemplate used for streamed pages.
+        block_cache: Optional BlockRenderCache used for streamed pages.
+        collect_links: Collect the links of streamed pages.
+
+    Returns:
+        A dict with the list of from_paths that "failed" to render or to be
+        written, the counts of files "written" and left "unchanged", and the
+        collected "links", source "hashes" and "titles" of each generated
+        page keyed by from_path, and the bytes "minified" saved.
+    """
+    failed = []
+    sources = {}
+    links = {}
+    hashes = {}
+    titles = {}
+    streamed = {"written": 0, "unchanged": 0}
+    minified = {}
+    with OutputWriter(skip_unchanged=skip_unchanged) as writer:
+        for done, ((from_path, dest_path), result) in enumerate(zip(pages, results), start=1):
+            log.progress(done, len(pages))
+            if result.streamed:
+                result.profile = StageProfile() if build_profile is not None else None
+                result.links = [] if collect_links else None
+                try:
+                    saved_before = template.saved_bytes
+                    with profile_stage(result.profile, "stream"):
+                        page_written, result.title = stream_page(
+                            from_path, template, dest_path, block_cache, skip_unchanged, result.links
+                        )
+                    result.minified = template.saved_bytes - saved_before
+                    streamed["written" if page_written else "unchanged"] += 1
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+            if result.error is not None:
+                log.error(f"Error generating page from {from_path}: {result.error}")
+                failed.append(from_path)
+                continue
+            log.detail(f"Generating page from {from_path} to {dest_path}")
+            if not result.streamed:
+                sources[dest_path] = from_path
+                writer.write(dest_path, result.parts, result.profile)
+            if result.links is not None:
+                links[from_path] = result.links
+            hashes[from_path] = result.source_hash
+            titles[from_path] = result.title
+            minified[from_path] = result.minified
+            if build_profile is not None and result.profile is not None:
+                build_profile.add_page(from_path, result.profile)
+
+    for dest_path, error in writer.close():
+        log.error(f"Error writing page {dest_path}: {error}")
+        failed.append(sources[dest_path])
+        links.pop(sources[dest_path], None)
+        hashes.pop(sources[dest_path], None)
+        titles.pop(sources[dest_path], None)
+        minified.pop(sources[dest_path], None)
+    log.flush()
+    return {
+        "failed": failed,
+        "written": writer.written + streamed["written"],
+        "unchanged": writer.unchanged + streamed["unchanged"],
+        "links": links,
+        "hashes": hashes,
+        "titles": titles,
+        "minified": sum(minified.values()),
+    }
+
+
+def generate_pages_incremental(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    manifest_path,
+    basepath="/",
+    jobs=1,
+    block_cache=None,
+    force=False,
+    build_profile=None,
+    skip_unchanged=False,
+    link_index=None,
+    listing_page_size=None,
+    minify=False,
+):
+    """Regenerate only pages whose inputs changed since the last build.
+
+    The manifest is the dependency graph of the previous build: a page is
+    rebuilt when any input recorded for its output (its source, the
+    template, the basepath, or anything else it read) has a different
+    fingerprint now, when its output is missing, or with force. A template
+    or basepath change therefore rebuilds every page, and a changed source
+    only the outputs that depend on it. Outputs whose source was deleted are
+    removed. Pages that fail to render are left out of the manifest so the
+    next build retries them. Sources are read through a SourceReader:
+    up-to-date sources are hashed and closed without being decoded, and
+    dirty ones are kept for rendering within the reader's retention budget
+    (memory-mapped sources and those past the budget are read again). The
+    manifest records the hash of the bytes that were rendered.
+
+    With a link_index (normally the one saved by the previous build), the
+    entries of regenerated pages are replaced, those of failed and deleted
+    pages dropped, and pages missing from the index are regenerated, so the
+    index always covers the whole site.
+
+    Section listings (with listing_page_size) are recorded in the manifest
+    like pages; a listing page is only rewritten when the titles it lists,
+    its position among the section's pages, the template or the basepath
+    changed, so adding a page to a section rewrites the listing pages that
+    shift and leaves the others alone.
+
+    Args:
+        dir_path_content: Root path to the content directory.
+        template_path: Path to the HTML template file.
+        dest_dir_path: Root path where generated HTML files should be written.
+        manifest_path: Path of the JSON build manifest.
+        basepath: Base path for the site (default "/").
+        jobs: Number of worker processes; 0 means one per CPU (default 1).
+        block_cache: Optional BlockRenderCache for rendered blocks.
+        force: Regenerate every page but still remove outputs of deleted sources.
+        build_profile: Optional BuildProfile that receives per-page stage timings.
+        skip_unchanged: Do not rewrite outputs that already hold the rendered page.
+        link_index: Optional LinkIndex to update in place.
+        listing_page_size: Also generate paginated section listings with
+            this many entries per page (see generate_listings).
+        minify: Minify pages while assembling them (see CompiledTemplate);
+            toggling it changes the template fingerprint and so rebuilds
+            every page.
+
+    Returns:
+        A dict with counts of "generated", "skipped" and "removed" pages
+        (listings included), of output files "written" and left
+        "unchanged", and the bytes "minified" saved.
+
+    Raises:
+        RuntimeError: If any page failed to render (after the manifest is saved).
+    """
+    previous = BuildManifest.load(manifest_path)
+
+    template = CompiledTemplate.load(template_path, basepath, minify)
+    template_hash = template.digest
+
+    current = BuildManifest()
+    stats = {"generated": 0, "skipped": 0, "removed": 0, "written": 0, "unchanged": 0, "minified": 0}
+    dirty = []
+    titles = {}
+    discovered = []
+    reader = SourceReader()
+    fingerprints = {TEMPLATE_INPUT: template_hash, BASEPATH_INPUT: basepath}
+
+    def fingerprint(key):
+        if key not in fingerprints:
+            fingerprints[key] = _input_fingerprint(key, dir_path_content, reader)
+        return fingerprints[key]
+
+    for from_path, dest_path in discover_pages(dir_path_content, dest_dir_path):
+        source = os.path.relpath(from_path, dir_path_content)
+        output = os.path.relpath(dest_path, dest_dir_path)
+        discovered.append(source.replace(os.sep, "/"))
+
+        source_hash = reader.get(from_path).digest
+        fingerprints[source_input(source)] = source_hash
+
+        if (
+            not force
+            and previous.is_output_fresh(output, fingerprint)
+            and os.path.exists(dest_path)
+            and (link_index is None or source in link_index.pages)
+        ):
+            stats["skipped"] += 1
+            entry = previous.outputs[output.replace(os.sep, "/")]
+            current.record_output(output, source, entry["inputs"], entry.get("title"))
+            titles[source.replace(os.sep, "/")] = entry.get("title")
+            reader.release(from_path)
+        else:
+            # Kept for rendering while within the reader's budget; otherwise read again then
+            reader.retain(from_path)
+            dirty.append((from_path, dest_path, source, output))
+
+    pages = [(from_path, dest_path) for from_path, dest_path, *_ in dirty]
+    results = render_pages(
+        [from_path for from_path, _ in pages],
+        template,
+        jobs,
+        block_cache,
+        profile=build_profile is not None,
+        collect_links=link_index is not None,
+        reader=reader,
+    )
+    written = write_rendered_pages(
+        pages, results, build_profile, skip_unchanged, template, block_cache, collect_links=link_index is not None
+    )
+    failed = set(written["failed"])
+    if link_index is not None:
+        for from_path in failed:
+            link_index.remove_page(os.path.relpath(from_path, dir_path_content))
+        record_links(link_index, pages, written["links"], dir_path_content, dest_dir_path)
+    stats["written"] = written["written"]
+    stats["unchanged"] = written["unchanged"]
+    stats["minified"] = written["minified"]
+    for from_path, _, source, output in dirty:
+        if from_path not in failed:
+            title = written["titles"][from_path]
+            inputs = page_inputs(source, written["hashes"][from_path], template_hash, basepath)
+            current.record_output(output, source, inputs, title)
+            titles[source.replace(os.sep, "/")] = title
+            stats["generated"] += 1
+
+    if link_index is not None:
+        # Listing entries are recorded afresh, so sections that are gone lose theirs
+        link_index.remove_listings()
+    if listing_page_size is not None:
+        listed = generate_listings(
+            discovered,
+            {source: title for source, title in titles.items() if title is not None},
+            template,
+            dest_dir_path,
+            listing_page_size,
+            current,
+            None if force else previous,
+            skip_unchanged,
+            link_index,
+        )
+        stats["generated"] += listed["generated"]
+        stats["skipped"] += listed["skipped"]
+        stats["written"] += listed["written"]
+        stats["unchanged"] += listed["unchanged"]
+        stats["minified"] += listed["minified"]
+        failed.update(listed["failed"])
+
+    for output, entry in previous.outputs.items():
+        source = entry.get("source")
+        if output in current.outputs or (source and os.path.exists(os.path.join(dir_path_content, source))):
             continue
+        remove_output_file(dest_dir_path, output)
+        stats["removed"] += 1
+    if link_index is not None:
+        for source, entry in list(link_index.pages.items()):
+            if not entry.get("listing") and not os.path.exists(os.path.join(dir_path_content, source)):
+                link_index.remove_page(source)
+
+    current.save(manifest_path)
+    if failed:
+        raise RuntimeError(f"Failed to generate {len(failed)} page(s)")
+    return stats
+
+
+def _input_fingerprint(key, dir_path_content, reader):
+    # Fingerprint of an input that is not the page being checked; unknown or
+    # deleted inputs yield None, which makes every output listing them stale
+    kind, _, name = key.partition(":")
+    if kind == "source":
+        path = os.path.join(dir_path_content, name)
+        if os.path.isfile(path):
+            return reader.get(path).digest
+    return None
+
 
-        if os.path.isdir(from_path):
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+class SiteWatcher:
+    """Keeps a build warm and regenerates only the outputs touched by a change.
 
+    The template stays compiled and the block cache stays in memory between
+    changes. apply_changes is fed absolute paths by watch.watch:
 
-def main():
+    - a changed or added .md under content/ regenerates that one page;
+    - a removed .md removes its output;
+    - a change to the template recompiles it and regenerates every page;
+    - any change under static/ re-syncs static/ into the output.
+
+    The manifest at manifest_path is kept in step: regenerated pages are
+    recorded with their inputs and title, and removed or failed pages are
+    dropped, so the next incremental build skips what a rebuild already
+    wrote and retries what failed. So is the link index at link_index_path.
+    With listing_page_size, the listings of the sections whose pages were
+    regenerated or removed are rebuilt from the titles kept in the
+    manifest (see _update_listings).
+
+    With a precompress_state_path, the compressed siblings of whatever was
+    written or removed are brought up to date after each change; only
+    those paths are touched, not the whole output tree.
+    """
+
+    def __init__(
+        self,
+        content_dir,
+        static_dir,
+        template_path,
+        dest_dir,
+        static_state_path,
+        basepath="/",
+        block_cache=None,
+        static_compare="mtime",
+        link_static=False,
+        skip_unchanged=False,
+        minify=False,
+        precompress_state_path=None,
+        manifest_path=None,
+        link_index_path=None,
+        listing_page_size=None,
+    ):
+        self.content_dir = os.path.abspath(content_dir)
+        self.static_dir = os.path.abspath(static_dir)
+        self.template_path = os.path.abspath(template_path)
+        self.dest_dir = dest_dir
+        self.static_state_path = static_state_path
+        self.basepath = basepath
+        self.block_cache = block_cache
+        self.static_compare = static_compare
+        self.link_static = link_static
+        self.skip_unchanged = skip_unchanged
+        self.minify = minify
+        self.precompress_state_path = precompress_state_path
+        self.manifest_path = manifest_path
+        self.manifest = BuildManifest.load(manifest_path)
+        self.link_index_path = link_index_path
+        self.link_index = LinkIndex.load(link_index_path) if link_index_path is not None else None
+        self.listing_page_size = listing_page_size
+        self.template = CompiledTemplate.load(template_path, basepath, minify)
+
+    @property
+    def watched_paths(self):
+        return [self.content_dir, self.static_dir, self.template_path]
+
+    def apply_changes(self, changed, removed):
+        """Regenerate outputs affected by the changed and removed paths.
+
+        Returns:
+            A dict with counts of "generated", "unchanged" (rendered but
+            identical on disk), "removed" and "failed" pages, whether static
+            files were "synced" and the number of files "compressed".
+        """
+        stats = {"generated": 0, "unchanged": 0, "removed": 0, "failed": 0, "synced": False, "compressed": 0}
+        content_removed = []
+        # Output paths (relative to dest_dir) whose compressed siblings need updating
+        written = []
+        gone = []
+        content_prefix = self.content_dir + os.sep
+        static_prefix = self.static_dir + os.sep
+
+        if self.template_path in changed:
+            self.template = CompiledTemplate.load(self.template_path, self.basepath, self.minify)
+            sources = [from_path for from_path, _ in discover_pages(self.content_dir, self.dest_dir)]
+        else:
+            sources = [path for path in changed if path.startswith(content_prefix) and path.endswith(".md")]
+
+        for path in removed:
+            if path.startswith(content_prefix) and path.endswith(".md"):
+                output = os.path.relpath(self.output_path(path), self.dest_dir)
+                remove_output_file(self.dest_dir, output)
+                self.manifest.remove_output(output)
+                if self.link_index is not None:
+                    self.link_index.remove_page(os.path.relpath(path, self.content_dir))
+                stats["removed"] += 1
+                content_removed.append(path)
+                gone.append(output)
+
+        if any(path.startswith(static_prefix) for path in changed + removed):
+            sync_dir(self.static_dir, self.dest_dir, self.static_state_path, self.static_compare, self.link_static)
+            stats["synced"] = True
+            written.extend(os.path.relpath(path, self.static_dir) for path in changed if path.startswith(static_prefix))
+            gone.extend(os.path.relpath(path, self.static_dir) for path in removed if path.startswith(static_prefix))
+
+        for from_path in sources:
+            dest_path = self.output_path(from_path)
+            source = os.path.relpath(from_path, self.content_dir)
+            output = os.path.relpath(dest_path, self.dest_dir)
+            links = [] if self.link_index is not None else None
+            try:
+                page_written, title, source_hash = generate_page_from_template(
+                    from_path, self.template, dest_path, self.block_cache, self.skip_unchanged, links
+                )
+            except Exception as e:
+                log.error(f"Error generating page from {from_path}: {type(e).__name__}: {e}")
+                self.manifest.remove_output(output)
+                if self.link_index is not None:
+                    self.link_index.remove_page(source)
+                stats["failed"] += 1
+                continue
+            inputs = page_inputs(source, source_hash, self.template.digest, self.basepath)
+            self.manifest.record_output(output, source, inputs, title)
+            if links is not None:
+                self.link_index.record_page(source, output, links)
+            stats["generated" if page_written else "unchanged"] += 1
+            if page_written:
+                written.append(output)
+
+        if self.listing_page_size is not None and (sources or content_removed):
+            sections = {
+                listing_section(os.path.relpath(path, self.content_dir).replace(os.sep, "/"))
+                for path in sources + content_removed
+            }
+            listings_written, listings_removed = self._update_listings(sections - {None}, stats)
+            written.extend(listings_written)
+            gone.extend(listings_removed)
+
+        if sources or content_removed:
+            if self.manifest_path is not None:
+                self.manifest.save(self.manifest_path)
+            if self.link_index is not None:
+                self.link_index.save(self.link_index_path)
+
+        if self.precompress_state_path is not None and (written or gone):
+            compress_stats = precompress_paths(
+                self.dest_dir, written, gone, self.precompress_state_path, load_state(self.static_state_path)
+            )
+            for path, error in compress_stats["failed"]:
+                log.error(f"Error compressing {path}: {error}")
+            stats["compressed"] = compress_stats["compressed"]
+        return stats
+
+    def output_path(self, from_path):
+        return output_path_for(from_path, self.content_dir, self.dest_dir)
+
+    def _update_listings(self, sections, stats):
+        # Rebuild the listing pages of sections from the titles in the
+        # manifest. The section's previous listing pages are found through
+        # their listing input and dropped first; those the section no longer
+        # has (or whose output is now a page) are then removed from disk.
+        # Returns the section's listing outputs and the removed ones.
+        previous = BuildManifest(dict(self.manifest.outputs))
+        stale = {output for section in sections for output in previous.dependents(listing_input(section))}
+        for output in stale:
+            self.manifest.remove_output(output)
+            if self.link_index is not None:
+                self.link_index.remove_page(output)
+        titles = {
+            entry["source"].replace(os.sep, "/"): entry["title"]
+            for entry in self.manifest.outputs.values()
+            if entry.get("source") is not None and entry.get("title") is not None
+        }
+        listed = generate_listings(
+            list(titles),
+            titles,
+            self.template,
+            self.dest_dir,
+            self.listing_page_size,
+            self.manifest,
+            previous,
+            self.skip_unchanged,
+            self.link_index,
+            sections,
+        )
+        removed = [output for output in stale if output not in self.manifest.outputs]
+        for output in removed:
+            remove_output_file(self.dest_dir, output)
+            stats["removed"] += 1
+        stats["generated"] += listed["written"]
+        stats["unchanged"] += listed["unchanged"]
+        stats["failed"] += len(listed["failed"])
+        current = [output for section in sections for output in self.manifest.dependents(listing_input(section))]
+        return current, removed
+
+    def on_change(self, changed, removed):
+        start = time.perf_counter()
+        stats = self.apply_changes(changed, removed)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        compressed = f", {stats['compressed']} compressed" if stats["compressed"] else ""
+        log.info(
+            f"Rebuilt {stats['generated']} page(s), {stats['unchanged']} unchanged, removed {stats['removed']}, "
+            f"{stats['failed']} failed{', static synced' if stats['synced'] else ''}{compressed} in {elapsed_ms:.0f} ms"
+        )
+
+
+def normalize_basepath(basepath):
+    """Normalize a basepath so it always ends with a slash.
+
+    Path-style basepaths also get a leading slash (e.g. "mysite" ->
+    "/mysite/"), but full URLs (e.g. "https://...") do not.
+    """
+    if basepath == "/":
+        return basepath
+    if basepath.startswith("http://") or basepath.startswith("https://"):
+        if not basepath.endswith("/"):
+            basepath = basepath + "/"
+    else:
+        if not basepath.startswith("/"):
+            basepath = "/" + basepath
+        if not basepath.endswith("/"):
+            basepath = basepath + "/"
+    return basepath
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site from markdown.")
+    parser.add_argument("basepath", nargs="?", default="/", help='base path for the site (default "/")')
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose source, template or basepath changed",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages across N worker processes (0 = one per CPU, default 1)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building (incrementally), watch content/, static/ and the template and rebuild what changes",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"polling interval for --watch when inotify is unavailable (default {DEFAULT_INTERVAL})",
+    )
+    parser.add_argument(
+        "--sync-static",
+        action="store_true",
+        help="sync static/ into docs/ copying only changed files instead of wiping docs/ "
+        "(implied by --incremental and --skip-unchanged)",
+    )
+    parser.add_argument(
+        "--static-compare",
+        choices=COMPARE_MODES,
+        default="mtime",
+        help="how --sync-static detects changed files (default mtime)",
+    )
+    parser.add_argument(
+        "--link-static",
+        action="store_true",
+        help="hard-link static files into docs/ when on the same filesystem",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="do not rewrite pages whose output is already identical, preserving their mtimes",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse whitespace in pages while assembling them (whitespace in <pre> is kept)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br when brotli is installed) next to changed output files "
+        "(implies --skip-unchanged)",
+    )
+    parser.add_argument(
+        "--block-cache",
+        type=int,
+        default=None,
+        metavar="N",
+        help=f"cache up to N rendered blocks by content hash (default {DEFAULT_MAX_ENTRIES} with --block-cache-file, else off)",
+    )
+    parser.add_argument(
+        "--block-cache-file",
+        metavar="PATH",
+        help="persist the block cache to PATH between builds",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build stage per page and write a JSON report",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="PATH",
+        help="where --profile writes its JSON report (default build-profile.json in the project root)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages listed by --profile (default 10)",
+    )
+    parser.add_argument(
+        "--listings",
+        action="store_true",
+        help="generate a paginated listing page for every section without an index.md",
+    )
+    parser.add_argument(
+        "--listing-page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        metavar="N",
+        help=f"entries per listing page with --listings (default {DEFAULT_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="check internal links and images against the link index of the last build, without building",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        dest="log_level",
+        action="store_const",
+        const=QUIET,
+        default=NORMAL,
+        help="only report errors",
+    )
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        dest="log_level",
+        action="store_const",
+        const=VERBOSE,
+        help="also print a line for every generated page and copied file",
+    )
+    args = parser.parse_args(argv)
+    if args.watch:
+        args.incremental = True
+    if args.precompress:
+        # Unchanged outputs must keep their mtimes to keep their compressed siblings
+        args.skip_unchanged = True
+    if args.skip_unchanged:
+        # Wiping docs/ first would leave nothing to compare against
+        args.sync_static = True
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval must be positive")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive integer")
+    if args.block_cache is not None and args.block_cache < 0:
+        parser.error("--block-cache must be 0 or a positive integer")
+    if args.profile_top < 0:
+        parser.error("--profile-top must be 0 or a positive integer")
+    if args.listing_page_size <= 0:
+        parser.error("--listing-page-size must be positive")
+    return args
+
+
+def create_block_cache(args):
+    """Build the BlockRenderCache requested on the command line, or None."""
+    max_entries = args.block_cache
+    if max_entries is None:
+        max_entries = DEFAULT_MAX_ENTRIES if args.block_cache_file else 0
+    if max_entries == 0:
+        return None
+    return BlockRenderCache.load(args.block_cache_file, max_entries)
+
+
+def check_links(link_index_path, static_dir):
+    """Report broken links, missing images and orphan pages from a saved LinkIndex.
+
+    Returns:
+        True if every internal link and image resolves (orphans are only warnings).
+    """
+    if not os.path.exists(link_index_path):
+        log.error(f"Error: no link index at {link_index_path}; build the site first")
+        return False
+    report = LinkIndex.load(link_index_path).check_links(list_static_files(static_dir))
+    for source, url in report["broken_links"]:
+        log.error(f"Broken link in {source}: {url}")
+    for source, url in report["missing_images"]:
+        log.error(f"Missing image in {source}: {url}")
+    for source in report["orphan_pages"]:
+        log.warning(f"Orphan page (no incoming links): {source}")
+    log.info(
+        f"Links: {report['checked']} checked, {len(report['broken_links'])} broken, "
+        f"{len(report['missing_images'])} missing images, {len(report['orphan_pages'])} orphan pages"
+    )
+    return not (report["broken_links"] or report["missing_images"])
+
+
+def main(argv=None):
     """Main entry point for the site generator.
     
     Reads basepath from CLI argument (default "/"), normalizes it appropriately
     for path-style basepaths, then generates the complete site from markdown.
+    With --incremental, only pages affected by changes since the last build
+    (as recorded in the build manifest) are regenerated. With --watch, the
+    process then stays running and rebuilds whatever changes.
     """
-    # Get basepath from CLI arguments, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-
-    # Normalize basepath: ensure it starts and ends with a slash for
-    # path-style basepaths (e.g. "mysite" -> "/mysite/") but do NOT
-    # prepend a slash for full URLs (e.g. "https://..." should remain
-    # as-is, only ensure a trailing slash).
-    if basepath != "/":
-        if basepath.startswith("http://") or basepath.startswith("https://"):
-            if not basepath.endswith("/"):
-                basepath = basepath + "/"
-        else:
-            if not basepath.startswith("/"):
-                basepath = "/" + basepath
-            if not basepath.endswith("/"):
-                basepath = basepath + "/"
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    log.configure(args.log_level)
+    basepath = normalize_basepath(args.basepath)
     
     # Determine project root (parent of src/)
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -162,17 +1386,158 @@ def main():
     docs_dir = os.path.join(project_root, "docs")
     template_path = os.path.join(project_root, "template.html")
     content_dir = os.path.join(project_root, "content")
+    manifest_path = os.path.join(project_root, ".build-manifest.json")
+    static_state_path = os.path.join(project_root, ".static-sync.json")
+    precompress_state_path = os.path.join(project_root, ".precompress.json")
+    link_index_path = os.path.join(project_root, ".link-index.json")
+    if args.check_links:
+        if not check_links(link_index_path, static_dir):
+            sys.exit(1)
+        return
+
+    block_cache = create_block_cache(args)
+    listing_page_size = args.listing_page_size if args.listings else None
+    build_profile = BuildProfile(content_dir) if args.profile else None
+    profile_path = args.profile_output or os.path.join(project_root, "build-profile.json")
+    failed = False
+    start = time.perf_counter()
 
     try:
-        # Copy static files to docs directory
-        copy_dir_recursive(static_dir, docs_dir)
-        print(f"Static files copied to {docs_dir}")
-        
-        # Generate all pages from content directory
-        generate_pages_recursive(content_dir, template_path, docs_dir, basepath)
-        print(f"All pages generated successfully in {docs_dir}")
+        if args.incremental or args.sync_static:
+            # Sync static files into the existing output so unchanged files survive
+            with profile_stage(build_profile, "static_copy"):
+                sync_stats = sync_dir(static_dir, docs_dir, static_state_path, args.static_compare, args.link_static)
+            log.info(
+                f"Static files synced to {docs_dir}: {sync_stats['copied']} copied, "
+                f"{sync_stats['linked']} linked, {sync_stats['unchanged']} unchanged, "
+                f"{sync_stats['removed']} removed"
+            )
+
+            # Without --incremental every page is regenerated, but the manifest
+            # is still used to remove outputs of deleted sources
+            link_index = LinkIndex.load(link_index_path)
+            try:
+                stats = generate_pages_incremental(
+                    content_dir,
+                    template_path,
+                    docs_dir,
+                    manifest_path,
+                    basepath,
+                    args.jobs,
+                    block_cache,
+                    force=not args.incremental,
+                    build_profile=build_profile,
+                    skip_unchanged=args.skip_unchanged,
+                    link_index=link_index,
+                    listing_page_size=listing_page_size,
+                    minify=args.minify,
+                )
+            finally:
+                # Failed pages are already dropped from the index, so it is saved either way
+                link_index.save(link_index_path)
+            log.info(
+                f"Pages: {stats['generated']} generated, {stats['skipped']} up to date, "
+                f"{stats['removed']} removed in {docs_dir}"
+            )
+            if args.skip_unchanged:
+                log.info(f"Output files: {stats['written']} written, {stats['unchanged']} unchanged")
+            if args.minify:
+                log.info(f"Minified: {stats['minified']} bytes saved on {stats['generated']} pages")
+        else:
+            # Start from an empty docs directory, but copy static files through
+            # sync_dir: it keeps their mtimes and records what it copied, so a
+            # later incremental build only copies changes and removes deletions
+            with profile_stage(build_profile, "static_copy"):
+                remove_path(docs_dir)
+                sync_stats = sync_dir(static_dir, docs_dir, static_state_path, args.static_compare, args.link_static)
+            log.info(f"Static files copied to {docs_dir}: {sync_stats['copied'] + sync_stats['linked']} copied")
+            
+            # Generate all pages from content directory, recording their inputs
+            # so the next incremental build can start from this one
+            link_index = LinkIndex()
+            manifest = BuildManifest()
+            try:
+                stats = generate_pages_recursive(
+                    content_dir,
+                    template_path,
+                    docs_dir,
+                    basepath,
+                    args.jobs,
+                    block_cache,
+                    build_profile,
+                    link_index=link_index,
+                    manifest=manifest,
+                    listing_page_size=listing_page_size,
+                    minify=args.minify,
+                )
+            finally:
+                link_index.save(link_index_path)
+                manifest.save(manifest_path)
+            log.info(f"All {stats['generated']} pages generated successfully in {docs_dir}")
+            if args.minify:
+                log.info(f"Minified: {stats['minified']} bytes saved on {stats['generated']} pages")
+
+            # The wipe removed every compressed sibling along with the pages
+            if os.path.exists(precompress_state_path):
+                os.remove(precompress_state_path)
+
+        if args.precompress:
+            with profile_stage(build_profile, "compress"):
+                # Static files (including any .gz shipped in static/) belong to sync_dir
+                compress_stats = precompress_dir(docs_dir, precompress_state_path, load_state(static_state_path))
+            for path, error in compress_stats["failed"]:
+                log.error(f"Error compressing {path}: {error}")
+            log.info(
+                f"Compressed ({', '.join(available_encodings())}): {compress_stats['compressed']} files compressed, "
+                f"{compress_stats['unchanged']} unchanged, {compress_stats['removed']} stale removed"
+            )
+            if compress_stats["failed"]:
+                raise RuntimeError(f"Failed to compress {len(compress_stats['failed'])} file(s)")
     except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
+        log.error(f"Error: {e}")
+        failed = True
+    log.info(f"Build {'failed' if failed else 'finished'} in {time.perf_counter() - start:.2f}s")
+
+    # The profile covers the initial build only, not later watch rebuilds
+    if build_profile is not None:
+        log.info(build_profile.format_summary(args.profile_top))
+        build_profile.write_json(profile_path, args.profile_top)
+        log.info(f"Profile written to {profile_path}")
+
+    if args.watch:
+        watcher = SiteWatcher(
+            content_dir=content_dir,
+            static_dir=static_dir,
+            template_path=template_path,
+            dest_dir=docs_dir,
+            static_state_path=static_state_path,
+            basepath=basepath,
+            block_cache=block_cache,
+            static_compare=args.static_compare,
+            link_static=args.link_static,
+            skip_unchanged=args.skip_unchanged,
+            minify=args.minify,
+            precompress_state_path=precompress_state_path if args.precompress else None,
+            manifest_path=manifest_path,
+            link_index_path=link_index_path,
+            listing_page_size=listing_page_size,
+        )
+        log.info(f"Watching {content_dir}, {static_dir} and {template_path} for changes (Ctrl+C to stop)")
+        try:
+            watch(watcher.watched_paths, watcher.on_change, args.watch_interval)
+        except KeyboardInterrupt:
+            log.info("Stopped watching")
+
+    # Entries are content-addressed, so they stay valid even if the build failed
+    if block_cache is not None:
+        log.info(
+            f"Block cache: {block_cache.hits} hits, {block_cache.misses} misses "
+            f"({block_cache.hit_rate():.0%} hit rate, {len(block_cache)} entries)"
+        )
+        if args.block_cache_file:
+            block_cache.save(args.block_cache_file)
+
+    if failed and not args.watch:
         sys.exit(1)
 
 
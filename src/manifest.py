@@ -0,0 +1,93 @@
+import hashlib
+import os
+
+from state_file import read_state, write_state
+
+MANIFEST_VERSION = 4
+
+# Input keys of the dependency graph; sources are keyed per file with source_input()
+TEMPLATE_INPUT = "template"
+BASEPATH_INPUT = "basepath"
+
+
+def hash_bytes(data):
+    """Return the hex SHA-256 digest of raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """Return the hex SHA-256 digest of a file's contents, read in chunks."""
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def source_input(source):
+    """Return the input key of a markdown source (relative to the content directory)."""
+    return f"source:{source}"
+
+
+class BuildManifest:
+    """On-disk dependency graph of the last build, used to skip unchanged outputs.
+
+    outputs maps each output path (relative to the destination directory)
+    to a dict with the markdown "source" it was generated from (relative to
+    the content directory, None for generated listings), the page "title"
+    (so listings can be rebuilt without re-rendering the pages they list)
+    and its "inputs": every input the output was
+    built from, keyed by input key, with the fingerprint the input had at
+    the time. Pages record their source (source_input, fingerprinted by its
+    SHA-256), the template (TEMPLATE_INPUT, its SHA-256) and the basepath
+    (BASEPATH_INPUT, the basepath itself); anything else an output reads,
+    such as another page or a shared fragment, is recorded the same way
+    under its own key. A changed input therefore invalidates exactly the
+    outputs that list it, and nothing else.
+    """
+
+    def __init__(self, outputs=None):
+        self.outputs = outputs if outputs is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest from disk.
+
+        A missing, unreadable or outdated manifest yields an empty one, which
+        makes the next build a full rebuild.
+        """
+        data = read_state(path, MANIFEST_VERSION)
+        if data is None:
+            return cls()
+        return cls(data.get("outputs") or {})
+
+    def save(self, path):
+        """Write the manifest atomically so an interrupted build never leaves a torn file."""
+        write_state(path, MANIFEST_VERSION, {"outputs": self.outputs}, indent=1, sort_keys=True)
+
+    def record_output(self, output, source, inputs, title=None):
+        """Record that output was built from source and the {key: fingerprint} inputs."""
+        self.outputs[output.replace(os.sep, "/")] = {"source": source, "title": title, "inputs": dict(inputs)}
+
+    def remove_output(self, output):
+        """Forget output, e.g. after its source was deleted or failed to render."""
+        self.outputs.pop(output.replace(os.sep, "/"), None)
+
+    def is_output_fresh(self, output, fingerprint):
+        """Return whether every recorded input of output still has its recorded fingerprint.
+
+        Args:
+            output: Output path relative to the destination directory.
+            fingerprint: Callable returning the current fingerprint of an
+                input key, or None if the input no longer exists.
+        """
+        entry = self.outputs.get(output.replace(os.sep, "/"))
+        if entry is None or not entry.get("inputs"):
+            return False
+        return all(fingerprint(key) == value for key, value in entry["inputs"].items())
+
+    def inputs_match(self, output, inputs):
+        """Return whether output was built from exactly these inputs (no more, no fewer)."""
+        entry = self.outputs.get(output.replace(os.sep, "/"))
+        return entry is not None and entry.get("inputs") == inputs
+
+    def dependents(self, key):
+        """Return the sorted outputs that list key among their inputs."""
+        return sorted(output for output, entry in self.outputs.items() if key in entry.get("inputs", {}))
@@ -0,0 +1,100 @@
+import re
+
+_WHITESPACE = "[ \t\n\r\f]"
+# Whitespace between two tags that spans a line break (template indentation)
+_TAG_GAP = rf"(?<=>){_WHITESPACE}*[\n\r]{_WHITESPACE}*(?=<)"
+# Any other run that a browser renders as a single space
+_RUN = rf"{_WHITESPACE}{{2,}}|[\t\n\r\f]"
+WHITESPACE_PATTERN = re.compile(rf"({_TAG_GAP})|{_RUN}")
+PRE_CLOSE = "</pre>"
+
+
+def _replace_whitespace(match):
+    return "" if match.group(1) else " "
+
+
+def collapse_whitespace(html):
+    """Drop line-broken whitespace between tags and collapse other runs to one space.
+
+    Only ASCII whitespace is touched (a non-breaking space is content).
+    Whitespace between tags on one line is kept as a single space, since
+    between inline elements it is rendered.
+    """
+    return WHITESPACE_PATTERN.sub(_replace_whitespace, html)
+
+
+class HTMLMinifier:
+    """Collapses whitespace in a page's HTML as it is assembled.
+
+    HTML is fed in page order, either whole or as fragments, and the
+    minifier tracks whether it is inside a <pre> element (whose whitespace
+    is kept) across calls: the serializer writes <pre> and </pre> as
+    fragments of their own, while a cached block or a template fragment
+    may hold a whole element. <pre> elements are found with str.find and
+    the text between them is only handed to the regex when it holds
+    whitespace to collapse, so HTML with nothing to collapse (most of what
+    the serializer writes) costs a few scans and is returned as the same
+    object. Tags are matched in lowercase, as the serializer writes them.
+
+    saved counts the characters removed, which are all ASCII, so it is also
+    the number of bytes saved.
+    """
+
+    __slots__ = ("in_pre", "saved")
+
+    def __init__(self, in_pre=False):
+        self.in_pre = in_pre
+        self.saved = 0
+
+    def minify(self, html):
+        pieces = []
+        changed = False
+        position = 0
+        length = len(html)
+        while position < length:
+            if self.in_pre:
+                end = html.find(PRE_CLOSE, position)
+                if end == -1:
+                    pieces.append(html[position:])
+                    break
+                end += len(PRE_CLOSE)
+                pieces.append(html[position:end])
+                self.in_pre = False
+                position = end
+                continue
+            start = _find_pre(html, position)
+            stop = length if start == -1 else start
+            segment = html[position:stop]
+            if "  " in segment or "\n" in segment or "\t" in segment or "\r" in segment or "\f" in segment:
+                collapsed = _collapse_between(html, position, stop)
+                changed = changed or collapsed != segment
+                segment = collapsed
+            pieces.append(segment)
+            if start == -1:
+                break
+            self.in_pre = True
+            position = start
+        if not changed:
+            return html
+        minified = "".join(pieces)
+        self.saved += length - len(minified)
+        return minified
+
+
+def _find_pre(html, position):
+    # Index of the next <pre> opening tag (not <preview> or the like), or -1
+    while True:
+        start = html.find("<pre", position)
+        if start == -1 or html[start + 4 : start + 5] in (">", " ", "\t", "\n", "\r", "\f", "/"):
+            return start
+        position = start + 4
+
+
+def _collapse_between(html, start, stop):
+    # Collapse html[start:stop] with one character of context on each side
+    # (the ">" of a </pre> before it, the "<" of a <pre> after it), so that
+    # a line-broken gap next to a <pre> element is dropped like any other
+    low = start - 1 if start > 0 else start
+    high = stop + 1 if stop < len(html) else stop
+    collapsed = collapse_whitespace(html[low:high])
+    return collapsed[start - low : len(collapsed) - (high - stop)]
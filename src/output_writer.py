@@ -0,0 +1,111 @@
+import os
+import queue
+import threading
+
+from profiling import profile_stage
+
+# Rendered pages that may wait for the writer before render_pages is paused
+DEFAULT_MAX_PENDING = 64
+
+_CLOSE = object()
+
+
+def write_output(dest_path, parts, skip_unchanged=False):
+    """Write parts to dest_path; return False if skipped because it was already identical.
+
+    With skip_unchanged, the page is encoded once and compared with the
+    file on disk: a size mismatch (one stat) rules out most changes, and
+    only files of the same size are read back and compared byte for byte.
+    Skipped files keep their mtime, so mtime-based deploys (rsync) only see
+    pages that really changed.
+    """
+    if not skip_unchanged:
+        with open(dest_path, "w", encoding="utf-8") as output_file:
+            output_file.writelines(parts)
+        return True
+
+    data = "".join(parts).encode("utf-8")
+    try:
+        if os.stat(dest_path).st_size == len(data):
+            with open(dest_path, "rb") as existing_file:
+                if existing_file.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    with open(dest_path, "wb") as output_file:
+        output_file.write(data)
+    return True
+
+
+class OutputWriter:
+    """Writes rendered pages on a background thread.
+
+    write() hands a page to the thread and returns, so the next page can be
+    parsed while the previous one is written (file I/O releases the GIL).
+    The queue is bounded: when the output volume falls behind, write()
+    blocks instead of letting rendered pages pile up in memory. Each output
+    directory is created once per writer, not once per page.
+
+    With skip_unchanged, pages identical to the file on disk are not
+    rewritten (see write_output) and are counted in unchanged.
+
+    A failed write does not stop the thread; close() waits for everything
+    queued and returns the failures.
+    """
+
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING, skip_unchanged=False):
+        self.skip_unchanged = skip_unchanged
+        self.written = 0
+        self.unchanged = 0
+        self._queue = queue.Queue(max_pending)
+        self._created_dirs = set()
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, dest_path, parts, profile=None):
+        """Queue parts (a list of HTML fragments) to be written to dest_path.
+
+        With a StageProfile, the write is timed on it as the "write" stage.
+        """
+        self._queue.put((dest_path, parts, profile))
+
+    def close(self):
+        """Flush all queued pages and stop the thread.
+
+        Returns:
+            A list of (dest_path, error message) tuples for failed writes.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        return self._errors
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _CLOSE:
+                return
+            dest_path, parts, profile = job
+            try:
+                with profile_stage(profile, "write"):
+                    written = self._write(dest_path, parts)
+                if written:
+                    self.written += 1
+                else:
+                    self.unchanged += 1
+            except Exception as e:
+                self._errors.append((dest_path, f"{type(e).__name__}: {e}"))
+
+    def _write(self, dest_path, parts):
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir and dest_dir not in self._created_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            self._created_dirs.add(dest_dir)
+        return write_output(dest_path, parts, self.skip_unchanged)
@@ -0,0 +1,196 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from static_sync import load_state, remove_output_file, save_state
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text outputs worth serving precompressed
+COMPRESSIBLE_EXTENSIONS = frozenset({".html", ".css", ".js", ".svg", ".xml", ".json", ".txt"})
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def _gzip(data):
+    # mtime=0 keeps the .gz reproducible for identical pages
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings():
+    """Return {suffix: compress function}: .gz always, .br when brotli is importable."""
+    encodings = {".gz": _gzip}
+    if brotli is not None:
+        encodings[".br"] = brotli.compress
+    return encodings
+
+
+def precompress_dir(root, state_path=None, managed=(), workers=None, encodings=None):
+    """Write .gz (and .br) siblings for every compressible file under root.
+
+    A sibling carries the mtime of the file it was compressed from, so a
+    sibling with the same mtime is up to date and is not rewritten. Pages
+    left untouched by --skip-unchanged and static files left alone by
+    sync_dir keep their mtimes, so only files whose content changed are
+    compressed again.
+
+    The siblings this stage owns are recorded in a JSON state file at
+    state_path. Only those are ever removed: when the file they were
+    compressed from no longer exists, or when their encoding is no longer
+    available (so they could not be kept up to date). A .gz or .br that
+    this stage did not write, such as a static sitemap.xml.gz, is left
+    alone, and paths in managed (the files sync_dir copied) are never
+    written over.
+
+    Files are compressed on a thread pool: zlib and brotli release the GIL
+    while compressing, and the work is independent per file.
+
+    Args:
+        root: Output directory to walk.
+        state_path: Path of the JSON file recording the siblings written
+            by previous runs (None: nothing is recorded or removed).
+        managed: Relative paths under root owned by another stage.
+        workers: Maximum number of threads (default: ThreadPoolExecutor's).
+        encodings: {suffix: compress function}; defaults to available_encodings().
+
+    Returns:
+        A dict with counts of files "compressed" and "unchanged", of stale
+        siblings "removed", and the list of (path, error message) tuples
+        that "failed".
+    """
+    if encodings is None:
+        encodings = available_encodings()
+    stats = {"compressed": 0, "unchanged": 0, "removed": 0, "failed": []}
+    previous = set(load_state(state_path))
+    managed = set(managed)
+    owned = []
+    stale = []
+    orphans = []
+
+    for dir_path, dirs, files in os.walk(root):
+        dirs.sort()
+        names = set(files)
+        for name in sorted(files):
+            rel_path = os.path.relpath(os.path.join(dir_path, name), root)
+            base, extension = os.path.splitext(name)
+            if extension in COMPRESSED_SUFFIXES and rel_path in previous and rel_path not in managed:
+                if base not in names or extension not in encodings:
+                    orphans.append(rel_path)
+                continue
+            if not _is_compressible(name):
+                continue
+            path = os.path.join(dir_path, name)
+            mtime_ns = os.stat(path).st_mtime_ns
+            suffixes = [suffix for suffix in encodings if rel_path + suffix not in managed]
+            owned.extend(rel_path + suffix for suffix in suffixes)
+            suffixes = [suffix for suffix in suffixes if not _sibling_is_current(path + suffix, mtime_ns)]
+            if suffixes:
+                stale.append((path, suffixes))
+            else:
+                stats["unchanged"] += 1
+
+    for rel_path in orphans:
+        remove_output_file(root, rel_path)
+        stats["removed"] += 1
+
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [(path, executor.submit(compress_file, path, suffixes, encodings)) for path, suffixes in stale]
+        for path, future in futures:
+            try:
+                future.result()
+                stats["compressed"] += 1
+            except Exception as e:
+                stats["failed"].append((path, f"{type(e).__name__}: {e}"))
+
+    # Siblings that failed to compress may still exist, so they stay recorded
+    if state_path is not None:
+        save_state(state_path, owned)
+    return stats
+
+
+def precompress_paths(root, written, removed=(), state_path=None, managed=(), encodings=None):
+    """Bring the siblings of the given outputs up to date, without a walk.
+
+    The targeted form of precompress_dir for watch rebuilds, which know
+    what they wrote and removed: only the files in written are compressed
+    (when their siblings are stale), and only the recorded siblings of the
+    files in removed are deleted. The state file is shared with
+    precompress_dir, so a later batch build still owns these siblings.
+
+    Args:
+        root: Output directory the paths are relative to.
+        written: Relative paths of files that were written or may have
+            changed; paths that are not compressible or no longer exist
+            are skipped.
+        removed: Relative paths of files that were removed.
+        state_path: Path of the JSON file recording the siblings this stage
+            owns (None: nothing is recorded or removed).
+        managed: Relative paths under root owned by another stage.
+        encodings: {suffix: compress function}; defaults to available_encodings().
+
+    Returns:
+        The same dict as precompress_dir.
+    """
+    if encodings is None:
+        encodings = available_encodings()
+    stats = {"compressed": 0, "unchanged": 0, "removed": 0, "failed": []}
+    owned = set(load_state(state_path))
+    managed = set(managed)
+
+    for rel_path in removed:
+        for suffix in COMPRESSED_SUFFIXES:
+            sibling = rel_path + suffix
+            if sibling in owned and sibling not in managed:
+                remove_output_file(root, sibling)
+                owned.discard(sibling)
+                stats["removed"] += 1
+
+    for rel_path in dict.fromkeys(written):
+        if not _is_compressible(rel_path):
+            continue
+        path = os.path.join(root, rel_path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        suffixes = [suffix for suffix in encodings if rel_path + suffix not in managed]
+        owned.update(rel_path + suffix for suffix in suffixes)
+        suffixes = [suffix for suffix in suffixes if not _sibling_is_current(path + suffix, mtime_ns)]
+        if not suffixes:
+            stats["unchanged"] += 1
+            continue
+        try:
+            compress_file(path, suffixes, encodings)
+            stats["compressed"] += 1
+        except Exception as e:
+            stats["failed"].append((path, f"{type(e).__name__}: {e}"))
+
+    if state_path is not None:
+        save_state(state_path, sorted(owned))
+    return stats
+
+
+def compress_file(path, suffixes, encodings):
+    """Write path + suffix for each suffix, stamped with the mtime of path."""
+    with open(path, "rb") as source_file:
+        stat = os.fstat(source_file.fileno())
+        data = source_file.read()
+    for suffix in suffixes:
+        tmp_path = f"{path}{suffix}.tmp"
+        with open(tmp_path, "wb") as compressed_file:
+            compressed_file.write(encodings[suffix](data))
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, path + suffix)
+
+
+def _is_compressible(name):
+    return os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _sibling_is_current(sibling_path, mtime_ns):
+    try:
+        return os.stat(sibling_path).st_mtime_ns == mtime_ns
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,170 @@
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+REPORT_VERSION = 2
+
+STAGES = (
+    "static_copy",
+    "file_read",
+    "block_split",
+    "block_classify",
+    "inline_parse",
+    "html_serialize",
+    "template_fill",
+    "stream",
+    "write",
+    "compress",
+)
+
+# Stages that run on another thread, concurrently with the render stages.
+# Their wall time overlaps the others, so it is left out of shares and page
+# totals, and no block count is taken (it would include other threads' work).
+OVERLAPPING_STAGES = frozenset({"write"})
+
+
+def profile_stage(profile, name):
+    """Time a stage on profile, or do nothing when profile is None."""
+    if profile is None:
+        return nullcontext()
+    return profile.stage(name)
+
+
+class StageProfile:
+    """Wall time and net memory blocks per build stage.
+
+    net_blocks is the change of sys.getallocatedblocks() across a stage:
+    the number of memory blocks a stage leaves allocated (negative when it
+    frees more than it creates). It is not an allocation count, so a stage
+    that allocates and frees a million objects reports about 0. The counter
+    is cheap enough to read around every stage of every page. Overlapping
+    stages record None.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def stage(self, name):
+        return _StageTimer(self, name)
+
+    def add(self, name, seconds, net_blocks=None):
+        totals = self.stages.get(name)
+        if totals is None:
+            self.stages[name] = [seconds, net_blocks]
+        else:
+            totals[0] += seconds
+            if net_blocks is not None:
+                totals[1] = net_blocks if totals[1] is None else totals[1] + net_blocks
+
+    def merge(self, other):
+        for name, (seconds, net_blocks) in other.stages.items():
+            self.add(name, seconds, net_blocks)
+
+    def total_seconds(self):
+        """Seconds spent in the stages that do not overlap the others."""
+        return sum(seconds for name, (seconds, _) in self.stages.items() if name not in OVERLAPPING_STAGES)
+
+    def to_dict(self):
+        return {
+            name: {
+                "seconds": round(self.stages[name][0], 6),
+                "net_blocks": self.stages[name][1],
+                "overlapping": name in OVERLAPPING_STAGES,
+            }
+            for name in STAGES
+            if name in self.stages
+        }
+
+
+class _StageTimer:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+        self.overlapping = name in OVERLAPPING_STAGES
+
+    def __enter__(self):
+        self.blocks = None if self.overlapping else sys.getallocatedblocks()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        net_blocks = None if self.overlapping else sys.getallocatedblocks() - self.blocks
+        self.profile.add(self.name, elapsed, net_blocks)
+
+
+class BuildProfile:
+    """Collects per-page StageProfiles plus build-level stages such as static copy.
+
+    With a root (the content directory), pages are keyed by their path
+    relative to it with / separators, so reports from different checkouts
+    can be compared.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+        self.build = StageProfile()
+        self.pages = {}
+        self.start = time.perf_counter()
+
+    def stage(self, name):
+        return self.build.stage(name)
+
+    def add_page(self, page, profile):
+        if self.root is not None:
+            page = os.path.relpath(page, self.root).replace(os.sep, "/")
+        self.pages[page] = profile
+
+    def totals(self):
+        totals = StageProfile()
+        totals.merge(self.build)
+        for profile in self.pages.values():
+            totals.merge(profile)
+        return totals
+
+    def slowest_pages(self, top=10):
+        ranked = sorted(self.pages.items(), key=lambda item: item[1].total_seconds(), reverse=True)
+        return ranked[:top]
+
+    def report(self, top=10):
+        """Return the machine-readable report as a JSON-compatible dict."""
+        return {
+            "version": REPORT_VERSION,
+            "wall_seconds": round(time.perf_counter() - self.start, 6),
+            "page_count": len(self.pages),
+            "stages": self.totals().to_dict(),
+            "slowest_pages": [
+                {"page": page, "seconds": round(profile.total_seconds(), 6)}
+                for page, profile in self.slowest_pages(top)
+            ],
+            "pages": {page: profile.to_dict() for page, profile in sorted(self.pages.items())},
+        }
+
+    def write_json(self, path, top=10):
+        report_dir = os.path.dirname(path)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.report(top), report_file, indent=1, sort_keys=True)
+
+    def format_summary(self, top=10):
+        """Return a human-readable table of stage totals and the slowest pages."""
+        totals = self.totals()
+        total_seconds = totals.total_seconds() or 1.0
+        lines = [f"{'stage':<16} {'seconds':>10} {'share':>7} {'net blocks':>14}"]
+        for name in STAGES:
+            if name not in totals.stages:
+                continue
+            seconds, net_blocks = totals.stages[name]
+            if name in OVERLAPPING_STAGES:
+                lines.append(f"{name:<16} {seconds:>10.4f} {'overlap':>7} {'-':>14}")
+            else:
+                lines.append(f"{name:<16} {seconds:>10.4f} {seconds / total_seconds:>7.1%} {net_blocks:>14}")
+        slowest = self.slowest_pages(top)
+        if slowest:
+            lines.append(f"Slowest {len(slowest)} page(s):")
+            for page, profile in slowest:
+                lines.append(f"  {profile.total_seconds() * 1000:>9.2f} ms  {page}")
+        return "\n".join(lines)
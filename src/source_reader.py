@@ -0,0 +1,132 @@
+import mmap
+import os
+
+from manifest import hash_bytes
+
+# Sources at least this large are memory-mapped instead of read into bytes
+MMAP_THRESHOLD = 256 * 1024
+# Total bytes of sources a SourceReader keeps between hashing and rendering
+DEFAULT_MAX_RETAINED = 32 * 1024 * 1024
+
+
+class SourceFile:
+    """The raw contents of one markdown source, decoded and hashed on demand.
+
+    data is the file's bytes (or an mmap of them). text decodes it as UTF-8
+    with the same newline translation as a text-mode open(), and digest is
+    its SHA-256 hex digest; both are computed on first access only, so a
+    source that is only hashed is never decoded.
+    """
+
+    __slots__ = ("path", "data", "_text", "_digest")
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self._text = None
+        self._digest = None
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def text(self):
+        if self._text is None:
+            text = str(self.data, "utf-8")
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+            self._text = text
+        return self._text
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = hash_bytes(self.data)
+        return self._digest
+
+    def raw_bytes(self):
+        """Return the contents as bytes (copying them out of an mmap)."""
+        if isinstance(self.data, bytes):
+            return self.data
+        return bytes(self.data)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b""
+        self._text = None
+
+
+def read_source(path):
+    """Read path into a SourceFile with one open, one fstat and one read (or an mmap)."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size >= MMAP_THRESHOLD:
+            return SourceFile(path, mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+        # Ask for one byte more than fstat reported, so a file that grew since is still read whole
+        chunks = []
+        chunk = os.read(fd, size + 1)
+        while chunk:
+            chunks.append(chunk)
+            chunk = os.read(fd, 64 * 1024)
+        return SourceFile(path, chunks[0] if len(chunks) == 1 else b"".join(chunks))
+    finally:
+        os.close(fd)
+
+
+class SourceReader:
+    """Reads each source once per build and shares it between consumers.
+
+    Incremental hashing, rendering and the title fallback all get the same
+    SourceFile from get(), so a page that is hashed and then rebuilt is read
+    from disk once. Callers release() a source when they are done with it,
+    or retain() it for a later consumer. Retained sources are bounded by
+    max_retained bytes, and memory-mapped sources are never retained (each
+    mmap holds a file descriptor), so a build over thousands of sources
+    keeps neither their memory nor their descriptors; a source that was not
+    retained is simply read again by its next get().
+    """
+
+    def __init__(self, max_retained=DEFAULT_MAX_RETAINED):
+        self.max_retained = max_retained
+        self.reads = 0
+        self._files = {}
+        self._retained = {}
+        self._retained_bytes = 0
+
+    def get(self, path):
+        source = self._files.get(path)
+        if source is None:
+            source = read_source(path)
+            self.reads += 1
+            self._files[path] = source
+        return source
+
+    def retain(self, path):
+        """Keep the source read for path if it fits, else release it; return whether it was kept."""
+        source = self._files.get(path)
+        if source is None:
+            return False
+        if path in self._retained:
+            return True
+        if isinstance(source.data, mmap.mmap) or self._retained_bytes + source.size > self.max_retained:
+            self.release(path)
+            return False
+        self._retained[path] = source.size
+        self._retained_bytes += source.size
+        return True
+
+    def pop(self, path):
+        """Remove and return the source read for path, or None if it was not read."""
+        self._retained_bytes -= self._retained.pop(path, 0)
+        return self._files.pop(path, None)
+
+    def release(self, path):
+        source = self.pop(path)
+        if source is not None:
+            source.close()
+
+    def __len__(self):
+        return len(self._files)
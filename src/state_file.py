@@ -0,0 +1,35 @@
+import json
+import os
+
+
+def read_state(path, version):
+    """Return the data of a versioned JSON state file, or None to start over.
+
+    A missing, unreadable or corrupt file, and one written with a different
+    version, all yield None, so callers fall back to empty state.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as state_file:
+            data = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def write_state(path, version, data, **json_options):
+    """Write {"version": version, **data} atomically (temp file + rename).
+
+    An interrupted build therefore never leaves a torn file behind.
+    json_options are passed on to json.dump (e.g. indent, sort_keys).
+    """
+    state_dir = os.path.dirname(path)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as state_file:
+        json.dump({"version": version, **data}, state_file, **json_options)
+    os.replace(tmp_path, path)
@@ -0,0 +1,162 @@
+import os
+import shutil
+
+from manifest import hash_file
+from state_file import read_state, write_state
+
+STATE_VERSION = 1
+COMPARE_MODES = ("mtime", "hash")
+
+
+def sync_dir(src, dst, state_path, compare="mtime", link=False):
+    """Mirror src into dst, copying only files that changed.
+
+    Unlike copy_dir_recursive, dst is never wiped: files are compared by size
+    and mtime (or by content hash), unchanged ones are left alone, and files
+    that were synced by a previous run but no longer exist in src are
+    deleted. Other files in dst (such as generated pages) are not touched.
+    The list of synced files is kept in a JSON state file at state_path.
+
+    Args:
+        src: Source directory path.
+        dst: Destination directory path.
+        state_path: Path of the JSON file recording previously synced files.
+        compare: "mtime" (size and modification time) or "hash" (SHA-256).
+        link: Hard-link files instead of copying when src and dst share a filesystem.
+
+    Returns:
+        A dict with counts of "copied", "linked", "unchanged" and "removed" files.
+
+    Raises:
+        FileNotFoundError: If source directory does not exist.
+        ValueError: If compare is not a known mode.
+    """
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"Source directory does not exist: {src}")
+    if compare not in COMPARE_MODES:
+        raise ValueError(f"Unknown compare mode: {compare}")
+
+    os.makedirs(dst, exist_ok=True)
+    previous = load_state(state_path)
+    synced = []
+    stats = {"copied": 0, "linked": 0, "unchanged": 0, "removed": 0}
+    same_device = link and os.stat(src).st_dev == os.stat(dst).st_dev
+    created_dirs = set()
+
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        rel_dir = os.path.relpath(root, src)
+        for name in sorted(files):
+            path_src = os.path.join(root, name)
+            if not os.path.isfile(path_src):
+                continue
+            rel_path = os.path.normpath(os.path.join(rel_dir, name))
+            path_dst = os.path.join(dst, rel_path)
+            synced.append(rel_path)
+
+            if files_match(path_src, path_dst, compare):
+                stats["unchanged"] += 1
+                continue
+
+            dst_dir = os.path.dirname(path_dst)
+            if dst_dir not in created_dirs:
+                os.makedirs(dst_dir, exist_ok=True)
+                created_dirs.add(dst_dir)
+            if same_device and link_file(path_src, path_dst):
+                stats["linked"] += 1
+            else:
+                copy_file(path_src, path_dst)
+                stats["copied"] += 1
+
+    current = set(synced)
+    for rel_path in previous:
+        if rel_path not in current:
+            remove_output_file(dst, rel_path)
+            stats["removed"] += 1
+
+    save_state(state_path, synced)
+    return stats
+
+
+def files_match(path_src, path_dst, compare="mtime"):
+    """Return True if path_dst already holds the same file as path_src."""
+    try:
+        stat_dst = os.stat(path_dst)
+    except FileNotFoundError:
+        return False
+    stat_src = os.stat(path_src)
+    if (stat_src.st_dev, stat_src.st_ino) == (stat_dst.st_dev, stat_dst.st_ino):
+        return True
+    if stat_src.st_size != stat_dst.st_size:
+        return False
+    if compare == "hash":
+        return hash_file(path_src) == hash_file(path_dst)
+    return stat_src.st_mtime_ns == stat_dst.st_mtime_ns
+
+
+def link_file(path_src, path_dst):
+    """Replace path_dst with a hard link to path_src; return False if linking is not possible."""
+    tmp_path = f"{path_dst}.sync-tmp"
+    try:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.link(path_src, tmp_path)
+    except OSError:
+        return False
+    os.replace(tmp_path, path_dst)
+    return True
+
+
+def copy_file(path_src, path_dst):
+    """Copy a file with its mtime, letting the kernel do the copy where it can.
+
+    os.copy_file_range keeps the data in the kernel and lets filesystems
+    such as btrfs and XFS share extents (reflinks); shutil.copyfile (which
+    uses sendfile on Linux) is the fallback. The copy goes to a temporary
+    file first so readers never see a half-written asset.
+    """
+    tmp_path = f"{path_dst}.sync-tmp"
+    if not _copy_file_range(path_src, tmp_path):
+        shutil.copyfile(path_src, tmp_path)
+    shutil.copystat(path_src, tmp_path)
+    os.replace(tmp_path, path_dst)
+
+
+def _copy_file_range(path_src, path_dst):
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        with open(path_src, "rb") as file_src, open(path_dst, "wb") as file_dst:
+            remaining = os.fstat(file_src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(file_src.fileno(), file_dst.fileno(), remaining)
+                if copied == 0:
+                    return False
+                remaining -= copied
+    except OSError:
+        return False
+    return True
+
+
+def remove_output_file(root, rel_path):
+    """Delete root/rel_path if present and prune directories it leaves empty."""
+    path = os.path.join(root, rel_path)
+    if os.path.isfile(path):
+        os.remove(path)
+    parent = os.path.dirname(path)
+    root = os.path.abspath(root)
+    while os.path.abspath(parent) != root and os.path.isdir(parent) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+def load_state(state_path):
+    """Return the relative paths recorded by the last sync (empty if unknown)."""
+    data = read_state(state_path, STATE_VERSION)
+    if data is None:
+        return []
+    return data.get("files") or []
+
+
+def save_state(state_path, files):
+    write_state(state_path, STATE_VERSION, {"files": files}, indent=1)
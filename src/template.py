@@ -0,0 +1,143 @@
+import re
+
+from htmlnode import escape_attribute
+from manifest import hash_bytes
+from minify import HTMLMinifier
+
+SLOT_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+
+
+def rewrite_root_paths(html, basepath):
+    """Point root-relative href/src attributes at the site basepath."""
+    if basepath == "/":
+        return html
+    if 'href="/' in html:
+        html = html.replace('href="/', f'href="{basepath}')
+    if 'src="/' in html:
+        html = html.replace('src="/', f'src="{basepath}')
+    return html
+
+
+class CompiledTemplate:
+    """A page template split once into static fragments and slots.
+
+    The basepath rewrite is applied to the static fragments at compile time,
+    so rendering a page only rewrites the slot values and assembles the
+    result with a single join.
+
+    With minify, the static fragments are minified once at compile time and
+    the {{ Content }} fragments on their way into the page (see
+    minify.HTMLMinifier); saved_bytes counts the bytes this saved over every
+    page rendered by this instance.
+    """
+
+    def __init__(self, source, basepath="/", minify=False):
+        self.source = source
+        self.basepath = basepath
+        self.minify = minify
+        self.saved_bytes = 0
+        self._parts = []
+        self._slots = {}
+        # Bytes minification saves on the static fragments of every page
+        self._static_saved = 0
+        self._content_in_pre = False
+
+        minifier = HTMLMinifier() if minify else None
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self._parts.append(self._compile_fragment(source[position : match.start()], minifier))
+            self._slots[len(self._parts)] = match.group(1)
+            if minifier is not None and match.group(1) == "Content":
+                self._content_in_pre = minifier.in_pre
+            self._parts.append(None)
+            position = match.end()
+        self._parts.append(self._compile_fragment(source[position:], minifier))
+        if minifier is not None:
+            self._static_saved = minifier.saved
+
+    def _compile_fragment(self, fragment, minifier):
+        fragment = rewrite_root_paths(fragment, self.basepath)
+        if minifier is not None:
+            fragment = minifier.minify(fragment)
+        return fragment
+
+    @classmethod
+    def load(cls, template_path, basepath="/", minify=False):
+        with open(template_path, "r", encoding="utf-8") as template_file:
+            return cls(template_file.read(), basepath, minify)
+
+    @property
+    def digest(self):
+        """SHA-256 of the template source, which covers the minify setting when it is on."""
+        if self.minify:
+            return hash_bytes(f"{self.source}\0minify".encode("utf-8"))
+        return hash_bytes(self.source.encode("utf-8"))
+
+    def render(self, title, content):
+        """Fill the {{ Title }} and {{ Content }} slots and return the page.
+
+        title is plain text and is escaped (quotes included, so the slot also
+        works inside an attribute); content is HTML and is inserted as is.
+        """
+        return "".join(self.render_parts(title, [content]))
+
+    def render_parts(self, title, content_parts):
+        """Fill the slots and return the page as a list of fragments.
+
+        content_parts is a list of HTML fragments (as produced by
+        HTMLNode.write_html), so the page never has to exist as one string.
+        A root-relative href/src never spans two serializer fragments, so
+        rewriting each fragment on its own is equivalent to rewriting the page.
+        The title is escaped, as in render.
+        """
+        title = escape_attribute(title)
+        if self.basepath != "/":
+            content_parts = [rewrite_root_paths(part, self.basepath) for part in content_parts]
+        if self.minify:
+            # One pass over the joined content is far cheaper than one call per fragment
+            minifier = HTMLMinifier(self._content_in_pre)
+            content_parts = [minifier.minify("".join(content_parts))]
+            self.saved_bytes += self._static_saved + minifier.saved
+
+        parts = []
+        for index, part in enumerate(self._parts):
+            name = self._slots.get(index)
+            if name is None:
+                parts.append(part)
+            elif name == "Title":
+                parts.append(title)
+            else:
+                parts.extend(content_parts)
+        return parts
+
+    def write_parts(self, write, title, content):
+        """Stream the page to write, filling {{ Content }} from content.write_html.
+
+        content is anything with a write_html(write) method (an HTMLNode or a
+        converters.StreamedDocument); its fragments are rewritten one by one
+        on their way through, as in render_parts.
+        """
+        title = escape_attribute(title)
+        if self.basepath == "/":
+            write_content = write
+        else:
+            def write_content(part):
+                write(rewrite_root_paths(part, self.basepath))
+        if self.minify:
+            # Streamed pages are minified fragment by fragment, never held whole
+            minifier = HTMLMinifier(self._content_in_pre)
+            write_unminified = write_content
+
+            def write_content(part):
+                write_unminified(minifier.minify(part))
+
+        for index, part in enumerate(self._parts):
+            name = self._slots.get(index)
+            if name is None:
+                write(part)
+            elif name == "Title":
+                write(title)
+            else:
+                content.write_html(write_content)
+        if self.minify:
+            self.saved_bytes += self._static_saved + minifier.saved
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from block_cache import CACHE_VERSION, BlockRenderCache, block_key
+from converters import markdown_to_html_node
+
+
+class TestBlockRenderCache(unittest.TestCase):
+    def test_get_counts_hits_and_misses(self):
+        cache = BlockRenderCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "<p>a</p>")
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_lru_eviction(self):
+        cache = BlockRenderCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+
+    def test_zero_size_stores_nothing(self):
+        cache = BlockRenderCache(max_entries=0)
+        cache.put("a", "A")
+        self.assertEqual(len(cache), 0)
+
+    def test_track_take_and_merge_changes(self):
+        parent = BlockRenderCache()
+        worker = BlockRenderCache()
+        worker.track_changes()
+        worker.get("a")
+        worker.put("a", "A")
+        worker.get("a")
+        parent.merge_changes(worker.take_changes())
+        self.assertEqual((parent.hits, parent.misses), (1, 1))
+        self.assertEqual(parent.get("a"), "A")
+        self.assertEqual(worker.take_changes(), (0, 0, []))
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache", "blocks.json")
+            cache = BlockRenderCache()
+            cache.put("a", "A")
+            cache.put("b", "B")
+            cache.save(path)
+            loaded = BlockRenderCache.load(path, max_entries=1)
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded.get("b"), "B")
+
+    def test_load_outdated_version_is_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "blocks.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"version": CACHE_VERSION + 1, "entries": [["a", "A"]]}, file)
+            self.assertEqual(len(BlockRenderCache.load(path)), 0)
+
+    def test_block_key_is_content_addressed(self):
+        self.assertEqual(block_key("same"), block_key("same"))
+        self.assertNotEqual(block_key("same"), block_key("other"))
+
+
+class TestCachedMarkdownToHTML(unittest.TestCase):
+    MARKDOWN = (
+        "# Title\n\nSome **bold** [link](/x)\n\n```\ncode\n```\n\n"
+        "> quoted _text_\n\n- a\n- b\n\n1. one\n2. two\n\nSome **bold** [link](/x)"
+    )
+
+    def test_cached_output_matches_uncached(self):
+        cache = BlockRenderCache()
+        expected = markdown_to_html_node(self.MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(self.MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(markdown_to_html_node(self.MARKDOWN, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (8, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import unittest
+
+from build_log import NORMAL, QUIET, VERBOSE, BuildLog
+
+
+class TerminalStream(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TestBuildLog(unittest.TestCase):
+    def make_log(self, level, stream=None, progress_interval=60):
+        self.stream = stream if stream is not None else io.StringIO()
+        self.errors = io.StringIO()
+        return BuildLog(level, self.stream, self.errors, progress_interval)
+
+    def test_normal_hides_details(self):
+        log = self.make_log(NORMAL)
+        log.detail("page.html")
+        log.info("Done")
+        self.assertEqual(self.stream.getvalue(), "Done\n")
+
+    def test_quiet_only_reports_errors(self):
+        log = self.make_log(QUIET)
+        log.info("Done")
+        log.error("Broken page")
+        log.warning("Odd page")
+        self.assertEqual(self.stream.getvalue(), "")
+        self.assertEqual(self.errors.getvalue(), "Broken page\nWarning: Odd page\n")
+
+    def test_verbose_details_are_buffered(self):
+        log = self.make_log(VERBOSE)
+        log.detail("a.html")
+        log.detail("b.html")
+        self.assertEqual(self.stream.getvalue(), "")
+        log.flush()
+        self.assertEqual(self.stream.getvalue(), "a.html\nb.html\n")
+
+    def test_error_flushes_details_first(self):
+        log = self.make_log(VERBOSE)
+        log.detail("a.html")
+        log.error("Broken page")
+        self.assertEqual(self.stream.getvalue(), "a.html\n")
+
+    def test_progress_is_rate_limited_and_cleared(self):
+        log = self.make_log(NORMAL, TerminalStream())
+        for done in range(1, 101):
+            log.progress(done, 100)
+        # The first update and the final count are drawn; the rest fall inside the interval
+        self.assertEqual(self.stream.getvalue(), "\rpages: 1/100\rpages: 100/100")
+        log.info("Done")
+        self.assertTrue(self.stream.getvalue().endswith("\r\x1b[KDone\n"))
+
+    def test_progress_not_drawn_without_terminal_or_when_verbose(self):
+        log = self.make_log(NORMAL)
+        log.progress(1, 2)
+        self.assertEqual(self.stream.getvalue(), "")
+        log = self.make_log(VERBOSE, TerminalStream())
+        log.progress(1, 2)
+        self.assertEqual(self.stream.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 
+from block_cache import BlockRenderCache
+from inline_markdown import scan_blocks
 from textnode import TextNode, TextType
-from converters import markdown_to_html_node, text_node_to_html_node
+from converters import StreamedDocument, markdown_to_document, markdown_to_html_node, text_node_to_html_node
 
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
@@ -122,6 +124,69 @@ the **same** even with inline stuff
             '<div><ol><li>first</li><li>second with <a href="https://boot.dev">link</a></li></ol></div>',
         )
 
+    def test_links_are_collected(self):
+        md = "# [Home](/)\n\n![logo](/logo.png) and [a](/a)\n\n```\n[not](/code)\n```\n\n- [b](/b)"
+        links = []
+        markdown_to_html_node(md, links=links)
+        self.assertEqual(links, [("link", "/"), ("image", "/logo.png"), ("link", "/a"), ("link", "/b")])
+
+    def test_links_are_replayed_from_block_cache(self):
+        md = "[a](/a)\n\n> ![img](/i.png)"
+        cache = BlockRenderCache()
+        first = []
+        markdown_to_html_node(md, cache, first)
+        second = []
+        markdown_to_html_node(md, cache, second)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(first, [("link", "/a"), ("image", "/i.png")])
+        self.assertEqual(second, first)
+
+
+class TestMarkdownToDocument(unittest.TestCase):
+    def test_title_is_first_h1_block(self):
+        md = "## Intro\n\n# First  \n\nText\n\n# Second"
+        document = markdown_to_document(md)
+        self.assertEqual(document.title, "First")
+        self.assertEqual(document.root.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_title_from_cached_blocks(self):
+        md = "# Cached title\n\nBody"
+        cache = BlockRenderCache()
+        markdown_to_document(md, cache)
+        document = markdown_to_document(md, cache)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(document.title, "Cached title")
+
+    def test_title_matches_line_scan(self):
+        # Same answer as main.extract_title: the first h1 line, whatever block holds it
+        self.assertEqual(markdown_to_document("text\n# inside a paragraph\n\n# Later").title, "inside a paragraph")
+        self.assertEqual(markdown_to_document("```\n# install deps\n```\n\n# Real Title").title, "install deps")
+
+    def test_no_title_without_h1(self):
+        self.assertIsNone(markdown_to_document("## Intro\n\n#NoSpace").title)
+
+
+class TestStreamedDocument(unittest.TestCase):
+    MARKDOWN = "Intro [a](/a)\n\n# Title\n\n## Section\n\n- one\n- two\n\n```\ncode\n```"
+
+    def test_matches_markdown_to_html_node(self):
+        links = []
+        document = StreamedDocument(scan_blocks(self.MARKDOWN), links=links)
+        self.assertEqual(document.title, "Title")
+        written = []
+        document.write_html(written.append)
+        self.assertEqual("".join(written), markdown_to_html_node(self.MARKDOWN).to_html())
+        self.assertEqual(links, [("link", "/a")])
+
+    def test_renders_lazily_after_title(self):
+        blocks = scan_blocks(self.MARKDOWN)
+        StreamedDocument(blocks)
+        self.assertEqual(next(blocks).lines, ["## Section"])
+
+    def test_empty_document_raises(self):
+        with self.assertRaises(ValueError):
+            StreamedDocument(scan_blocks("")).write_html([].append)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawHTMLNode, escape_attribute, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -20,6 +21,17 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode("p", "hello", props={})
         self.assertEqual(node.props_to_html(), "")
 
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode("img", "", props={"src": "/a?b=1&c=2", "alt": 'say "hi" <now>'})
+        self.assertEqual(node.props_to_html(), ' src="/a?b=1&amp;c=2" alt="say &quot;hi&quot; &lt;now&gt;"')
+
+    def test_props_cache_sees_changed_props(self):
+        props = {"href": "/one"}
+        node = HTMLNode("a", "x", props=props)
+        self.assertEqual(node.props_to_html(), ' href="/one"')
+        props["href"] = "/two"
+        self.assertEqual(node.props_to_html(), ' href="/two"')
+
     def test_to_html_raises(self):
         node = HTMLNode("p", "text")
         with self.assertRaises(NotImplementedError):
@@ -54,6 +66,18 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode(None, "Raw text")
         self.assertEqual(node.to_html(), "Raw text")
 
+    def test_leaf_escapes_text(self):
+        self.assertEqual(LeafNode(None, "< Back & forth >").to_html(), "&lt; Back &amp; forth &gt;")
+        self.assertEqual(LeafNode("code", "a<b").to_html(), "<code>a&lt;b</code>")
+
+    def test_raw_html_is_not_escaped(self):
+        self.assertEqual(RawHTMLNode("<p>a &amp; b</p>").to_html(), "<p>a &amp; b</p>")
+
+    def test_escape_returns_clean_strings_unchanged(self):
+        value = 'plain text with "quotes"'
+        self.assertIs(escape_text(value), value)
+        self.assertEqual(escape_attribute(value), "plain text with &quot;quotes&quot;")
+
     def test_leaf_no_value_raises(self):
         node = LeafNode("p", None)
         with self.assertRaises(ValueError):
@@ -124,5 +148,37 @@ class TestParentNode(unittest.TestCase):
         self.assertEqual(node.to_html(), "<ul><li><b>item 1</b></li><li>item 2</li></ul>")
 
 
+class TestWriteHTML(unittest.TestCase):
+    def build_tree(self):
+        return ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "Hi "), LeafNode("a", "link", {"href": "/x"})]),
+                LeafNode("b", "bold"),
+            ],
+        )
+
+    def test_write_to_list_buffer(self):
+        parts = []
+        self.build_tree().write_html(parts.append)
+        self.assertGreater(len(parts), 1)
+        self.assertEqual("".join(parts), '<div><p>Hi <a href="/x">link</a></p><b>bold</b></div>')
+
+    def test_write_to_file_like_sink(self):
+        sink = io.StringIO()
+        self.build_tree().write_html(sink.write)
+        self.assertEqual(sink.getvalue(), self.build_tree().to_html())
+
+    def test_leaf_value_is_written_unchanged(self):
+        parts = []
+        value = "x" * 1000
+        LeafNode("code", value).write_html(parts.append)
+        self.assertIs(parts[1], value)
+
+    def test_base_write_html_raises(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").write_html([].append)
+
+
 if __name__ == "__main__":
     unittest.main()
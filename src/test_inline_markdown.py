@@ -1,15 +1,21 @@
+import random
 import unittest
 
 from inline_markdown import (
     BlockType,
+    MarkdownBlock,
     block_to_block_type,
+    block_to_block_type_regex,
     extract_markdown_images,
     extract_markdown_links,
     markdown_to_blocks,
+    markdown_to_blocks_split,
+    scan_blocks,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    text_to_textnodes_chained,
 )
 from textnode import TextNode, TextType
 
@@ -297,6 +303,50 @@ class TestTextToTextNodes(unittest.TestCase):
             text_to_textnodes(text)
 
 
+class TestTextToTextNodesEquivalence(unittest.TestCase):
+    FRAGMENTS = [
+        "word", " ", "!", "[", "]", "(", ")", "`", "**", "_", "*",
+        "[link](https://a.dev)", "![img](/a.png)", "![](x)", "[](y)", "](", "![a]", "(u)",
+    ]
+
+    def assert_equivalent(self, text):
+        try:
+            expected = text_to_textnodes_chained(text)
+        except ValueError:
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+            return
+        self.assertEqual(text_to_textnodes(text), expected, text)
+
+    def test_known_cases(self):
+        cases = [
+            "",
+            "plain",
+            "This is **text** with an _italic_ word and a `code block` and an "
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "![a](b)[c](d)",
+            "!![a](b)",
+            "[a](x![c])(d)",
+            "**a `b` c**",
+            "`**not bold**`",
+            "[**bold link**](/x) **and** _after_",
+        ]
+        for text in cases:
+            self.assert_equivalent(text)
+
+    def test_randomized_against_chained_splitters(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            text = "".join(rng.choice(self.FRAGMENTS) for _ in range(rng.randint(0, 12)))
+            self.assert_equivalent(text)
+
+    def test_many_links_in_one_paragraph(self):
+        text = " ".join(f"[l{i}](/p{i})" for i in range(500))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 999)
+        self.assertEqual(nodes, text_to_textnodes_chained(text))
+
+
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
         md = """
@@ -367,6 +417,57 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "This is just a regular paragraph\nwith multiple lines."
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_block_to_block_type_long_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 151))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type(block.replace("\n120. ", "\n12. ")), BlockType.PARAGRAPH)
+
+    def test_block_to_block_type_only_first_character_selects_type(self):
+        self.assertEqual(block_to_block_type("text\n- item"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("# Heading\nsecond line"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- item\n> quote"), BlockType.PARAGRAPH)
+
+
+class TestScanBlocks(unittest.TestCase):
+    LINES = [
+        "", "", " ", "\t", "# Heading", "####### too deep", "## ", "```", "code", "``` ", ">", "> quote",
+        ">no space", "- item", "-item", "1. one", "2. two", "3. three", "10. ten", "plain text", "  indented",
+    ]
+
+    def test_typed_blocks_with_spans(self):
+        markdown = "# Title\n\n\nFirst line\nsecond line\n\n- a\n- b\n\n  \n1. x\n2. y\n"
+        blocks = list(scan_blocks(markdown))
+        self.assertEqual(
+            blocks,
+            [
+                MarkdownBlock(BlockType.HEADING, ["# Title"], 1, 1),
+                MarkdownBlock(BlockType.PARAGRAPH, ["First line", "second line"], 4, 5),
+                MarkdownBlock(BlockType.UNORDERED_LIST, ["- a", "- b"], 7, 8),
+                MarkdownBlock(BlockType.ORDERED_LIST, ["1. x", "2. y"], 11, 12),
+            ],
+        )
+
+    def test_block_text_is_stripped(self):
+        blocks = list(scan_blocks("   padded  \n  lines   "))
+        self.assertEqual(blocks[0].text, "padded  \n  lines")
+
+    def test_randomized_against_split_implementation(self):
+        rng = random.Random(5678)
+        for _ in range(3000):
+            markdown = "\n".join(rng.choice(self.LINES) for _ in range(rng.randint(0, 10)))
+            blocks = list(scan_blocks(markdown))
+            expected = markdown_to_blocks_split(markdown)
+            self.assertEqual([block.text for block in blocks], expected, repr(markdown))
+            self.assertEqual(markdown_to_blocks(markdown), expected)
+            for block in blocks:
+                self.assertEqual(block.block_type, block_to_block_type_regex(block.text), repr(block.text))
+
+    def test_block_to_block_type_matches_regex_implementation(self):
+        rng = random.Random(91011)
+        for _ in range(3000):
+            block = "\n".join(rng.choice(self.LINES) for _ in range(rng.randint(1, 5)))
+            self.assertEqual(block_to_block_type(block), block_to_block_type_regex(block), repr(block))
+
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+
+from link_index import INDEX_VERSION, LinkIndex, find_target, list_static_files, page_url, resolve_url
+
+
+class TestLinkResolution(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html"), "/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+    def test_resolve_url(self):
+        self.assertEqual(resolve_url("/blog/tom", "/"), "blog/tom")
+        self.assertEqual(resolve_url("/", "/blog/"), "")
+        self.assertEqual(resolve_url("../images/a.png#top", "/blog/tom/"), "blog/images/a.png")
+        self.assertEqual(resolve_url("other?x=1", "/blog/"), "blog/other")
+        self.assertIsNone(resolve_url("https://example.com/x", "/"))
+        self.assertIsNone(resolve_url("mailto:someone@example.com", "/"))
+        self.assertIsNone(resolve_url("#section", "/"))
+
+    def test_find_target(self):
+        targets = {"index.html", "blog/tom/index.html", "about.html", "images/a.png"}
+        self.assertEqual(find_target("", targets), "index.html")
+        self.assertEqual(find_target("blog/tom", targets), "blog/tom/index.html")
+        self.assertEqual(find_target("about", targets), "about.html")
+        self.assertEqual(find_target("images/a.png", targets), "images/a.png")
+        self.assertIsNone(find_target("blog", targets))
+
+
+class TestLinkIndex(unittest.TestCase):
+    def make_index(self):
+        index = LinkIndex()
+        index.record_page(
+            "index.md",
+            "index.html",
+            [("link", "/blog/tom"), ("image", "/images/a.png"), ("link", "/blog/tom"), ("link", "https://x.org")],
+        )
+        index.record_page(os.path.join("blog", "tom", "index.md"), os.path.join("blog", "tom", "index.html"), [
+            ("link", "/"),
+            ("link", "/blog/missing"),
+            ("image", "/images/missing.png"),
+        ])
+        index.record_page("orphan.md", "orphan.html", [("link", "/")])
+        return index
+
+    def test_record_page_deduplicates_by_kind(self):
+        entry = self.make_index().pages["index.md"]
+        self.assertEqual(entry, {
+            "output": "index.html",
+            "links": ["/blog/tom", "https://x.org"],
+            "images": ["/images/a.png"],
+        })
+
+    def test_check_links(self):
+        report = self.make_index().check_links(["images/a.png"])
+        tom = os.path.join("blog", "tom", "index.md")
+        self.assertEqual(report["checked"], 6)
+        self.assertEqual(report["broken_links"], [(tom, "/blog/missing")])
+        self.assertEqual(report["missing_images"], [(tom, "/images/missing.png")])
+        self.assertEqual(report["orphan_pages"], ["orphan.md"])
+
+    def test_self_link_does_not_prevent_orphan(self):
+        index = LinkIndex()
+        index.record_page("index.md", "index.html", [])
+        index.record_page("lonely.md", "lonely.html", [("link", "/lonely")])
+        self.assertEqual(index.check_links()["orphan_pages"], ["lonely.md"])
+
+    def test_listing_pages_are_targets_and_link_sources(self):
+        index = LinkIndex()
+        index.record_page("index.md", "index.html", [("link", "/blog/")])
+        index.record_page("blog/post.md", "blog/post.html", [])
+        index.record_listing("blog/index.html", [("link", "/blog/post.html"), ("link", "/blog/page/2/")])
+        report = index.check_links()
+        self.assertEqual(report["broken_links"], [("blog/index.html", "/blog/page/2/")])
+        # The listing links to the post, and is not an orphan itself
+        self.assertEqual(report["orphan_pages"], [])
+
+        index.remove_listings()
+        self.assertEqual(list(index.pages), ["index.md", "blog/post.md"])
+
+    def test_save_and_load_round_trip(self):
+        index = self.make_index()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "state", "links.json")
+            index.save(path)
+            self.assertEqual(LinkIndex.load(path).pages, index.pages)
+
+    def test_load_missing_corrupt_or_outdated_is_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "links.json")
+            self.assertEqual(LinkIndex.load(path).pages, {})
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("{not json")
+            self.assertEqual(LinkIndex.load(path).pages, {})
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"version": INDEX_VERSION + 1, "pages": {"a.md": {}}}, file)
+            self.assertEqual(LinkIndex.load(path).pages, {})
+
+    def test_list_static_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, "images"))
+            for name in ("index.css", os.path.join("images", "a.png")):
+                with open(os.path.join(temp_dir, name), "w", encoding="utf-8") as file:
+                    file.write("x")
+            self.assertEqual(sorted(list_static_files(temp_dir)), ["images/a.png", "index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from listings import find_sections, listing_inputs, listing_node, listing_output, listing_section, paginate, title_input
+
+
+class TestListings(unittest.TestCase):
+    def test_find_sections(self):
+        sources = ["index.md", "blog/b.md", "blog/a/index.md", "docs/index.md", "docs/guide.md", "blog/2024/c.md"]
+        self.assertEqual(
+            find_sections(sources),
+            {"blog": ["blog/a/index.md", "blog/b.md"], "blog/2024": ["blog/2024/c.md"]},
+        )
+
+    def test_listing_section(self):
+        self.assertEqual(listing_section("blog/b.md"), "blog")
+        self.assertEqual(listing_section("blog/a/index.md"), "blog")
+        self.assertEqual(listing_section("about.md"), "")
+        self.assertIsNone(listing_section("index.md"))
+
+    def test_listing_output(self):
+        self.assertEqual(listing_output("blog", 1), "blog/index.html")
+        self.assertEqual(listing_output("blog", 3), "blog/page/3/index.html")
+        self.assertEqual(listing_output("", 2), "page/2/index.html")
+
+    def test_paginate(self):
+        self.assertEqual(paginate([1, 2, 3], 2), [[1, 2], [3]])
+        self.assertEqual(paginate([], 2), [[]])
+
+    def test_listing_inputs_depend_on_titles_and_position(self):
+        titles = {"blog/a.md": "A"}
+        inputs = listing_inputs("blog", 1, 2, ["blog/a.md"], titles, "t", "/")
+        self.assertEqual(inputs[title_input("blog/a.md")], "A")
+        self.assertEqual(inputs, listing_inputs("blog", 1, 3, ["blog/a.md"], titles, "t", "/"))
+        self.assertNotEqual(inputs, listing_inputs("blog", 1, 1, ["blog/a.md"], titles, "t", "/"))
+
+    def test_listing_node(self):
+        titles = {"blog/a.md": "A & B", "blog/c/index.md": "C"}
+        node = listing_node("blog", 2, 3, ["blog/a.md", "blog/c/index.md"], titles)
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>Blog (page 2)</h1><ul>"
+            '<li><a href="/blog/a.html">A &amp; B</a></li>'
+            '<li><a href="/blog/c/">C</a></li></ul>'
+            '<nav><a href="/blog/">Previous</a><a href="/blog/page/3/">Next</a></nav></div>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,19 @@
+import gzip
 import os
 import tempfile
 import unittest
+from unittest import mock
 
-from main import extract_title, generate_page
-from main import generate_pages_recursive
+import source_reader
+from block_cache import BlockRenderCache
+from link_index import LinkIndex
+from manifest import TEMPLATE_INPUT, BuildManifest, source_input
+from profiling import BuildProfile, StageProfile
+from template import CompiledTemplate
+
+import main
+from main import copy_dir_recursive, extract_title, generate_page, render_page_parts, render_pages, stream_page
+from main import SiteWatcher, discover_pages, generate_pages_incremental, generate_pages_recursive, normalize_basepath
 
 
 class TestMainHelpers(unittest.TestCase):
@@ -15,11 +25,61 @@ class TestMainHelpers(unittest.TestCase):
         markdown = "\n  #   Tolkien Fan Club   \nSome text\n"
         self.assertEqual(extract_title(markdown), "Tolkien Fan Club")
 
+    def test_extract_title_skips_non_h1_lines(self):
+        markdown = "#NoSpace\n## Second level\ntext # not a title\n#\tTabbed title"
+        self.assertEqual(extract_title(markdown), "Tabbed title")
+
     def test_extract_title_raises_without_h1(self):
         markdown = "## Not h1\nParagraph"
         with self.assertRaises(ValueError):
             extract_title(markdown)
 
+    def test_copy_dir_recursive_keeps_mtimes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            src = os.path.join(temp_dir, "static")
+            dst = os.path.join(temp_dir, "docs")
+            os.makedirs(os.path.join(src, "images"))
+            os.makedirs(dst)
+            path = os.path.join(src, "images", "a.png")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("png-bytes")
+            os.utime(path, ns=(0, 1_000_000_000))
+            stale = os.path.join(dst, "stale.html")
+            with open(stale, "w", encoding="utf-8") as file:
+                file.write("old")
+
+            self.assertEqual(copy_dir_recursive(src, dst), 1)
+            self.assertFalse(os.path.exists(stale))
+            self.assertEqual(os.stat(os.path.join(dst, "images", "a.png")).st_mtime_ns, 1_000_000_000)
+
+    def test_render_page_title_matches_extract_title(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}")
+        markdown = "```\n# install deps\n```\n\n# Real Title"
+        _, parts = render_page_parts(markdown, template)
+        self.assertTrue("".join(parts).startswith(f"<title>{extract_title(markdown)}</title>"))
+
+    def test_render_page_title_from_paragraph_line(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}")
+        _, parts = render_page_parts("Intro\n#\tTabbed title", template)
+        self.assertTrue("".join(parts).startswith("<title>Tabbed title</title>"))
+        with self.assertRaises(ValueError):
+            render_page_parts("## Not h1", template)
+
+    def test_stream_page_matches_render_page_parts(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}", "/site/")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for markdown in ("# Title\n\n[a](/a)\r\n\n> quote", "text\n#\tLate title\n\n- item\n"):
+                source_path = os.path.join(temp_dir, "page.md")
+                output_path = os.path.join(temp_dir, "out", "page.html")
+                with open(source_path, "w", encoding="utf-8", newline="") as markdown_file:
+                    markdown_file.write(markdown)
+                self.assertTrue(stream_page(source_path, template, output_path)[0])
+                expected = "".join(render_page_parts(markdown.replace("\r\n", "\n"), template)[1])
+                with open(output_path, "r", encoding="utf-8") as output_file:
+                    self.assertEqual(output_file.read(), expected)
+                self.assertFalse(stream_page(source_path, template, output_path, skip_unchanged=True)[0])
+                self.assertEqual(os.listdir(os.path.dirname(output_path)), ["page.html"])
+
     def test_generate_page(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             markdown_path = os.path.join(temp_dir, "index.md")
@@ -74,5 +134,530 @@ class TestMainHelpers(unittest.TestCase):
             self.assertIn("<div><h1>Post</h1><p>Nested page</p></div>", nested_generated)
 
 
+    def test_normalize_basepath(self):
+        self.assertEqual(normalize_basepath("/"), "/")
+        self.assertEqual(normalize_basepath("mysite"), "/mysite/")
+        self.assertEqual(normalize_basepath("https://example.com"), "https://example.com/")
+
+    def test_discover_pages_sorted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            content_dir = os.path.join(temp_dir, "content")
+            os.makedirs(os.path.join(content_dir, "b"), exist_ok=True)
+            os.makedirs(os.path.join(content_dir, "a"), exist_ok=True)
+            for rel in ("index.md", os.path.join("b", "index.md"), os.path.join("a", "index.md"), "notes.txt"):
+                with open(os.path.join(content_dir, rel), "w", encoding="utf-8") as file:
+                    file.write("# T")
+
+            pages = discover_pages(content_dir, os.path.join(temp_dir, "out"))
+
+        dest_paths = [os.path.relpath(dest, os.path.join(temp_dir, "out")) for _, dest in pages]
+        self.assertEqual(dest_paths, ["index.html", os.path.join("a", "index.html"), os.path.join("b", "index.html")])
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content_dir = os.path.join(root, "content")
+        self.template_path = os.path.join(root, "template.html")
+        for i in range(6):
+            os.makedirs(os.path.join(self.content_dir, f"post{i}"), exist_ok=True)
+            with open(os.path.join(self.content_dir, f"post{i}", "index.md"), "w", encoding="utf-8") as file:
+                file.write(f"# Post {i}\n\n[link](/post{i}) with **bold**")
+        with open(self.template_path, "w", encoding="utf-8") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_tree(self, root):
+        tree = {}
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                with open(path, "r", encoding="utf-8") as file:
+                    tree[os.path.relpath(path, root)] = file.read()
+        return tree
+
+    def test_parallel_output_matches_serial(self):
+        serial_dir = os.path.join(self.temp_dir.name, "serial")
+        parallel_dir = os.path.join(self.temp_dir.name, "parallel")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, "/site/")
+        generate_pages_recursive(self.content_dir, self.template_path, parallel_dir, "/site/", jobs=2)
+        self.assertEqual(len(self.read_tree(serial_dir)), 6)
+        self.assertEqual(self.read_tree(serial_dir), self.read_tree(parallel_dir))
+
+    def test_parallel_render_is_bounded_by_max_pending(self):
+        from_paths = [os.path.join(self.content_dir, f"post{i}", "index.md") for i in range(6)]
+        template = CompiledTemplate("{{ Title }}")
+        with mock.patch("main._portable_source", wraps=main._portable_source) as portable:
+            results = render_pages(from_paths, template, jobs=2, max_pending=2)
+            first = next(results)
+            # Nothing beyond the window was submitted before the first result was taken
+            self.assertEqual(portable.call_count, 2)
+            titles = [first.title] + [result.title for result in results]
+        self.assertEqual(titles, [f"Post {i}" for i in range(6)])
+
+    def test_parallel_block_cache_is_merged(self):
+        block_cache = BlockRenderCache()
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        generate_pages_recursive(self.content_dir, self.template_path, output_dir, jobs=2, block_cache=block_cache)
+        self.assertEqual(block_cache.hits + block_cache.misses, 12)
+        self.assertEqual(len(block_cache), 12)
+        generate_pages_recursive(self.content_dir, self.template_path, output_dir, jobs=2, block_cache=block_cache)
+        self.assertEqual(block_cache.hits, 12)
+
+    def test_large_sources_are_streamed(self):
+        with open(os.path.join(self.content_dir, "post1", "index.md"), "w", encoding="utf-8") as file:
+            file.write("No title here")
+        buffered_dir = os.path.join(self.temp_dir.name, "buffered")
+        streamed_dir = os.path.join(self.temp_dir.name, "streamed")
+        link_index = LinkIndex()
+        with self.assertRaises(RuntimeError):
+            generate_pages_recursive(self.content_dir, self.template_path, buffered_dir, "/site/")
+        with mock.patch("main.STREAM_THRESHOLD", 0), self.assertRaises(RuntimeError):
+            generate_pages_recursive(
+                self.content_dir, self.template_path, streamed_dir, "/site/", link_index=link_index
+            )
+        self.assertEqual(self.read_tree(streamed_dir), self.read_tree(buffered_dir))
+        self.assertEqual(len(self.read_tree(streamed_dir)), 5)
+        self.assertEqual(link_index.pages["post2/index.md"]["links"], ["/post2"])
+
+    def test_serial_errors_reported_per_file(self):
+        with open(os.path.join(self.content_dir, "post0", "index.md"), "w", encoding="utf-8") as file:
+            file.write("No title here")
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        with self.assertRaises(RuntimeError):
+            generate_pages_recursive(self.content_dir, self.template_path, output_dir)
+        self.assertEqual(len(self.read_tree(output_dir)), 5)
+
+    def test_errors_reported_per_file(self):
+        with open(os.path.join(self.content_dir, "post3", "index.md"), "w", encoding="utf-8") as file:
+            file.write("No title here")
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        with self.assertRaises(RuntimeError):
+            generate_pages_recursive(self.content_dir, self.template_path, output_dir, jobs=2)
+        generated = self.read_tree(output_dir)
+        self.assertEqual(len(generated), 5)
+        self.assertNotIn(os.path.join("post3", "index.html"), generated)
+
+    def test_write_errors_reported_per_file(self):
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, "post2"), "w", encoding="utf-8") as file:
+            file.write("a file where a directory should be")
+        with self.assertRaises(RuntimeError) as context:
+            generate_pages_recursive(self.content_dir, self.template_path, output_dir)
+        self.assertIn("1 page(s)", str(context.exception))
+        self.assertEqual(len(self.read_tree(output_dir)), 6)
+
+    def test_profiled_build_matches_and_records_every_stage(self):
+        plain_dir = os.path.join(self.temp_dir.name, "plain")
+        profiled_dir = os.path.join(self.temp_dir.name, "profiled")
+        build_profile = BuildProfile()
+        generate_pages_recursive(self.content_dir, self.template_path, plain_dir, "/site/")
+        generate_pages_recursive(
+            self.content_dir, self.template_path, profiled_dir, "/site/", jobs=2, build_profile=build_profile
+        )
+        self.assertEqual(self.read_tree(plain_dir), self.read_tree(profiled_dir))
+        self.assertEqual(len(build_profile.pages), 6)
+        page_stages = set(build_profile.totals().stages)
+        self.assertEqual(
+            page_stages,
+            {"file_read", "block_split", "block_classify", "inline_parse", "html_serialize", "template_fill", "write"},
+        )
+
+    def test_profiled_render_with_block_cache(self):
+        template = CompiledTemplate("{{ Title }}|{{ Content }}")
+        markdown = "# Title\n\nSome *text*\n\n- a\n- b"
+        block_cache = BlockRenderCache()
+        _, expected = render_page_parts(markdown, template)
+        for _ in range(2):
+            profile = StageProfile()
+            self.assertEqual("".join(render_page_parts(markdown, template, block_cache, profile)[1]), "".join(expected))
+        self.assertEqual(block_cache.hits, 3)
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content_dir = os.path.join(root, "content")
+        self.output_dir = os.path.join(root, "public")
+        self.template_path = os.path.join(root, "template.html")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(os.path.join(self.content_dir, "blog", "post"), exist_ok=True)
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\nRoot page")
+        self.write(os.path.join(self.content_dir, "blog", "post", "index.md"), "# Post\n\nNested page")
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def build(self, basepath="/"):
+        return generate_pages_incremental(
+            self.content_dir, self.template_path, self.output_dir, self.manifest_path, basepath
+        )
+
+    def test_sources_are_read_once_per_build(self):
+        with mock.patch("source_reader.read_source", wraps=source_reader.read_source) as hashed, mock.patch(
+            "main.read_source", wraps=source_reader.read_source
+        ) as rendered:
+            self.build()
+        self.assertEqual(hashed.call_count, 2)
+        self.assertEqual(rendered.call_count, 0)
+
+    def test_first_build_generates_everything(self):
+        stats = self.build()
+        self.assertEqual(stats, {"generated": 2, "skipped": 0, "removed": 0, "written": 2, "unchanged": 0, "minified": 0})
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "blog", "post", "index.html")))
+
+    def test_unchanged_build_skips_everything(self):
+        self.build()
+        stats = self.build()
+        self.assertEqual(stats, {"generated": 0, "skipped": 2, "removed": 0, "written": 0, "unchanged": 0, "minified": 0})
+
+    def test_changed_source_regenerates_only_that_page(self):
+        self.build()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\nUpdated")
+        stats = self.build()
+        self.assertEqual(stats, {"generated": 1, "skipped": 1, "removed": 0, "written": 1, "unchanged": 0, "minified": 0})
+        with open(os.path.join(self.output_dir, "index.html"), "r", encoding="utf-8") as file:
+            self.assertIn("<p>Updated</p>", file.read())
+
+    def test_template_or_basepath_change_rebuilds_all(self):
+        self.build()
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build()["generated"], 2)
+        self.assertEqual(self.build("/site/")["generated"], 2)
+
+    def test_recursive_build_records_manifest_for_incremental(self):
+        manifest = BuildManifest()
+        generate_pages_recursive(self.content_dir, self.template_path, self.output_dir, manifest=manifest)
+        self.assertEqual(manifest.dependents(TEMPLATE_INPUT), ["blog/post/index.html", "index.html"])
+        manifest.save(self.manifest_path)
+        self.assertEqual(self.build()["skipped"], 2)
+
+    def test_changed_input_rebuilds_exactly_its_dependents(self):
+        self.build()
+        post = source_input(os.path.join("blog", "post", "index.md"))
+        manifest = BuildManifest.load(self.manifest_path)
+        # index.html reads the post (as a listing would)
+        manifest.outputs["index.html"]["inputs"][post] = manifest.outputs["blog/post/index.html"]["inputs"][post]
+        manifest.save(self.manifest_path)
+
+        self.write(os.path.join(self.content_dir, "blog", "post", "index.md"), "# Post\n\nEdited")
+        self.assertEqual(self.build()["generated"], 2)
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\nEdited")
+        self.assertEqual(self.build()["generated"], 1)
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.output_dir, "index.html"))
+        self.assertEqual(self.build()["generated"], 1)
+
+    def test_failed_page_is_retried(self):
+        self.write(os.path.join(self.content_dir, "index.md"), "No title")
+        with self.assertRaises(RuntimeError):
+            self.build()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home")
+        self.assertEqual(self.build(), {"generated": 1, "skipped": 1, "removed": 0, "written": 1, "unchanged": 0, "minified": 0})
+
+    def test_skip_unchanged_preserves_identical_outputs(self):
+        self.build()
+        output_path = os.path.join(self.output_dir, "index.html")
+        os.utime(output_path, ns=(0, 0))
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}\n")
+        stats = generate_pages_incremental(
+            self.content_dir, self.template_path, self.output_dir, self.manifest_path, skip_unchanged=True
+        )
+        self.assertEqual((stats["generated"], stats["written"], stats["unchanged"]), (2, 2, 0))
+        os.utime(output_path, ns=(0, 0))
+        stats = generate_pages_incremental(
+            self.content_dir, self.template_path, self.output_dir, self.manifest_path, force=True, skip_unchanged=True
+        )
+        self.assertEqual((stats["generated"], stats["written"], stats["unchanged"]), (2, 0, 2))
+        self.assertEqual(os.stat(output_path).st_mtime_ns, 0)
+
+    def test_link_index_is_updated_incrementally(self):
+        link_index = LinkIndex()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n[post](/blog/post)")
+
+        def build():
+            return generate_pages_incremental(
+                self.content_dir, self.template_path, self.output_dir, self.manifest_path, link_index=link_index
+            )
+
+        build()
+        self.assertEqual(link_index.pages["index.md"]["links"], ["/blog/post"])
+        post = os.path.join("blog", "post", "index.md")
+        self.assertEqual(link_index.pages[post]["output"], "blog/post/index.html")
+
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n[gone](/gone)")
+        link_index.remove_page(post)
+        stats = build()
+        # The changed page and the page missing from the index are regenerated
+        self.assertEqual(stats["generated"], 2)
+        self.assertEqual(link_index.check_links()["broken_links"], [("index.md", "/gone")])
+
+        os.remove(os.path.join(self.content_dir, post))
+        build()
+        self.assertEqual(list(link_index.pages), ["index.md"])
+
+    def test_listings_rewrite_only_affected_pages(self):
+        def build():
+            return generate_pages_incremental(
+                self.content_dir, self.template_path, self.output_dir, self.manifest_path, listing_page_size=1
+            )
+
+        self.assertEqual(build()["generated"], 3)
+        with open(os.path.join(self.output_dir, "blog", "index.html"), "r", encoding="utf-8") as file:
+            self.assertIn('<li><a href="/blog/post/">Post</a></li>', file.read())
+        self.assertEqual(build()["skipped"], 3)
+
+        # Appending a post starts page 2 and gives page 1 a "Next" link
+        self.write(os.path.join(self.content_dir, "blog", "zebra.md"), "# Zebra")
+        stats = build()
+        self.assertEqual((stats["generated"], stats["skipped"]), (3, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "blog", "page", "2", "index.html")))
+
+        # A new title only rewrites the listing page that shows it
+        self.write(os.path.join(self.content_dir, "blog", "zebra.md"), "# Zebra crossing")
+        stats = build()
+        self.assertEqual((stats["generated"], stats["skipped"]), (2, 3))
+
+        os.remove(os.path.join(self.content_dir, "blog", "zebra.md"))
+        stats = build()
+        self.assertEqual(stats["removed"], 2)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "page")))
+
+    def test_listing_pages_are_counted_as_output_files(self):
+        def build(force=False):
+            return generate_pages_incremental(
+                self.content_dir,
+                self.template_path,
+                self.output_dir,
+                self.manifest_path,
+                force=force,
+                skip_unchanged=True,
+                listing_page_size=1,
+            )
+
+        stats = build()
+        self.assertEqual((stats["generated"], stats["written"], stats["unchanged"]), (3, 3, 0))
+        stats = build(force=True)
+        self.assertEqual((stats["generated"], stats["written"], stats["unchanged"]), (3, 0, 3))
+
+    def test_listing_pages_are_in_the_link_index(self):
+        link_index = LinkIndex()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n[all posts](/blog/)")
+
+        def build():
+            return generate_pages_incremental(
+                self.content_dir,
+                self.template_path,
+                self.output_dir,
+                self.manifest_path,
+                link_index=link_index,
+                listing_page_size=1,
+            )
+
+        for _ in range(2):
+            # The second build skips the listing but still records its links
+            build()
+            report = link_index.check_links()
+            self.assertEqual((report["broken_links"], report["orphan_pages"]), ([], []))
+        self.assertEqual(link_index.pages["blog/index.html"]["links"], ["/blog/post/"])
+
+        build_without_listings = generate_pages_incremental(
+            self.content_dir, self.template_path, self.output_dir, self.manifest_path, link_index=link_index
+        )
+        self.assertEqual(build_without_listings["removed"], 1)
+        self.assertNotIn("blog/index.html", link_index.pages)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content_dir, "blog", "post", "index.md"))
+        stats = self.build()
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "index.html")))
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content_dir = os.path.join(root, "content")
+        self.static_dir = os.path.join(root, "static")
+        self.output_dir = os.path.join(root, "public")
+        self.template_path = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        os.makedirs(self.static_dir)
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home")
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self.watcher = SiteWatcher(
+            self.content_dir,
+            self.static_dir,
+            self.template_path,
+            self.output_dir,
+            os.path.join(root, "sync.json"),
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def test_changed_page_regenerates_only_that_page(self):
+        path = os.path.join(self.content_dir, "blog", "post.md")
+        stats = self.watcher.apply_changes([path], [])
+        self.assertEqual(stats["generated"], 1)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "blog", "post.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "index.html")))
+
+    def test_removed_page_removes_output(self):
+        path = os.path.join(self.content_dir, "blog", "post.md")
+        self.watcher.apply_changes([path], [])
+        os.remove(path)
+        stats = self.watcher.apply_changes([], [path])
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog")))
+
+    def test_template_change_rebuilds_everything(self):
+        self.write(self.template_path, "<h1>{{ Title }}</h1>")
+        stats = self.watcher.apply_changes([self.watcher.template_path], [])
+        self.assertEqual(stats["generated"], 2)
+        self.assertEqual(self.read(os.path.join(self.output_dir, "index.html")), "<h1>Home</h1>")
+
+    def test_static_change_syncs_static(self):
+        stats = self.watcher.apply_changes([os.path.join(self.watcher.static_dir, "index.css")], [])
+        self.assertTrue(stats["synced"])
+        self.assertEqual(self.read(os.path.join(self.output_dir, "index.css")), "body {}")
+
+    def test_precompress_refreshes_siblings_of_rebuilt_pages(self):
+        watcher = SiteWatcher(
+            self.content_dir,
+            self.static_dir,
+            self.template_path,
+            self.output_dir,
+            os.path.join(self.temp_dir.name, "sync.json"),
+            skip_unchanged=True,
+            precompress_state_path=os.path.join(self.temp_dir.name, "precompress.json"),
+        )
+        path = os.path.join(self.content_dir, "blog", "post.md")
+        sibling = os.path.join(self.output_dir, "blog", "post.html.gz")
+        os.makedirs(self.output_dir)
+        self.write(os.path.join(self.output_dir, "index.html"), "<h1>Home</h1>")
+        self.assertEqual(watcher.apply_changes([path], [])["compressed"], 1)
+        # Only what the rebuild wrote is compressed, not the whole output tree
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "index.html.gz")))
+        self.write(path, "# Post, edited")
+        watcher.apply_changes([path], [])
+        with gzip.open(sibling, "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<title>Post, edited</title><div><h1>Post, edited</h1></div>")
+
+        os.remove(path)
+        watcher.apply_changes([], [path])
+        self.assertFalse(os.path.exists(sibling))
+
+    def test_rebuilds_keep_the_manifest_in_step(self):
+        manifest_path = os.path.join(self.temp_dir.name, "manifest.json")
+        generate_pages_incremental(self.content_dir, self.template_path, self.output_dir, manifest_path)
+        watcher = SiteWatcher(
+            self.content_dir,
+            self.static_dir,
+            self.template_path,
+            self.output_dir,
+            os.path.join(self.temp_dir.name, "sync.json"),
+            manifest_path=manifest_path,
+        )
+        path = os.path.join(self.content_dir, "blog", "post.md")
+        self.write(path, "# Post, edited")
+        watcher.apply_changes([path], [])
+        self.assertEqual(BuildManifest.load(manifest_path).outputs["blog/post.html"]["title"], "Post, edited")
+        # The next incremental build finds the page up to date
+        stats = generate_pages_incremental(self.content_dir, self.template_path, self.output_dir, manifest_path)
+        self.assertEqual((stats["generated"], stats["skipped"]), (0, 2))
+
+        os.remove(path)
+        watcher.apply_changes([], [path])
+        self.assertEqual(list(BuildManifest.load(manifest_path).outputs), ["index.html"])
+
+    def test_rebuilds_keep_section_listings_up_to_date(self):
+        root = self.temp_dir.name
+        manifest_path = os.path.join(root, "manifest.json")
+        link_index_path = os.path.join(root, "links.json")
+        link_index = LinkIndex()
+        generate_pages_incremental(
+            self.content_dir,
+            self.template_path,
+            self.output_dir,
+            manifest_path,
+            link_index=link_index,
+            listing_page_size=1,
+        )
+        link_index.save(link_index_path)
+        watcher = SiteWatcher(
+            self.content_dir,
+            self.static_dir,
+            self.template_path,
+            self.output_dir,
+            os.path.join(root, "sync.json"),
+            manifest_path=manifest_path,
+            link_index_path=link_index_path,
+            listing_page_size=1,
+        )
+        listing = os.path.join(self.output_dir, "blog", "index.html")
+        second_page = os.path.join(self.output_dir, "blog", "page", "2", "index.html")
+
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        self.write(post, "# Post, renamed")
+        watcher.apply_changes([post], [])
+        self.assertIn(">Post, renamed</a>", self.read(listing))
+
+        zebra = os.path.join(self.content_dir, "blog", "zebra.md")
+        self.write(zebra, "# Zebra")
+        stats = watcher.apply_changes([zebra], [])
+        # The new page, the page 2 it starts and page 1's "Next" link
+        self.assertEqual(stats["generated"], 3)
+        self.assertIn(">Zebra</a>", self.read(second_page))
+        self.assertEqual(LinkIndex.load(link_index_path).check_links()["orphan_pages"], [])
+
+        os.remove(zebra)
+        watcher.apply_changes([], [zebra])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog", "page")))
+        self.assertNotIn("blog/page/2/index.html", BuildManifest.load(manifest_path).outputs)
+        self.assertNotIn("blog/page/2/index.html", LinkIndex.load(link_index_path).pages)
+        # The next incremental build finds everything up to date
+        stats = generate_pages_incremental(
+            self.content_dir,
+            self.template_path,
+            self.output_dir,
+            manifest_path,
+            link_index=LinkIndex.load(link_index_path),
+            listing_page_size=1,
+        )
+        self.assertEqual((stats["generated"], stats["removed"]), (0, 0))
+
+    def test_failed_page_is_counted(self):
+        path = os.path.join(self.content_dir, "index.md")
+        self.write(path, "no title")
+        stats = self.watcher.apply_changes([path], [])
+        self.assertEqual(stats["failed"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
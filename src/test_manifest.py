@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import unittest
+
+from manifest import BASEPATH_INPUT, TEMPLATE_INPUT, BuildManifest, hash_bytes, source_input
+
+
+class TestBuildManifest(unittest.TestCase):
+    INPUTS = {source_input("index.md"): "123", TEMPLATE_INPUT: "abc", BASEPATH_INPUT: "/site/"}
+
+    def test_load_missing_returns_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manifest = BuildManifest.load(os.path.join(temp_dir, "missing.json"))
+        self.assertEqual(manifest.outputs, {})
+
+    def test_load_corrupt_returns_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "manifest.json")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("{not json")
+            manifest = BuildManifest.load(path)
+        self.assertEqual(manifest.outputs, {})
+
+    def test_load_outdated_version_returns_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "manifest.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump({"version": 1, "pages": {"index.md": {"hash": "1", "output": "index.html"}}}, file)
+            manifest = BuildManifest.load(path)
+        self.assertEqual(manifest.outputs, {})
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "manifest.json")
+            manifest = BuildManifest()
+            manifest.record_output("index.html", "index.md", self.INPUTS, "Home")
+            manifest.save(path)
+
+            loaded = BuildManifest.load(path)
+        self.assertEqual(loaded.outputs, {"index.html": {"source": "index.md", "title": "Home", "inputs": self.INPUTS}})
+        self.assertTrue(loaded.is_output_fresh("index.html", self.INPUTS.get))
+
+    def test_any_changed_input_makes_output_stale(self):
+        manifest = BuildManifest()
+        manifest.record_output("index.html", "index.md", self.INPUTS)
+        for key in self.INPUTS:
+            fingerprints = dict(self.INPUTS, **{key: "changed"})
+            self.assertFalse(manifest.is_output_fresh("index.html", fingerprints.get))
+        self.assertFalse(manifest.is_output_fresh("other.html", self.INPUTS.get))
+
+    def test_deleted_input_makes_output_stale(self):
+        manifest = BuildManifest()
+        manifest.record_output("index.html", "index.md", dict(self.INPUTS, **{source_input("shared.md"): "9"}))
+        self.assertFalse(manifest.is_output_fresh("index.html", self.INPUTS.get))
+
+    def test_inputs_match_requires_the_same_keys(self):
+        manifest = BuildManifest()
+        manifest.record_output("blog/index.html", None, {TEMPLATE_INPUT: "t", "title:blog/a.md": "A"})
+        self.assertTrue(manifest.inputs_match("blog/index.html", {TEMPLATE_INPUT: "t", "title:blog/a.md": "A"}))
+        self.assertFalse(
+            manifest.inputs_match("blog/index.html", {TEMPLATE_INPUT: "t", "title:blog/a.md": "A", "title:b.md": "B"})
+        )
+        self.assertFalse(manifest.inputs_match("other.html", {}))
+
+    def test_dependents(self):
+        manifest = BuildManifest()
+        manifest.record_output("b.html", "b.md", {source_input("b.md"): "1", TEMPLATE_INPUT: "t"})
+        manifest.record_output("a.html", "a.md", {source_input("a.md"): "2", TEMPLATE_INPUT: "t"})
+        self.assertEqual(manifest.dependents(TEMPLATE_INPUT), ["a.html", "b.html"])
+        self.assertEqual(manifest.dependents(source_input("a.md")), ["a.html"])
+        manifest.remove_output("a.html")
+        self.assertEqual(manifest.dependents(source_input("a.md")), [])
+
+    def test_hash_bytes_is_stable(self):
+        self.assertEqual(hash_bytes(b"hello"), hash_bytes(b"hello"))
+        self.assertNotEqual(hash_bytes(b"hello"), hash_bytes(b"world"))
+
+
+if __name__ == "__main__":
+    unittest.main()
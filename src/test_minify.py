@@ -0,0 +1,52 @@
+import unittest
+
+from minify import HTMLMinifier, collapse_whitespace
+
+
+class TestCollapseWhitespace(unittest.TestCase):
+    def test_drops_indentation_between_tags(self):
+        self.assertEqual(collapse_whitespace("<ul>\n  <li>a</li>\n</ul>"), "<ul><li>a</li></ul>")
+
+    def test_collapses_runs_to_one_space(self):
+        self.assertEqual(collapse_whitespace("<b>a</b>  <i>b</i>\tc"), "<b>a</b> <i>b</i> c")
+
+    def test_keeps_non_breaking_space(self):
+        self.assertEqual(collapse_whitespace("a\\u00a0\\u00a0b".encode().decode("unicode_escape")), "a  b")
+
+
+class TestHTMLMinifier(unittest.TestCase):
+    def test_clean_fragments_are_returned_as_is(self):
+        minifier = HTMLMinifier()
+        part = "a single-spaced sentence"
+        self.assertIs(minifier.minify(part), part)
+        self.assertEqual(minifier.saved, 0)
+
+    def test_pre_is_preserved_across_fragments(self):
+        minifier = HTMLMinifier()
+        parts = ["<p>", "a  b", "</p>", "<pre>", "<code>", "x\n    y", "</code>", "</pre>", "c  d"]
+        self.assertEqual(
+            "".join(minifier.minify(part) for part in parts),
+            "<p>a b</p><pre><code>x\n    y</code></pre>c d",
+        )
+        self.assertEqual(minifier.saved, 2)
+
+    def test_pre_inside_one_fragment(self):
+        minifier = HTMLMinifier()
+        html = "<div>\n  <pre>x  y</pre>\n  <p>a  b</p>\n</div>"
+        minified = minifier.minify(html)
+        self.assertEqual(minified, "<div><pre>x  y</pre><p>a b</p></div>")
+        self.assertFalse(minifier.in_pre)
+        self.assertEqual(minifier.saved, len(html) - len(minified))
+
+    def test_tag_gap_next_to_pre_is_dropped(self):
+        minifier = HTMLMinifier()
+        self.assertEqual(minifier.minify("<p>a</p>\n<pre>x\n</pre>\n<p>b</p>"), "<p>a</p><pre>x\n</pre><p>b</p>")
+
+    def test_other_tags_starting_with_pre_are_not_pre(self):
+        minifier = HTMLMinifier()
+        self.assertEqual(minifier.minify("<preview>a  b</preview>"), "<preview>a b</preview>")
+        self.assertFalse(minifier.in_pre)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from output_writer import OutputWriter, write_output
+from profiling import StageProfile
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, *names):
+        with open(os.path.join(self.root, *names), "r", encoding="utf-8") as file:
+            return file.read()
+
+    def test_writes_pages_in_background(self):
+        with OutputWriter(max_pending=2) as writer:
+            for i in range(10):
+                writer.write(os.path.join(self.root, "posts", f"{i}.html"), ["<p>", str(i), "</p>"])
+        self.assertEqual(writer.written, 10)
+        self.assertEqual(writer.close(), [])
+        self.assertEqual(self.read("posts", "7.html"), "<p>7</p>")
+
+    def test_each_directory_created_once(self):
+        with mock.patch("output_writer.os.makedirs", wraps=os.makedirs) as makedirs:
+            with OutputWriter() as writer:
+                for i in range(5):
+                    writer.write(os.path.join(self.root, "a", f"{i}.html"), ["a"])
+                    writer.write(os.path.join(self.root, "b", f"{i}.html"), ["b"])
+        self.assertEqual(makedirs.call_count, 2)
+
+    def test_errors_are_collected_until_close(self):
+        blocker = os.path.join(self.root, "blocked")
+        with open(blocker, "w", encoding="utf-8") as file:
+            file.write("not a directory")
+        writer = OutputWriter()
+        writer.write(os.path.join(blocker, "page.html"), ["x"])
+        writer.write(os.path.join(self.root, "ok.html"), ["ok"])
+        errors = writer.close()
+        self.assertEqual([dest_path for dest_path, _ in errors], [os.path.join(blocker, "page.html")])
+        self.assertEqual(self.read("ok.html"), "ok")
+
+    def test_skip_unchanged(self):
+        path = os.path.join(self.root, "page.html")
+        self.assertTrue(write_output(path, ["<p>", "a", "</p>"], skip_unchanged=True))
+        os.utime(path, ns=(0, 0))
+        self.assertFalse(write_output(path, ["<p>a</p>"], skip_unchanged=True))
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        self.assertTrue(write_output(path, ["<p>b</p>"], skip_unchanged=True))
+        self.assertEqual(self.read("page.html"), "<p>b</p>")
+
+    def test_writer_counts_unchanged(self):
+        with OutputWriter(skip_unchanged=True) as writer:
+            writer.write(os.path.join(self.root, "a.html"), ["a"])
+        with OutputWriter(skip_unchanged=True) as writer:
+            writer.write(os.path.join(self.root, "a.html"), ["a"])
+            writer.write(os.path.join(self.root, "b.html"), ["b"])
+        self.assertEqual((writer.written, writer.unchanged), (1, 1))
+
+    def test_write_is_profiled(self):
+        profile = StageProfile()
+        with OutputWriter() as writer:
+            writer.write(os.path.join(self.root, "page.html"), ["x"], profile)
+        self.assertIn("write", profile.stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
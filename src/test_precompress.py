@@ -0,0 +1,128 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from precompress import available_encodings, precompress_dir, precompress_paths
+
+
+class PrecompressTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        os.makedirs(os.path.join(self.root, "blog"))
+        self.write("index.html", "<h1>Home</h1>")
+        self.write(os.path.join("blog", "post.html"), "<h1>Post</h1>")
+        self.write("image.png", "png-bytes")
+        self.state_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.state_dir.name, ".precompress.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        self.state_dir.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.root, rel_path), "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def path(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+
+class TestPrecompressDir(PrecompressTestCase):
+    def test_compresses_text_files_only(self):
+        stats = precompress_dir(self.root, encodings={".gz": available_encodings()[".gz"]})
+        self.assertEqual(stats, {"compressed": 2, "unchanged": 0, "removed": 0, "failed": []})
+        with gzip.open(self.path("index.html.gz"), "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<h1>Home</h1>")
+        self.assertFalse(os.path.exists(self.path("image.png.gz")))
+
+    def test_only_changed_files_are_recompressed(self):
+        precompress_dir(self.root)
+        sibling = self.path(os.path.join("blog", "post.html.gz"))
+        sibling_mtime = os.stat(sibling).st_mtime_ns
+        self.write("index.html", "<h1>Home, edited</h1>")
+        os.utime(self.path("index.html"), ns=(0, 0))
+
+        stats = precompress_dir(self.root)
+        self.assertEqual((stats["compressed"], stats["unchanged"]), (1, 1))
+        self.assertEqual(os.stat(sibling).st_mtime_ns, sibling_mtime)
+        with gzip.open(self.path("index.html.gz"), "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<h1>Home, edited</h1>")
+
+    def test_stale_siblings_are_removed(self):
+        gz = available_encodings()[".gz"]
+        precompress_dir(self.root, self.state_path, encodings={".gz": gz, ".br": lambda data: data})
+        os.remove(self.path(os.path.join("blog", "post.html")))
+        self.write("archive.tar.gz", "not a sibling")
+
+        stats = precompress_dir(self.root, self.state_path, encodings={".gz": gz})
+        self.assertEqual(stats["removed"], 3)
+        self.assertFalse(os.path.exists(self.path("blog")))
+        self.assertFalse(os.path.exists(self.path("index.html.br")))
+        self.assertTrue(os.path.exists(self.path("index.html.gz")))
+        self.assertTrue(os.path.exists(self.path("archive.tar.gz")))
+
+    def test_siblings_it_did_not_write_are_kept(self):
+        # A static sitemap.xml.gz with no sitemap.xml next to it, and a
+        # static style.css.gz shipped alongside style.css
+        self.write("sitemap.xml.gz", "from static/")
+        self.write("style.css", "body {}")
+        self.write("style.css.gz", "from static/")
+        managed = ["sitemap.xml.gz", "style.css", "style.css.gz"]
+        gz = {".gz": available_encodings()[".gz"]}
+
+        for _ in range(2):
+            stats = precompress_dir(self.root, self.state_path, managed, encodings=gz)
+            self.assertEqual(stats["removed"], 0)
+        for rel_path in ("sitemap.xml.gz", "style.css.gz"):
+            with open(self.path(rel_path), encoding="utf-8") as file:
+                self.assertEqual(file.read(), "from static/")
+
+        # Without a record of writing it, an orphaned sibling is not ours to delete
+        self.write("old.html.gz", "unknown")
+        self.assertEqual(precompress_dir(self.root, self.state_path, encodings=gz)["removed"], 0)
+        self.assertTrue(os.path.exists(self.path("old.html.gz")))
+
+    def test_failures_are_reported_per_file(self):
+        def fail(data):
+            raise ValueError("boom")
+
+        stats = precompress_dir(self.root, encodings={".gz": fail})
+        self.assertEqual(len(stats["failed"]), 2)
+        self.assertEqual(stats["failed"][0][1], "ValueError: boom")
+
+
+class TestPrecompressPaths(PrecompressTestCase):
+    def test_only_given_paths_are_touched(self):
+        gz = {".gz": available_encodings()[".gz"]}
+        stats = precompress_paths(self.root, ["index.html", "image.png", "gone.html"], [], self.state_path, encodings=gz)
+        self.assertEqual(stats, {"compressed": 1, "unchanged": 0, "removed": 0, "failed": []})
+        self.assertFalse(os.path.exists(self.path(os.path.join("blog", "post.html.gz"))))
+
+        # Siblings written by either stage are removed along with their page
+        precompress_dir(self.root, self.state_path, encodings=gz)
+        os.remove(self.path("index.html"))
+        os.remove(self.path(os.path.join("blog", "post.html")))
+        removed = ["index.html", os.path.join("blog", "post.html")]
+        stats = precompress_paths(self.root, [], removed, self.state_path, encodings=gz)
+        self.assertEqual(stats["removed"], 2)
+        self.assertEqual(os.listdir(self.root), ["image.png"])
+
+    def test_siblings_it_did_not_write_are_kept(self):
+        self.write("style.css", "body {}")
+        self.write("style.css.gz", "from static/")
+        gz = {".gz": available_encodings()[".gz"]}
+
+        precompress_paths(self.root, ["style.css"], [], self.state_path, ["style.css", "style.css.gz"], gz)
+        os.remove(self.path("style.css"))
+        self.write("index.html.gz", "unknown")
+        stats = precompress_paths(self.root, [], ["style.css", "index.html"], self.state_path, ["style.css.gz"], gz)
+        self.assertEqual(stats["removed"], 0)
+        with open(self.path("style.css.gz"), encoding="utf-8") as file:
+            self.assertEqual(file.read(), "from static/")
+        self.assertTrue(os.path.exists(self.path("index.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
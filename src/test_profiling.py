@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from profiling import STAGES, BuildProfile, StageProfile, profile_stage
+
+
+class TestStageProfile(unittest.TestCase):
+    def test_stage_accumulates(self):
+        profile = StageProfile()
+        with profile.stage("block_split"):
+            [object() for _ in range(100)]
+        with profile.stage("block_split"):
+            pass
+        seconds, _ = profile.stages["block_split"]
+        self.assertGreater(seconds, 0)
+        self.assertEqual(profile.total_seconds(), seconds)
+
+    def test_merge_and_to_dict_in_stage_order(self):
+        first = StageProfile()
+        first.add("write", 0.5, 3)
+        second = StageProfile()
+        second.add("write", 0.25, 2)
+        second.add("file_read", 0.125, 1)
+        first.merge(second)
+        self.assertEqual(list(first.to_dict()), ["file_read", "write"])
+        self.assertEqual(first.to_dict()["write"], {"seconds": 0.75, "net_blocks": 5, "overlapping": True})
+
+    def test_overlapping_stage_is_timed_without_blocks_or_share(self):
+        profile = StageProfile()
+        with profile.stage("write"):
+            pass
+        with profile.stage("file_read"):
+            pass
+        self.assertIsNone(profile.stages["write"][1])
+        self.assertEqual(profile.total_seconds(), profile.stages["file_read"][0])
+
+    def test_profile_stage_without_profile_is_noop(self):
+        with profile_stage(None, "write"):
+            pass
+
+
+class TestBuildProfile(unittest.TestCase):
+    def setUp(self):
+        self.build_profile = BuildProfile()
+        self.build_profile.build.add("static_copy", 1.0, 0)
+        for name, seconds in (("a.md", 0.1), ("b.md", 0.3), ("c.md", 0.2)):
+            page = StageProfile()
+            page.add("inline_parse", seconds, 10)
+            self.build_profile.add_page(name, page)
+
+    def test_totals_include_build_stages(self):
+        totals = self.build_profile.totals()
+        self.assertAlmostEqual(totals.stages["inline_parse"][0], 0.6)
+        self.assertEqual(totals.stages["inline_parse"][1], 30)
+        self.assertEqual(totals.stages["static_copy"][0], 1.0)
+
+    def test_slowest_pages(self):
+        slowest = [page for page, _ in self.build_profile.slowest_pages(2)]
+        self.assertEqual(slowest, ["b.md", "c.md"])
+
+    def test_write_json(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "reports", "profile.json")
+            self.build_profile.write_json(path, top=1)
+            with open(path, "r", encoding="utf-8") as report_file:
+                report = json.load(report_file)
+        self.assertEqual(report["page_count"], 3)
+        self.assertEqual(report["slowest_pages"], [{"page": "b.md", "seconds": 0.3}])
+        self.assertEqual(set(report["pages"]), {"a.md", "b.md", "c.md"})
+        self.assertTrue(set(report["stages"]) <= set(STAGES))
+
+    def test_pages_keyed_relative_to_root(self):
+        build_profile = BuildProfile(os.path.join("site", "content"))
+        build_profile.add_page(os.path.join("site", "content", "blog", "a.md"), StageProfile())
+        self.assertEqual(list(build_profile.pages), ["blog/a.md"])
+
+    def test_format_summary(self):
+        summary = self.build_profile.format_summary(top=1)
+        self.assertIn("static_copy", summary)
+        self.assertIn("Slowest 1 page(s):", summary)
+        self.assertIn("b.md", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from manifest import hash_bytes
+from source_reader import MMAP_THRESHOLD, SourceFile, SourceReader, read_source
+
+
+class TestReadSource(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "page.md")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, data):
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def test_text_matches_text_mode_open(self):
+        self.write("# Título\r\n\r\nold\rmac\n".encode("utf-8"))
+        with open(self.path, "r", encoding="utf-8") as file:
+            expected = file.read()
+        self.assertEqual(read_source(self.path).text, expected)
+
+    def test_digest_is_sha256_of_raw_bytes(self):
+        self.write(b"# Title\r\n")
+        source = read_source(self.path)
+        self.assertEqual(source.digest, hash_bytes(b"# Title\r\n"))
+        self.assertIsNone(source._text)
+
+    def test_empty_file(self):
+        self.write(b"")
+        self.assertEqual(read_source(self.path).text, "")
+
+    def test_large_file_is_memory_mapped(self):
+        self.write(b"# Title\n\n" + b"x" * 100)
+        with mock.patch("source_reader.MMAP_THRESHOLD", 10):
+            source = read_source(self.path)
+        self.assertNotIsInstance(source.data, bytes)
+        self.assertEqual(source.raw_bytes(), b"# Title\n\n" + b"x" * 100)
+        self.assertTrue(source.text.startswith("# Title"))
+        source.close()
+        self.assertEqual(source.size, 0)
+
+    def test_invalid_utf8_raises_on_decode(self):
+        self.write(b"\xff")
+        source = read_source(self.path)
+        with self.assertRaises(UnicodeDecodeError):
+            source.text
+
+
+class TestSourceReader(unittest.TestCase):
+    def test_reads_each_path_once(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "page.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("# Page")
+            reader = SourceReader()
+            self.assertIs(reader.get(path), reader.get(path))
+            self.assertEqual(reader.reads, 1)
+            self.assertEqual(reader.pop(path).text, "# Page")
+            self.assertIsNone(reader.pop(path))
+            reader.get(path)
+            reader.release(path)
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(reader.reads, 2)
+
+    def test_retain_is_bounded_and_skips_mmaps(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for name, size in (("a.md", 10), ("b.md", 10), ("big.md", MMAP_THRESHOLD)):
+                paths.append(os.path.join(temp_dir, name))
+                with open(paths[-1], "wb") as file:
+                    file.write(b"x" * size)
+            reader = SourceReader(max_retained=15)
+            self.assertEqual([reader.retain(path) for path in paths if reader.get(path)], [True, False, False])
+            self.assertEqual(len(reader), 1)
+            reader.release(paths[0])
+            reader.get(paths[1])
+            self.assertTrue(reader.retain(paths[1]))
+
+    def test_source_file_pickles_with_bytes(self):
+        source = pickle.loads(pickle.dumps(SourceFile("page.md", b"# Page")))
+        self.assertEqual((source.path, source.text), ("page.md", "# Page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import json
+import os
+import tempfile
+import unittest
+
+from state_file import read_state, write_state
+
+
+class TestStateFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "state", "data.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        write_state(self.path, 2, {"files": ["a", "b"]}, indent=1)
+        self.assertEqual(read_state(self.path, 2), {"version": 2, "files": ["a", "b"]})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["data.json"])
+
+    def test_missing_corrupt_and_outdated_files_yield_none(self):
+        self.assertIsNone(read_state(None, 1))
+        self.assertIsNone(read_state(self.path, 1))
+        write_state(self.path, 1, {})
+        self.assertIsNone(read_state(self.path, 2))
+        with open(self.path, "w", encoding="utf-8") as state_file:
+            state_file.write("{not json")
+        self.assertIsNone(read_state(self.path, 1))
+        with open(self.path, "w", encoding="utf-8") as state_file:
+            json.dump([1], state_file)
+        self.assertIsNone(read_state(self.path, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
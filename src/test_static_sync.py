@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from static_sync import files_match, sync_dir
+
+
+class TestSyncDir(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.src = os.path.join(root, "static")
+        self.dst = os.path.join(root, "docs")
+        self.state_path = os.path.join(root, "sync.json")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png-bytes")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    def sync(self, **kwargs):
+        return sync_dir(self.src, self.dst, self.state_path, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        stats = self.sync()
+        self.assertEqual(stats, {"copied": 2, "linked": 0, "unchanged": 0, "removed": 0})
+        self.assertEqual(self.read(os.path.join(self.dst, "images", "a.png")), "png-bytes")
+
+    def test_second_sync_copies_nothing(self):
+        self.sync()
+        self.assertEqual(self.sync()["unchanged"], 2)
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        path = os.path.join(self.src, "index.css")
+        self.write(path, "body { color: red }")
+        stats = self.sync()
+        self.assertEqual((stats["copied"], stats["unchanged"]), (1, 1))
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { color: red }")
+
+    def test_deleted_file_is_removed_but_other_outputs_survive(self):
+        self.sync()
+        self.write(os.path.join(self.dst, "index.html"), "<p>generated</p>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        stats = self.sync()
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+
+    def test_hash_compare_ignores_mtime(self):
+        self.sync()
+        path = os.path.join(self.src, "index.css")
+        os.utime(path, (0, 0))
+        self.assertEqual(self.sync(compare="hash")["unchanged"], 2)
+        self.assertEqual(self.sync(compare="mtime")["copied"], 1)
+
+    def test_link_mode_hard_links(self):
+        stats = self.sync(link=True)
+        self.assertEqual(stats["linked"], 2)
+        self.assertTrue(os.path.samefile(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+        self.assertEqual(self.sync(link=True)["unchanged"], 2)
+
+    def test_unknown_compare_mode_raises(self):
+        with self.assertRaises(ValueError):
+            self.sync(compare="size")
+
+    def test_missing_source_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_dir(os.path.join(self.temp_dir.name, "missing"), self.dst, self.state_path)
+
+    def test_files_match_missing_destination(self):
+        self.assertFalse(files_match(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
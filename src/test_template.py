@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import CompiledTemplate, rewrite_root_paths
+
+
+def legacy_render(template_content, title, content, basepath):
+    page = template_content.replace("{{ Title }}", title).replace("{{ Content }}", content)
+    page = page.replace('href="/', f'href="{basepath}')
+    return page.replace('src="/', f'src="{basepath}')
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    TEMPLATE = (
+        '<html><head><title>{{ Title }}</title><link href="/index.css" /></head>'
+        "<body>{{ Content }}</body></html>"
+    )
+
+    def test_render_fills_slots(self):
+        template = CompiledTemplate(self.TEMPLATE)
+        page = template.render("Hello", "<p>Hi</p>")
+        self.assertEqual(
+            page,
+            '<html><head><title>Hello</title><link href="/index.css" /></head><body><p>Hi</p></body></html>',
+        )
+
+    def test_render_rewrites_basepath(self):
+        template = CompiledTemplate(self.TEMPLATE, "/site/")
+        page = template.render("Hello", '<a href="/blog">b</a><img src="/a.png" alt=""></img>')
+        self.assertIn('<link href="/site/index.css" />', page)
+        self.assertIn('<a href="/site/blog">b</a>', page)
+        self.assertIn('<img src="/site/a.png" alt=""></img>', page)
+
+    def test_matches_legacy_replace(self):
+        content = '<p><a href="/x">x</a> <a href="https://e.com">e</a><img src="/i.png" alt="i"></img></p>'
+        for basepath in ("/", "/static-site/", "https://example.com/"):
+            template = CompiledTemplate(self.TEMPLATE, basepath)
+            self.assertEqual(
+                template.render("T", content),
+                legacy_render(self.TEMPLATE, "T", content, basepath),
+            )
+
+    def test_repeated_and_missing_slots(self):
+        template = CompiledTemplate("{{ Title }}|{{ Title }}|{{ Other }}")
+        self.assertEqual(template.render("A", "ignored"), "A|A|{{ Other }}")
+
+    def test_render_does_not_mutate_template(self):
+        template = CompiledTemplate(self.TEMPLATE)
+        template.render("One", "1")
+        self.assertIn("<title>Two</title>", template.render("Two", "2"))
+
+    def test_render_parts_splices_content_fragments(self):
+        template = CompiledTemplate(self.TEMPLATE, "/site/")
+        content_parts = ["<p>", '<a href="/x">', "x", "</a>", "</p>"]
+        parts = template.render_parts("T", content_parts)
+        self.assertIn("x", parts)
+        self.assertEqual("".join(parts), template.render("T", "".join(content_parts)))
+
+    def test_write_parts_streams_content(self):
+        template = CompiledTemplate(self.TEMPLATE, "/site/")
+        content = LeafNode("a", "x", {"href": "/x"})
+        written = []
+        template.write_parts(written.append, "T", content)
+        self.assertEqual("".join(written), template.render("T", content.to_html()))
+
+    def test_load_from_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "template.html")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.TEMPLATE)
+            template = CompiledTemplate.load(path, "/site/")
+        self.assertEqual(template.source, self.TEMPLATE)
+        self.assertEqual(template.basepath, "/site/")
+
+    def test_minify_collapses_template_and_content_but_not_pre(self):
+        source = "<html>\n  <title>{{ Title }}</title>\n  <body>{{ Content }}</body>\n</html>\n"
+        template = CompiledTemplate(source, minify=True)
+        content = ParentNode("div", [LeafNode("p", "a  b"), ParentNode("pre", [LeafNode("code", "x\n    y\n")])])
+        expected = "<html><title>T</title><body><div><p>a b</p><pre><code>x\n    y\n</code></pre></div></body></html> "
+        self.assertEqual(template.render("T", content.to_html()), expected)
+        written = []
+        template.write_parts(written.append, "T", content)
+        self.assertEqual("".join(written), expected)
+        unminified = CompiledTemplate(template.source).render("T", content.to_html())
+        self.assertEqual(template.saved_bytes, 2 * (len(unminified) - len(expected)))
+
+    def test_title_is_escaped(self):
+        template = CompiledTemplate('<title>{{ Title }}</title><meta content="{{ Title }}">{{ Content }}')
+        expected = '<title>&quot;New&quot; &amp; &lt;b&gt;</title><meta content="&quot;New&quot; &amp; &lt;b&gt;"><p>x</p>'
+        self.assertEqual(template.render('"New" & <b>', "<p>x</p>"), expected)
+        written = []
+        template.write_parts(written.append, '"New" & <b>', LeafNode("p", "x"))
+        self.assertEqual("".join(written), expected)
+
+    def test_minify_changes_digest(self):
+        self.assertNotEqual(CompiledTemplate(self.TEMPLATE).digest, CompiledTemplate(self.TEMPLATE, minify=True).digest)
+
+    def test_rewrite_root_paths_noop_for_root(self):
+        html = '<a href="/x">x</a>'
+        self.assertIs(rewrite_root_paths(html, "/"), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
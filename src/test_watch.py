@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from watch import InotifyWatcher, diff_snapshots, poll, snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_snapshot_files_and_directories(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, "content", "blog"))
+            paths = [
+                os.path.join(temp_dir, "content", "index.md"),
+                os.path.join(temp_dir, "content", "blog", "post.md"),
+                os.path.join(temp_dir, "template.html"),
+            ]
+            for path in paths:
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write("x")
+
+            files = snapshot([os.path.join(temp_dir, "content"), paths[2], os.path.join(temp_dir, "missing")])
+
+        self.assertEqual(sorted(files), sorted(paths))
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b", "d"], ["c"]))
+
+    def test_poll_reports_changes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "index.md")
+            calls = []
+            polls = []
+
+            def should_stop():
+                polls.append(None)
+                if len(polls) == 2:
+                    with open(path, "w", encoding="utf-8") as file:
+                        file.write("new")
+                return len(polls) > 3
+
+            poll([temp_dir], lambda changed, removed: calls.append((changed, removed)), 0.001, should_stop)
+
+        self.assertEqual(calls, [([path], [])])
+
+
+def inotify_available():
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            InotifyWatcher([temp_dir]).close()
+    except OSError:
+        return False
+    return True
+
+
+@unittest.skipUnless(inotify_available(), "inotify is not available")
+class TestInotifyWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.content_dir = os.path.join(root, "content")
+        self.template_path = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post")
+        self.write(self.template_path, "{{ Content }}")
+        self.write(os.path.join(root, "unrelated.txt"), "")
+        self.watcher = InotifyWatcher([self.content_dir, self.template_path])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.temp_dir.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_no_changes_times_out(self):
+        self.assertEqual(self.watcher.wait(0.01), ([], []))
+
+    def test_modified_and_filtered_files(self):
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        self.write(post, "# Changed")
+        self.write(self.template_path, "<p>{{ Content }}</p>")
+        self.write(os.path.join(self.temp_dir.name, "unrelated.txt"), "ignored")
+        self.assertEqual(self.watcher.wait(1), (sorted([post, self.template_path]), []))
+
+    def test_new_directory_is_watched(self):
+        new_dir = os.path.join(self.content_dir, "new")
+        os.makedirs(new_dir)
+        first = os.path.join(new_dir, "a.md")
+        self.write(first, "# A")
+        changed, _ = self.watcher.wait(1)
+        self.assertIn(first, changed)
+
+        second = os.path.join(new_dir, "b.md")
+        self.write(second, "# B")
+        self.assertEqual(self.watcher.wait(1), ([second], []))
+
+    def test_removed_file_and_directory(self):
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        os.remove(post)
+        os.rmdir(os.path.join(self.content_dir, "blog"))
+        self.assertEqual(self.watcher.wait(1), ([], [post]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+DEFAULT_INTERVAL = 0.2
+
+# Events arriving within this window of the first one are reported together,
+# so a save that touches several files triggers a single rebuild.
+BATCH_WINDOW = 0.02
+
+# inotify constants from <sys/inotify.h>
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def snapshot(paths):
+    """Map every file under paths (files or directories) to its (mtime_ns, size).
+
+    Uses os.scandir, whose directory entries carry cached stat data on most
+    platforms, so a poll of a large tree costs little more than a listing.
+    """
+    files = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            _scan_dir(path, files)
+        elif os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _scan_dir(path, files):
+    try:
+        entries = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    _scan_dir(entry.path, files)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                # Deleted between listing and stat; the next poll sees it as removed
+                continue
+
+
+def diff_snapshots(old, new):
+    """Return (changed, removed) sorted path lists; added files count as changed."""
+    changed = sorted(path for path, signature in new.items() if old.get(path) != signature)
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+def poll(paths, on_change, interval=DEFAULT_INTERVAL, should_stop=None):
+    """Call on_change(changed, removed) whenever files under paths change.
+
+    This is the fallback watch() uses where inotify is unavailable: it
+    works everywhere without extra dependencies, at the cost of a snapshot
+    of every file per interval. Runs until should_stop() returns True (or
+    forever when it is None).
+    """
+    previous = snapshot(paths)
+    while should_stop is None or not should_stop():
+        time.sleep(interval)
+        current = snapshot(paths)
+        changed, removed = diff_snapshots(previous, current)
+        if changed or removed:
+            on_change(changed, removed)
+        previous = current
+
+
+class InotifyWatcher:
+    """Linux inotify watcher reporting the same (changed, removed) lists as poll.
+
+    Directories are watched recursively; a file path (such as the template)
+    is watched through its parent directory, filtered to that one name.
+    Files are reported once they are closed after writing or moved into
+    place, so a half-written save does not trigger a rebuild.
+
+    Raises:
+        OSError: If inotify is unavailable or a watch cannot be added (for
+            example when fs.inotify.max_user_watches is exhausted).
+    """
+
+    def __init__(self, paths):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._dirs = {}
+        self._filters = {}
+        self._known = set()
+        try:
+            for path in paths:
+                path = os.path.abspath(path)
+                if os.path.isdir(path):
+                    self._known.update(self._add_tree(path, strict=True))
+                else:
+                    self._add_watch(os.path.dirname(path), os.path.basename(path), strict=True)
+                    if os.path.isfile(path):
+                        self._known.add(path)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _add_watch(self, path, only=None, strict=False):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            if strict:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+            return
+        self._dirs[wd] = path
+        if only is None or self._filters.get(wd, set()) is None:
+            self._filters[wd] = None
+        else:
+            self._filters.setdefault(wd, set()).add(only)
+
+    def _add_tree(self, path, strict=False):
+        """Watch path and every directory below it; return the files found."""
+        files = []
+        self._add_watch(path, strict=strict)
+        for root, dirs, names in os.walk(path):
+            for name in dirs:
+                self._add_watch(os.path.join(root, name), strict=strict)
+            files.extend(os.path.join(root, name) for name in names)
+        return files
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds and return (changed, removed) path lists."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return [], []
+
+        touched = set()
+        removed_dirs = []
+        overflowed = self._read_events(touched, removed_dirs)
+        deadline = time.monotonic() + BATCH_WINDOW
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                break
+            overflowed = self._read_events(touched, removed_dirs) or overflowed
+
+        if overflowed:
+            # Events were dropped: rescan and report every file as changed
+            roots = []
+            for wd, only in self._filters.items():
+                if only is None:
+                    roots.append(self._dirs[wd])
+                else:
+                    roots.extend(os.path.join(self._dirs[wd], name) for name in only)
+            current = set(snapshot(roots))
+            removed = sorted(self._known - current)
+            self._known = current
+            return sorted(current), removed
+
+        removed = set()
+        for dir_path in removed_dirs:
+            prefix = dir_path + os.sep
+            removed.update(path for path in self._known if path.startswith(prefix))
+        changed = set()
+        for path in touched:
+            if os.path.isfile(path):
+                changed.add(path)
+            elif path in self._known:
+                removed.add(path)
+        removed -= changed
+        self._known -= removed
+        self._known |= changed
+        return sorted(changed), sorted(removed)
+
+    def _read_events(self, touched, removed_dirs):
+        overflowed = False
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return overflowed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    self._filters.pop(wd, None)
+                    continue
+                dir_path = self._dirs.get(wd)
+                only = self._filters.get(wd)
+                if dir_path is None or not name or (only is not None and name not in only):
+                    continue
+
+                path = os.path.join(dir_path, name)
+                if not mask & IN_ISDIR:
+                    touched.add(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    touched.update(self._add_tree(path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    removed_dirs.append(path)
+
+
+def watch(paths, on_change, interval=DEFAULT_INTERVAL, should_stop=None):
+    """Call on_change(changed, removed) whenever files under paths change.
+
+    Uses inotify where available, so change detection costs nothing while
+    idle and does not grow with the size of the tree; otherwise falls back
+    to poll. interval bounds how often should_stop is checked (and is the
+    polling interval in fallback mode).
+    """
+    try:
+        watcher = InotifyWatcher(paths)
+    except OSError:
+        poll(paths, on_change, interval, should_stop)
+        return
+
+    with watcher:
+        while should_stop is None or not should_stop():
+            changed, removed = watcher.wait(interval)
+            if changed or removed:
+                on_change(changed, removed)